@@ -0,0 +1,8 @@
+# Benchmark scripts cho các thuật toán tìm đường (chạy: python -m benchmarks.<tên>)
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
@@ -0,0 +1,92 @@
+"""So sánh BFS sao chép đường đi (cũ) với BFS con trỏ cha (hiện tại).
+
+Chạy:
+    python -m benchmarks.bench_bfs --rows 120 --cols 100 --queries 50
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, List, Optional, Set
+
+from benchmarks.synthetic import build_grid_graph, random_pairs
+from algorithms.bfs import BFSPathfinder
+from graph.province_graph import ProvinceGraph
+
+
+def legacy_bfs(graph: ProvinceGraph, start: str, end: str) -> Optional[List[str]]:
+    """Bản BFS cũ: đưa cả danh sách đường đi vào hàng đợi."""
+    if start == end:
+        return [start]
+    
+    queue: deque = deque([[start]])
+    visited: Set[str] = {start}
+    
+    while queue:
+        path = queue.popleft()
+        current = path[-1]
+        
+        for neighbor in graph.get_neighbors(current):
+            if neighbor not in visited:
+                new_path = path + [neighbor]
+                
+                if neighbor == end:
+                    return new_path
+                
+                visited.add(neighbor)
+                queue.append(new_path)
+    
+    return None
+
+
+def measure(name: str, fn: Callable[[str, str], object], pairs: List[tuple]) -> None:
+    # Lần 1: đo thời gian (không bật tracemalloc vì nó làm chậm cấp phát)
+    start = time.perf_counter()
+    for s, e in pairs:
+        fn(s, e)
+    elapsed = time.perf_counter() - start
+    
+    # Lần 2: đo bộ nhớ cấp phát đỉnh cho từng truy vấn
+    peaks = []
+    for s, e in pairs:
+        tracemalloc.start()
+        fn(s, e)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    
+    print(
+        f"{name:<16} "
+        f"avg {elapsed / len(pairs) * 1000:8.2f} ms/query   "
+        f"avg peak alloc {sum(peaks) / len(peaks) / 1024:10.1f} KiB   "
+        f"max peak alloc {max(peaks) / 1024:10.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=120)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    
+    graph = build_grid_graph(args.rows, args.cols)
+    pairs = random_pairs(args.rows * args.cols, args.queries)
+    pathfinder = BFSPathfinder(graph)
+    
+    print(
+        f"Graph: {args.rows * args.cols} nodes, {graph.get_edge_count()} edges, "
+        f"{args.queries} queries"
+    )
+    
+    for s, e in pairs:
+        legacy = legacy_bfs(graph, s, e)
+        current = pathfinder.find_path(s, e)
+        assert len(legacy) == len(current.path), (s, e)
+    
+    measure("path-copy BFS", lambda s, e: legacy_bfs(graph, s, e), pairs)
+    measure("parent-ptr BFS", pathfinder.find_path, pairs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""So sánh BFS một chiều và BFS hai chiều (số đỉnh mở rộng, thời gian).
+
+Chạy:
+    python -m benchmarks.bench_bidirectional --rows 120 --cols 100 --queries 50
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import build_grid_graph, random_pairs
+from algorithms.bfs import BFSPathfinder
+from models.search_algorithm import SearchAlgorithm
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=120)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    
+    graph = build_grid_graph(args.rows, args.cols)
+    pairs = random_pairs(args.rows * args.cols, args.queries)
+    pathfinder = BFSPathfinder(graph)
+    
+    print(f"Graph: {args.rows * args.cols} nodes, {args.queries} queries")
+    
+    hop_counts = {}
+    for algorithm in (SearchAlgorithm.BFS, SearchAlgorithm.BIDIRECTIONAL_BFS):
+        expanded = 0
+        start = time.perf_counter()
+        for s, e in pairs:
+            result = pathfinder.find_path(s, e, algorithm=algorithm)
+            expanded += result.nodes_expanded
+            hop_counts.setdefault((s, e), result.distance)
+            assert hop_counts[(s, e)] == result.distance, (s, e)
+        elapsed = time.perf_counter() - start
+        
+        print(
+            f"{algorithm.value:<18} "
+            f"avg {elapsed / len(pairs) * 1000:8.2f} ms/query   "
+            f"avg {expanded / len(pairs):10.1f} nodes expanded"
+        )
+
+
+if __name__ == "__main__":
+    main()
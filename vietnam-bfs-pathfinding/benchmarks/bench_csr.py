@@ -0,0 +1,83 @@
+"""So sánh bộ nhớ và thời gian duyệt giữa danh sách kề Dict[str, List[str]]
+và bản CSR (mảng int32) của ProvinceGraph.
+
+Chạy:
+    python -m benchmarks.bench_csr --rows 120 --cols 100 --sources 20
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic import build_grid_graph, random_pairs
+from algorithms.bfs import BFSPathfinder
+from graph.csr import CSRAdjacency
+
+
+def dict_bfs(adjacency: Dict[str, List[str]], start: str) -> Dict[str, Optional[str]]:
+    """BFS con trỏ cha trên danh sách kề dạng chuỗi (bố cục cũ)."""
+    parents: Dict[str, Optional[str]] = {start: None}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for current in frontier:
+            for neighbor in adjacency[current]:
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return parents
+
+
+def traced_size(factory) -> int:
+    tracemalloc.start()
+    obj = factory()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=120)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--sources", type=int, default=20)
+    args = parser.parse_args()
+    
+    graph = build_grid_graph(args.rows, args.cols)
+    adjacency = {code: graph.get_neighbors(code) for code in graph.get_codes()}
+    csr = graph.get_csr()
+    sources = [s for s, _ in random_pairs(csr.size(), args.sources)]
+    
+    dict_size = traced_size(
+        lambda: {code: list(neighbors) for code, neighbors in adjacency.items()}
+    )
+    csr_size = traced_size(lambda: CSRAdjacency.from_adjacency(adjacency))
+    
+    print(f"Graph: {csr.size()} nodes, {len(csr.targets) // 2} edges")
+    print(f"dict-of-lists    memory {dict_size / 1024:10.1f} KiB")
+    print(
+        f"CSR              memory {csr_size / 1024:10.1f} KiB "
+        f"(int32 arrays only: {csr.memory_bytes() / 1024:.1f} KiB)"
+    )
+    
+    pathfinder = BFSPathfinder(graph)
+    
+    start = time.perf_counter()
+    for source in sources:
+        dict_bfs(adjacency, source)
+    dict_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for source in sources:
+        pathfinder._search(csr.index[source])
+    csr_time = time.perf_counter() - start
+    
+    print(f"dict-of-lists    full BFS avg {dict_time / len(sources) * 1000:8.2f} ms")
+    print(f"CSR              full BFS avg {csr_time / len(sources) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
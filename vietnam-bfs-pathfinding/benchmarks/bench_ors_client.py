@@ -0,0 +1,77 @@
+"""So sánh tạo httpx.Client mới mỗi lần gọi và client dùng chung (pool).
+
+Chạy trên server giả lập cục bộ (benchmarks/ors_stub.py), ``--handshake-ms``
+mô phỏng chi phí bắt tay TCP/TLS của mỗi kết nối mới tới ORS.
+
+Chạy:
+    python -m benchmarks.bench_ors_client --calls 100 --handshake-ms 20
+"""
+
+import argparse
+import time
+
+import httpx
+
+from benchmarks.ors_stub import start_stub_server
+from models.province import Province
+from services.routing_service import RoutingService
+
+
+def _per_call_client(service: RoutingService, provinces) -> None:
+    """Cách cũ: mở client mới (kết nối mới) cho mỗi request"""
+    payload = {
+        "coordinates": [[p.longitude, p.latitude] for p in provinces],
+        "instructions": False,
+        "geometry": False
+    }
+    with httpx.Client(timeout=service.REQUEST_TIMEOUT) as client:
+        response = client.post(
+            f"{service.base_url}/directions/driving-car",
+            headers=service._get_headers(),
+            json=payload
+        )
+        response.raise_for_status()
+        response.json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    
+    server, base_url = start_stub_server(handshake_delay=args.handshake_ms / 1000)
+    provinces = [
+        Province(code="01", name="Hà Nội", full_name="Thành phố Hà Nội",
+                 code_name="ha_noi", latitude=21.0285, longitude=105.8541),
+        Province(code="46", name="Huế", full_name="Thành phố Huế",
+                 code_name="hue", latitude=16.4637, longitude=107.5909)
+    ]
+    
+    service = RoutingService()
+    service.api_key = "benchmark"
+    service.base_url = base_url
+    
+    print(f"{args.calls} calls, simulated handshake {args.handshake_ms:.1f} ms/connection")
+    
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        _per_call_client(service, provinces)
+    per_call = (time.perf_counter() - start) / args.calls
+    
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        result = service.get_route_through_waypoints(provinces)
+        assert result.success, result.error_message
+    pooled = (time.perf_counter() - start) / args.calls
+    
+    print(f"new client per call  avg {per_call * 1000:8.2f} ms/call")
+    print(f"pooled client        avg {pooled * 1000:8.2f} ms/call")
+    print(f"saved                avg {(per_call - pooled) * 1000:8.2f} ms/call")
+    
+    service.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""So sánh Dijkstra và A* trên cùng truy vấn (số đỉnh mở rộng, thời gian).
+
+Chạy:
+    python -m benchmarks.bench_weighted --rows 120 --cols 100 --queries 50
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import build_grid_graph, random_pairs
+from algorithms.astar import AStarPathfinder
+from algorithms.dijkstra import DijkstraPathfinder
+from models.road_segment import RoadType
+from services.distance_service import DistanceCalculator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=120)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    
+    graph = build_grid_graph(args.rows, args.cols)
+    pairs = random_pairs(args.rows * args.cols, args.queries)
+    
+    print(f"Graph: {args.rows * args.cols} nodes, {args.queries} queries")
+    
+    calculator = DistanceCalculator()
+    distances = {}
+    for pathfinder in (
+        DijkstraPathfinder(graph, calculator),
+        AStarPathfinder(graph, calculator)
+    ):
+        # Chạy một lượt để nạp cache trọng số cạnh trước khi đo
+        for s, e in pairs:
+            pathfinder.find_path(s, e, RoadType.NATIONAL)
+        
+        expanded = 0
+        start = time.perf_counter()
+        for s, e in pairs:
+            result = pathfinder.find_path(s, e, RoadType.NATIONAL)
+            expanded += result.nodes_expanded
+            distances.setdefault((s, e), result.total_distance_km)
+            assert abs(distances[(s, e)] - result.total_distance_km) < 1e-6, (s, e)
+        elapsed = time.perf_counter() - start
+        
+        print(
+            f"{pathfinder.ALGORITHM.value:<10} "
+            f"avg {elapsed / len(pairs) * 1000:8.2f} ms/query   "
+            f"avg {expanded / len(pairs):10.1f} nodes expanded"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""Server giả lập OpenRouteService (stand-in) chạy cục bộ.
+
+Dùng cho benchmark / load test RoutingService mà không tốn quota ORS.
+Hỗ trợ ``POST .../directions/driving-car`` và ``POST .../matrix/driving-car``
+(có hoặc không có tiền tố ``/v2``) với ba chế độ:
+
+- ``synthetic``: tự sinh km = đường chim bay (Haversine) x ``road_factor``
+- ``replay``: trả lại response đã ghi trong file recordings (JSON), request
+  chưa ghi thì sinh synthetic (hoặc 404 nếu ``strict``)
+- ``record``: chuyển tiếp lên ORS thật (``upstream_url``), trả response về
+  client và ghi lại vào file recordings để replay sau
+
+Ngoài ra có thể thêm độ trễ (``latency`` + ngẫu nhiên ``jitter``), trễ bắt
+tay mỗi kết nối mới (``handshake_delay``) và lỗi ngẫu nhiên
+(``failure_rate`` với mã ``failure_status``). ``seed`` cố định chuỗi ngẫu
+nhiên để các lần chạy cho cùng kết quả.
+
+Chạy độc lập (rồi đặt ORS_BASE_URL=http://127.0.0.1:8081/v2):
+    python -m benchmarks.ors_stub --port 8081 --latency-ms 80 --failure-rate 0.05
+    python -m benchmarks.ors_stub --mode record --recordings data/ors_recordings.json
+    python -m benchmarks.ors_stub --mode replay --recordings data/ors_recordings.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+MODES = ("synthetic", "replay", "record")
+
+# Hệ số đường bộ / đường chim bay và tốc độ trung bình khi tự sinh route
+ROAD_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 50.0
+
+
+def _haversine_km(a, b) -> float:
+    """Khoảng cách đường chim bay giữa hai điểm [lon, lat]"""
+    lon1, lat1 = map(math.radians, a)
+    lon2, lat2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2 +
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def _directions_body(payload: dict, road_factor: float) -> dict:
+    """Route giả lập: tổng các chặng giữa waypoint liên tiếp (mét, giây)"""
+    coordinates = payload.get("coordinates", [])
+    km = sum(
+        _haversine_km(a, b) * road_factor
+        for a, b in zip(coordinates, coordinates[1:])
+    )
+    return {
+        "routes": [{
+            "summary": {
+                "distance": round(km * 1000, 1),
+                "duration": round(km / AVERAGE_SPEED_KMH * 3600, 1)
+            }
+        }]
+    }
+
+
+def _matrix_body(payload: dict, road_factor: float) -> dict:
+    """Ma trận km giả lập giữa các location nguồn / đích"""
+    locations = payload.get("locations", [])
+    sources = payload.get("sources", range(len(locations)))
+    destinations = payload.get("destinations", range(len(locations)))
+
+    return {
+        "distances": [
+            [
+                round(_haversine_km(locations[a], locations[b]) * road_factor, 2)
+                for b in destinations
+            ]
+            for a in sources
+        ]
+    }
+
+
+def _endpoint(path: str) -> Optional[str]:
+    if path.endswith("/directions/driving-car"):
+        return "directions"
+    if path.endswith("/matrix/driving-car"):
+        return "matrix"
+    return None
+
+
+def recording_key(endpoint: str, payload: dict) -> str:
+    """Key của một request trong file recordings (phụ thuộc tọa độ, không phụ thuộc thứ tự field)"""
+    if endpoint == "directions":
+        relevant = {"coordinates": payload.get("coordinates")}
+    else:
+        relevant = {
+            field: payload.get(field)
+            for field in ("locations", "sources", "destinations", "metrics", "units")
+        }
+    return f"{endpoint}|{json.dumps(relevant, sort_keys=True, separators=(',', ':'))}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Gửi header + body trong một lần ghi, tránh trễ Nagle / delayed ACK
+    # trên kết nối keep-alive
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        if self.server.handshake_delay:
+            time.sleep(self.server.handshake_delay)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server: 'ORSStubServer' = self.server
+
+        endpoint = _endpoint(self.path)
+        if endpoint is None:
+            self._send(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+
+        delay, fail = server.next_behaviour()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._send(server.failure_status, {"error": "Injected failure"})
+            return
+
+        status, body = server.respond(
+            endpoint,
+            self.path,
+            payload,
+            self.headers.get("Authorization", "")
+        )
+        self._send(status, body)
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class ORSStubServer(ThreadingHTTPServer):
+    # Backlog mặc định (5) quá nhỏ khi benchmark mở hàng trăm kết nối cùng lúc
+    request_queue_size = 512
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        mode: str = "synthetic",
+        recordings_path: Optional[str] = None,
+        upstream_url: str = "https://api.openrouteservice.org/v2",
+        strict: bool = False,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        handshake_delay: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        road_factor: float = ROAD_FACTOR,
+        seed: Optional[int] = None
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown stub mode: {mode}")
+        if mode != "synthetic" and not recordings_path:
+            raise ValueError(f"Mode '{mode}' requires a recordings file")
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be within [0, 1]")
+
+        super().__init__(address, _StubHandler)
+        self.mode = mode
+        self.recordings_path = recordings_path
+        self.upstream_url = upstream_url.rstrip("/")
+        self.strict = strict
+        self.latency = latency
+        self.jitter = jitter
+        self.handshake_delay = handshake_delay
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.road_factor = road_factor
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, dict] = {}
+        self._upstream: Optional[httpx.Client] = None
+        self.stats = {
+            "requests": 0,
+            "injected_failures": 0,
+            "replayed": 0,
+            "synthesized": 0,
+            "recorded": 0
+        }
+
+        if recordings_path and os.path.exists(recordings_path):
+            with open(recordings_path, "r", encoding="utf-8") as f:
+                self._recordings = json.load(f)
+
+    def next_behaviour(self) -> Tuple[float, bool]:
+        """(độ trễ, có tiêm lỗi không) cho request tiếp theo"""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            fail = self.failure_rate > 0 and self._random.random() < self.failure_rate
+            if fail:
+                self.stats["injected_failures"] += 1
+            return delay, fail
+
+    def respond(
+        self,
+        endpoint: str,
+        path: str,
+        payload: dict,
+        authorization: str
+    ) -> Tuple[int, dict]:
+        key = recording_key(endpoint, payload)
+
+        if self.mode == "record":
+            return self._record(key, path, payload, authorization)
+
+        if self.mode == "replay":
+            with self._lock:
+                recorded = self._recordings.get(key)
+            if recorded is not None:
+                self._count("replayed")
+                return recorded["status"], recorded["body"]
+            if self.strict:
+                return 404, {"error": "Request not found in recordings"}
+
+        self._count("synthesized")
+        if endpoint == "matrix":
+            return 200, _matrix_body(payload, self.road_factor)
+        return 200, _directions_body(payload, self.road_factor)
+
+    def _record(
+        self,
+        key: str,
+        path: str,
+        payload: dict,
+        authorization: str
+    ) -> Tuple[int, dict]:
+        """Gọi ORS thật rồi lưu response (chỉ lưu response 200)
+
+        Lỗi mạng / timeout trả 502 / 504, response không phải JSON trả
+        nguyên mã lỗi của ORS kèm thông báo, thay vì lỗi 500 của stub.
+        """
+        api_key = authorization or os.getenv("open-router-key", "")
+        suffix = path[path.index("/v2") + 3:] if "/v2" in path else path
+        try:
+            response = self._get_upstream().post(
+                f"{self.upstream_url}{suffix}",
+                headers={"Authorization": api_key, "Content-Type": "application/json"},
+                json=payload
+            )
+        except httpx.TimeoutException as e:
+            return 504, {"error": f"Upstream timeout: {e!r}"}
+        except httpx.HTTPError as e:
+            return 502, {"error": f"Upstream error: {e!r}"}
+
+        try:
+            body = response.json()
+        except ValueError:
+            status = response.status_code if response.status_code >= 400 else 502
+            return status, {"error": f"Upstream returned non-JSON ({response.status_code})"}
+
+        if response.status_code == 200:
+            with self._lock:
+                self._recordings[key] = {"status": 200, "body": body}
+                self.stats["recorded"] += 1
+                self._save()
+        return response.status_code, body
+
+    def _get_upstream(self) -> httpx.Client:
+        """Client tới ORS thật, tạo một lần dù nhiều request cùng gọi"""
+        if self._upstream is None:
+            with self._lock:
+                if self._upstream is None:
+                    self._upstream = httpx.Client(timeout=30.0)
+        return self._upstream
+
+    def _save(self) -> None:
+        """Ghi file recordings (gọi khi đang giữ lock)"""
+        directory = os.path.dirname(self.recordings_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.recordings_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._recordings, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.recordings_path)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._upstream is not None:
+            self._upstream.close()
+
+
+def start_stub_server(
+    latency: float = 0.0,
+    handshake_delay: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **options
+) -> Tuple[ORSStubServer, str]:
+    """Chạy server trong thread nền (mặc định cổng ngẫu nhiên)
+
+    ``options`` là các tham số còn lại của ORSStubServer (mode,
+    recordings_path, failure_rate, ...).
+
+    Returns:
+        (server, base_url) - base_url đã gồm ``/v2`` như ORS thật
+    """
+    server = ORSStubServer(
+        (host, port),
+        latency=latency,
+        handshake_delay=handshake_delay,
+        **options
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/v2"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--mode", choices=MODES, default="synthetic")
+    parser.add_argument("--recordings", default=None, help="JSON file for record/replay")
+    parser.add_argument("--upstream", default="https://api.openrouteservice.org/v2")
+    parser.add_argument("--strict", action="store_true", help="404 on replay miss")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = ORSStubServer(
+        (args.host, args.port),
+        mode=args.mode,
+        recordings_path=args.recordings,
+        upstream_url=args.upstream,
+        strict=args.strict,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        handshake_delay=args.handshake_ms / 1000,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        seed=args.seed
+    )
+    host, port = server.server_address
+    print(f"ORS stand-in ({args.mode}) on http://{host}:{port}/v2")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,129 @@ class Settings(BaseSettings):
         default="",
         description="OpenRouteService API key"
     )
+    ors_base_url: str = Field(
+        default="https://api.openrouteservice.org/v2",
+        description="OpenRouteService base URL (point at benchmarks/ors_stub.py for local runs)"
+    )
+    ors_max_connections: int = Field(
+        default=10,
+        description="Maximum concurrent connections in the ORS HTTP pool"
+    )
+    ors_max_keepalive_connections: int = Field(
+        default=5,
+        description="Idle keep-alive connections kept in the ORS HTTP pool"
+    )
+    ors_keepalive_expiry: float = Field(
+        default=30.0,
+        description="Seconds an idle ORS connection is kept open"
+    )
+    ors_circuit_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive ORS failures before the circuit breaker opens"
+    )
+    ors_circuit_recovery_seconds: float = Field(
+        default=30.0,
+        description="Seconds the ORS circuit stays open before a half-open probe"
+    )
+    ors_prefetch_edge_distances: bool = Field(
+        default=False,
+        description="Fetch real road km for every adjacent pair (ORS Matrix API) in the background at startup; /ready waits for it"
+    )
+    
+    # Graph settings
+    precompute_hop_tables: bool = Field(
+        default=True,
+        description="Precompute all-pairs hop-distance/next-hop tables at graph build time"
+    )
+    contraction_hierarchy_enabled: bool = Field(
+        default=False,
+        description="Preprocess contraction hierarchies at startup (otherwise on first 'ch' query)"
+    )
+    contraction_hierarchy_file: str = Field(
+        default="",
+        description="JSON file to load preprocessed contraction hierarchies from (or save to)"
+    )
+    
+    # Executor settings
+    executor_max_workers: int = Field(
+        default=8,
+        description="Threads running CPU-bound / blocking service calls for async routes"
+    )
+    executor_max_queue_size: int = Field(
+        default=64,
+        description="Calls allowed to wait for a free thread before returning 503"
+    )
+    
+    # Batch settings
+    batch_max_pairs: int = Field(
+        default=10000,
+        description="Maximum province pairs in one /path/batch request"
+    )
+    batch_ors_concurrency: int = Field(
+        default=8,
+        description="Concurrent ORS lookups per /path/batch request"
+    )
+    
+    matrix_max_size: int = Field(
+        default=1000,
+        description="Maximum origins (and destinations) in one /path/matrix request"
+    )
+    
+    # Cache settings
+    route_cache_max_size: int = Field(
+        default=1024,
+        description="Maximum cached route results (0 disables the cache)"
+    )
+    route_cache_ttl_seconds: float = Field(
+        default=3600.0,
+        description="Seconds a cached route result stays valid"
+    )
+    ors_cache_file: str = Field(
+        default="ors_cache.sqlite3",
+        description="SQLite file (inside data_path) persisting ORS results; empty disables it"
+    )
+    ors_cache_ttl_seconds: float = Field(
+        default=30 * 24 * 3600.0,
+        description="Seconds a persisted ORS result stays valid"
+    )
+    ors_cache_max_entries: int = Field(
+        default=50000,
+        description="Maximum persisted ORS results before the oldest are evicted"
+    )
+    pending_route_max_size: int = Field(
+        default=1024,
+        description="Tokens kept for ORS distances still running after an early response"
+    )
+    pending_route_ttl_seconds: float = Field(
+        default=300.0,
+        description="Seconds a pending-distance token stays resolvable"
+    )
+    access_stats_file: str = Field(
+        default="access_stats.json",
+        description="JSON file (inside data_path) with per-pair request counts; empty disables it"
+    )
+    
+    # Warm-up settings
+    warmup_enabled: bool = Field(
+        default=True,
+        description="Prefetch hot province pairs in the background at startup"
+    )
+    warmup_pairs: str = Field(
+        default="",
+        description="Comma-separated pairs to warm up, e.g. '01:79,48:79' (codes or names)"
+    )
+    warmup_top_n: int = Field(
+        default=20,
+        description="Most requested pairs of the previous run to warm up"
+    )
+    warmup_concurrency: int = Field(
+        default=4,
+        description="Pairs warmed up concurrently"
+    )
+    warmup_timeout_seconds: float = Field(
+        default=30.0,
+        description="Seconds before edge prefetch / warm-up gives up and the API reports ready"
+    )
     
     class Config:
         env_file = ".env"
@@ -49,6 +172,16 @@ class Settings(BaseSettings):
     
     def get_adjacency_path(self) -> str:
         return os.path.join(self.data_path, self.adjacency_file)
+    
+    def get_ors_cache_path(self) -> Optional[str]:
+        if not self.ors_cache_file:
+            return None
+        return os.path.join(self.data_path, self.ors_cache_file)
+    
+    def get_access_stats_path(self) -> Optional[str]:
+        if not self.access_stats_file:
+            return None
+        return os.path.join(self.data_path, self.access_stats_file)
 
 
 @lru_cache()
@@ -1,5 +1,15 @@
 from .bfs import BFSPathfinder
+from .dijkstra import DijkstraPathfinder
+from .astar import AStarPathfinder
+from .contraction_hierarchy import ContractionHierarchy, CHPathfinder
+from .od_matrix import ODMatrix, ODMatrixBuilder
 
 __all__ = [
-    "BFSPathfinder"
+    "BFSPathfinder",
+    "DijkstraPathfinder",
+    "AStarPathfinder",
+    "ContractionHierarchy",
+    "CHPathfinder",
+    "ODMatrix",
+    "ODMatrixBuilder"
 ]
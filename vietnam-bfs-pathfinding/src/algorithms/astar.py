@@ -0,0 +1,81 @@
+"""Thuật toán A* tìm đường đi ngắn nhất theo km ước lượng.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+from graph.csr import CSRAdjacency
+from graph.province_graph import ProvinceGraph
+from models.road_segment import RoadType
+from models.search_algorithm import SearchAlgorithm
+from algorithms.dijkstra import DijkstraPathfinder
+
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
+
+class AStarPathfinder(DijkstraPathfinder):
+    """
+    A* trên cùng trọng số cạnh với DijkstraPathfinder.
+    
+    Heuristic = khoảng cách đường chim bay tới đích x hệ số loại đường.
+    Vì mỗi cạnh cũng là đường chim bay x cùng hệ số, theo bất đẳng thức
+    tam giác heuristic không bao giờ vượt quá km thực còn lại (admissible
+    và consistent), nên A* vẫn cho đường ngắn nhất nhưng mở rộng ít đỉnh hơn.
+    """
+    
+    ALGORITHM = SearchAlgorithm.ASTAR
+    
+    def __init__(
+        self,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> None:
+        super().__init__(graph, distance_calculator)
+        # Tọa độ và hàng trong ma trận khoảng cách theo chỉ số đỉnh của bản CSR hiện tại
+        self._coordinates_csr: Optional[CSRAdjacency] = None
+        self._coordinates: List[Optional[Tuple[float, float]]] = []
+        self._matrix_rows: Optional[List[int]] = None
+        self._matrix: Optional[np.ndarray] = None
+    
+    def _heuristic(self, node: int, end: int, road_type: RoadType) -> float:
+        coordinates = self._get_coordinates()
+        
+        if self._matrix_rows is not None:
+            # Tra ma trận tính trước (DistanceCalculator.precompute), NaN = thiếu tọa độ
+            rows = self._matrix_rows
+            straight_distance = float(self._matrix[rows[node], rows[end]])
+            if straight_distance != straight_distance:
+                return 0.0
+        else:
+            position, goal = coordinates[node], coordinates[end]
+            
+            # Thiếu tọa độ: dùng 0 để heuristic vẫn admissible
+            if position is None or goal is None:
+                return 0.0
+            
+            straight_distance = self.distance_calculator.haversine_distance(
+                position[0], position[1], goal[0], goal[1]
+            )
+        return straight_distance * self.distance_calculator.ROAD_ADJUSTMENT_FACTORS.get(
+            road_type,
+            self.distance_calculator.ROAD_ADJUSTMENT_FACTORS[RoadType.UNKNOWN]
+        )
+    
+    def _get_coordinates(self) -> List[Optional[Tuple[float, float]]]:
+        csr = self.graph.get_csr()
+        if csr is not self._coordinates_csr:
+            coordinates = []
+            for code in csr.codes:
+                province = self.graph.get_province(code)
+                if province.latitude is None or province.longitude is None:
+                    coordinates.append(None)
+                else:
+                    coordinates.append((province.latitude, province.longitude))
+            rows = self.distance_calculator.get_matrix_rows(csr.codes)
+            self._matrix = self.distance_calculator.get_distance_matrix()
+            self._matrix_rows = rows.tolist() if rows is not None else None
+            self._coordinates = coordinates
+            self._coordinates_csr = csr
+        return self._coordinates
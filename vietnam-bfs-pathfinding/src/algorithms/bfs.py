@@ -2,15 +2,23 @@
 """
 
 import time
-from collections import deque
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Tuple
 
 from graph.province_graph import ProvinceGraph
 from models.path_result import PathResult
+from models.search_algorithm import SearchAlgorithm
 from models.exceptions import GraphNotBuiltError, NoPathFoundError
 
 
 class BFSPathfinder:
+    """
+    BFS trên bản CSR của đồ thị: mọi trạng thái duyệt (cha, khoảng cách)
+    là mảng số nguyên đánh theo chỉ số đỉnh, chỉ đổi sang mã tỉnh ở kết quả.
+    Trạng thái dùng list thay vì array để tránh boxing số nguyên mỗi lần đọc.
+    """
+    
+    # Giá trị trong mảng cha cho đỉnh chưa được phát hiện
+    UNVISITED = -1
 
     def __init__(self, graph: ProvinceGraph) -> None:
         if not graph.is_built():
@@ -21,13 +29,16 @@ class BFSPathfinder:
     def find_path(
         self,
         start_code: str,
-        end_code: str
+        end_code: str,
+        algorithm: SearchAlgorithm = SearchAlgorithm.BFS
     ) -> PathResult:
         """Tìm đường đi ngắn nhất (theo số cạnh) giữa hai tỉnh.
 
         Args:
             start_code: Mã tỉnh bắt đầu.
             end_code: Mã tỉnh kết thúc.
+            algorithm: BFS một chiều hoặc BFS hai chiều
+                       (``SearchAlgorithm.BIDIRECTIONAL_BFS``).
 
         Returns:
             PathResult: Kết quả bao gồm danh sách tỉnh trên đường đi,
@@ -49,10 +60,39 @@ class BFSPathfinder:
                 path=[start_province],
                 start=start_province,
                 end=end_province,
-                execution_time=execution_time
+                execution_time=execution_time,
+                algorithm=algorithm.value
+            )
+        
+        # Khác thành phần liên thông: báo lỗi ngay, không cần duyệt
+        if not self.graph.same_component(start_code, end_code):
+            raise NoPathFoundError(
+                start=start_province.name,
+                end=end_province.name,
+                reason="Hai tỉnh không liên thông với nhau"
             )
         
-        path = self._bfs(start_code, end_code)
+        csr = self.graph.get_csr()
+        start, end = csr.index[start_code], csr.index[end_code]
+        
+        if algorithm == SearchAlgorithm.BIDIRECTIONAL_BFS:
+            path, nodes_expanded = self._bidirectional_bfs(start, end)
+        elif algorithm == SearchAlgorithm.BFS:
+            table = self.graph.get_hop_table()
+            if table is not None:
+                # Tra bảng tính trước, không cần duyệt đồ thị: mỗi bước đi
+                # theo next-hop là một lần tra bảng, tính như một đỉnh mở rộng
+                # (nodes_expanded = 0 chỉ dành cho route cache hit)
+                path = table.path(start_code, end_code)
+                nodes_expanded = len(path) - 1 if path else 0
+            else:
+                parents, nodes_expanded = self._search(start, target=end)
+                path = (
+                    self._reconstruct_path(parents, end)
+                    if parents[end] != self.UNVISITED else None
+                )
+        else:
+            raise ValueError(f"BFSPathfinder không hỗ trợ thuật toán {algorithm.value}")
         
         if not path:
             raise NoPathFoundError(
@@ -71,35 +111,211 @@ class BFSPathfinder:
             path=province_path,
             start=start_province,
             end=end_province,
-            execution_time=execution_time
+            execution_time=execution_time,
+            nodes_expanded=nodes_expanded,
+            algorithm=algorithm.value
         )
     
-    def _bfs(self, start: str, end: str) -> Optional[List[str]]:
-        """Thuật toán BFS tìm đường đi ngắn nhất.
+    def find_paths_from(
+        self,
+        start_code: str,
+        end_codes: List[str]
+    ) -> Dict[str, Optional[PathResult]]:
+        """Tìm đường đi ngắn nhất từ một tỉnh tới nhiều tỉnh đích.
+
+        Chỉ duyệt một cây BFS từ ``start_code``; đường đi tới mỗi đích được
+        dựng lại từ cây dùng chung. Thời gian duyệt được chia đều cho các
+        kết quả.
+
+        Returns:
+            Dict {mã_tỉnh_đích: PathResult}, giá trị None nếu không liên thông.
+        """
+        start_time = time.perf_counter()
+        
+        start_province = self.graph.get_province(start_code)
+        if not start_province:
+            raise ValueError(f"Tỉnh bắt đầu {start_code} không có trong đồ thị")
+        for end_code in end_codes:
+            if not self.graph.has_province(end_code):
+                raise ValueError(f"Tỉnh kết thúc {end_code} không có trong đồ thị")
+        
+        csr = self.graph.get_csr()
+        parents, nodes_expanded = self._search(csr.index[start_code])
+        shared_time = (time.perf_counter() - start_time) / max(len(end_codes), 1)
+        
+        results: Dict[str, Optional[PathResult]] = {}
+        for end_code in end_codes:
+            if end_code in results:
+                continue
+            end = csr.index[end_code]
+            if parents[end] == self.UNVISITED:
+                results[end_code] = None
+                continue
+            
+            path_start = time.perf_counter()
+            path = self._reconstruct_path(parents, end)
+            results[end_code] = PathResult(
+                path=[self.graph.get_province(code) for code in path],
+                start=start_province,
+                end=self.graph.get_province(end_code),
+                execution_time=shared_time + time.perf_counter() - path_start,
+                nodes_expanded=nodes_expanded,
+                algorithm=SearchAlgorithm.BFS.value
+            )
+        
+        return results
+    
+    def _search(
+        self,
+        start: int,
+        target: int = UNVISITED,
+        max_distance: Optional[int] = None,
+        distances: Optional[Dict[int, int]] = None
+    ) -> Tuple[List[int], int]:
+        """BFS lưu con trỏ cha (parent pointer) cho mỗi đỉnh.
+
+        Duyệt theo từng tầng: frontier chỉ chứa chỉ số đỉnh, không chứa cả
+        đường đi, nên mỗi đỉnh được ghi đúng một lần. Đường đi chỉ được
+        dựng lại (``_reconstruct_path``) khi cần.
+
+        Args:
+            start: Chỉ số đỉnh bắt đầu.
+            target: Dừng sớm khi phát hiện đỉnh này (UNVISITED = duyệt hết).
+            max_distance: Số bước tối đa (None hoặc 0 = không giới hạn).
+            distances: Nếu truyền vào, được điền số bước từ ``start``
+                       của mọi đỉnh đã phát hiện, theo thứ tự phát hiện.
+
+        Returns:
+            Tuple (parents, nodes_expanded): mảng cha theo chỉ số đỉnh
+            (UNVISITED nếu chưa phát hiện, gốc trỏ về chính nó) và số đỉnh
+            đã được mở rộng.
+        """
+        csr = self.graph.get_csr()
+        offsets, targets = csr.offsets, csr.targets_view
+        
+        parents = [self.UNVISITED] * csr.size()
+        parents[start] = start
+        if distances is not None:
+            distances[start] = 0
+        
+        frontier: List[int] = [start]
+        depth = 0
+        nodes_expanded = 0
+        
+        while frontier:
+            if max_distance and depth >= max_distance:
+                break
+            depth += 1
+            next_frontier: List[int] = []
+            append = next_frontier.append
+            
+            for current in frontier:
+                nodes_expanded += 1
+                for neighbor in targets[offsets[current]:offsets[current + 1]]:
+                    if parents[neighbor] == -1:
+                        parents[neighbor] = current
+                        if distances is not None:
+                            distances[neighbor] = depth
+                        
+                        if neighbor == target:
+                            return parents, nodes_expanded
+                        
+                        append(neighbor)
+            
+            frontier = next_frontier
+        
+        return parents, nodes_expanded
+    
+    def _bidirectional_bfs(
+        self,
+        start: int,
+        end: int
+    ) -> Tuple[Optional[List[str]], int]:
+        """BFS hai chiều: mở rộng xen kẽ từ ``start`` và ``end``.
+
+        Mỗi vòng mở rộng một tầng của phía có frontier nhỏ hơn. Điểm gặp
+        được kiểm tra ngay khi phát hiện đỉnh (trước khi đưa vào frontier)
+        và dừng ở điểm gặp đầu tiên. Số đỉnh phải duyệt xấp xỉ căn bậc hai
+        so với BFS một chiều trên đồ thị dạng cây, khoảng một nửa trên lưới.
+
+        Returns:
+            Tuple (path, nodes_expanded). ``path`` là None nếu không có đường.
         """
         if start == end:
-            return [start]
-        if not self.graph.has_province(start) or not self.graph.has_province(end):
-            return None
+            return [self.graph.get_csr().codes[start]], 0
         
-        queue: deque = deque([[start]])
-        visited: Set[str] = {start}
+        size = self.graph.get_csr().size()
+        parents_fwd = [self.UNVISITED] * size
+        parents_bwd = [self.UNVISITED] * size
+        parents_fwd[start] = start
+        parents_bwd[end] = end
+        frontier_fwd: List[int] = [start]
+        frontier_bwd: List[int] = [end]
+        nodes_expanded = 0
         
-        while queue:
-            path = queue.popleft()
-            current = path[-1]
+        while frontier_fwd and frontier_bwd:
+            if len(frontier_fwd) <= len(frontier_bwd):
+                frontier_fwd, meeting, expanded = self._expand_level(
+                    frontier_fwd, parents_fwd, parents_bwd
+                )
+            else:
+                frontier_bwd, meeting, expanded = self._expand_level(
+                    frontier_bwd, parents_bwd, parents_fwd
+                )
+            nodes_expanded += expanded
             
-            for neighbor in self.graph.get_neighbors(current):
-                if neighbor not in visited:
-                    new_path = path + [neighbor]
-                    
-                    if neighbor == end:
-                        return new_path
-                    
-                    visited.add(neighbor)
-                    queue.append(new_path)
-        
-        return None
+            if meeting != self.UNVISITED:
+                path = self._reconstruct_path(parents_fwd, meeting)
+                backward = self._reconstruct_path(parents_bwd, meeting)
+                backward.reverse()
+                return path + backward[1:], nodes_expanded
+        
+        return None, nodes_expanded
+    
+    def _expand_level(
+        self,
+        frontier: List[int],
+        parents: List[int],
+        other_parents: List[int]
+    ) -> Tuple[List[int], int, int]:
+        """Mở rộng một tầng của BFS hai chiều, dừng ở điểm gặp đầu tiên.
+
+        Hai phía luôn mở rộng trọn từng tầng nên mọi đỉnh của cây bên kia
+        có khoảng cách nhỏ hơn tầng ngoài cùng đã được mở rộng; nếu điểm gặp
+        nằm bên trong cây đó thì đã bị phát hiện ở vòng trước. Vì vậy mọi
+        điểm gặp trong vòng này cho cùng một độ dài đường đi (ngắn nhất),
+        không cần duyệt hết tầng.
+
+        Returns:
+            Tuple (next_frontier, meeting, nodes_expanded): ``meeting`` là
+            UNVISITED nếu chưa gặp.
+        """
+        csr = self.graph.get_csr()
+        offsets, targets = csr.offsets, csr.targets_view
+        next_frontier: List[int] = []
+        append = next_frontier.append
+        
+        for expanded, current in enumerate(frontier, start=1):
+            for neighbor in targets[offsets[current]:offsets[current + 1]]:
+                if parents[neighbor] != -1:
+                    continue
+                parents[neighbor] = current
+                if other_parents[neighbor] != -1:
+                    return next_frontier, neighbor, expanded
+                append(neighbor)
+        
+        return next_frontier, self.UNVISITED, len(frontier)
+    
+    def _reconstruct_path(self, parents: List[int], end: int) -> List[str]:
+        """Dựng lại đường đi (mã tỉnh) từ gốc cây BFS tới ``end`` theo mảng cha."""
+        codes = self.graph.get_csr().codes
+        path = [codes[end]]
+        current = end
+        while parents[current] != current:
+            current = parents[current]
+            path.append(codes[current])
+        path.reverse()
+        return path
 
     def find_all_paths_from(
         self,
@@ -110,24 +326,14 @@ class BFSPathfinder:
         if not self.graph.has_province(start_code):
             raise ValueError(f"Tỉnh {start_code} không có trong đồ thị")
         
-        queue: deque = deque([(start_code, 0)])
-        visited: Set[str] = {start_code}
-        distances: Dict[str, int] = {start_code: 0}
+        table = self.graph.get_hop_table()
+        if table is not None:
+            return table.distances_from(start_code, max_distance)
         
-        while queue:
-            current, distance = queue.popleft()
-            
-            if max_distance and distance >= max_distance:
-                continue
-            
-            for neighbor in self.graph.get_neighbors(current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_distance = distance + 1
-                    distances[neighbor] = new_distance
-                    queue.append((neighbor, new_distance))
-        
-        return distances
+        csr = self.graph.get_csr()
+        distances: Dict[int, int] = {}
+        self._search(csr.index[start_code], max_distance=max_distance, distances=distances)
+        return {csr.codes[i]: d for i, d in distances.items()}
     #Check 2 tỉnh có đi đến được hay ko
     def is_connected(self, code1: str, code2: str) -> bool:
 
@@ -136,24 +342,7 @@ class BFSPathfinder:
         if not self.graph.has_province(code2):
             raise ValueError(f"Tỉnh {code2} không có trong đồ thị")
         
-        if code1 == code2:
-            return True
-        
-        visited: Set[str] = {code1}
-        queue: deque = deque([code1])
-        
-        while queue:
-            current = queue.popleft()
-            
-            if current == code2:
-                return True
-            
-            for neighbor in self.graph.get_neighbors(current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        
-        return False
+        return self.graph.same_component(code1, code2)
     
     # def get_graph_stats(self) -> Dict:
     #     return self.graph.get_stats()
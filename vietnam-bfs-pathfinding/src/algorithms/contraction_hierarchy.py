@@ -0,0 +1,482 @@
+"""Contraction Hierarchies (CH) cho truy vấn đường đi trên đồ thị lớn.
+
+Tiền xử lý một lần (khi khởi động hoặc offline, lưu ra file JSON), sau đó
+mỗi truy vấn chỉ là Dijkstra hai chiều đi "lên" trong thứ bậc các đỉnh.
+"""
+
+import hashlib
+import heapq
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from graph.edge_weights import EdgeWeights
+from graph.province_graph import ProvinceGraph
+from models.path_result import PathResult
+from models.road_segment import RoadType
+from models.search_algorithm import SearchAlgorithm
+from models.exceptions import GraphNotBuiltError, NoPathFoundError
+
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
+
+class ContractionHierarchy:
+    """
+    Kết quả tiền xử lý CH của một ProvinceGraph.
+    
+    Đỉnh được đánh theo chỉ số của bản CSR khi tiền xử lý (``codes``).
+    Trọng số là khoảng cách RoadType.DEFAULT (đường chim bay, hệ số 1.0).
+    Mọi loại đường khác chỉ nhân cùng một hệ số cho mọi cạnh nên đường đi
+    ngắn nhất không đổi, chỉ cần nhân khoảng cách kết quả với hệ số.
+    """
+    
+    # Số đỉnh tối đa được settle trong mỗi lần tìm witness path
+    WITNESS_SETTLE_LIMIT = 50
+    # Hệ số của edge difference trong độ ưu tiên contraction. Trên đồ thị
+    # lưới 900 đỉnh, hệ số 2 giảm ~10% shortcut và ~30% thời gian tiền xử lý
+    # so với hệ số 1 (số láng giềng đã contract + độ sâu giữ hệ số 1)
+    EDGE_DIFFERENCE_WEIGHT = 2
+
+    def __init__(
+        self,
+        codes: List[str],
+        ranks: List[int],
+        upward: List[List[Tuple[int, float]]],
+        middles: Dict[Tuple[int, int], int],
+        fingerprint: str = ""
+    ) -> None:
+        self._codes = codes
+        self._index: Dict[str, int] = {code: i for i, code in enumerate(codes)}
+        # Thứ bậc contraction của mỗi đỉnh (đỉnh contract sau có bậc cao hơn)
+        self._ranks = ranks
+        # Cạnh đi lên: upward[i] = [(đỉnh_bậc_cao_hơn, km)], gồm cả shortcut
+        self._upward = upward
+        # Đỉnh giữa của mỗi shortcut để bung lại đường đi gốc
+        self._middles = middles
+        # Dấu vân tay cạnh + trọng số của đồ thị lúc tiền xử lý
+        self._fingerprint = fingerprint
+    
+    @staticmethod
+    def _default_weights(
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> np.ndarray:
+        """Trọng số RoadType.DEFAULT song song với ``csr.targets``"""
+        edge_weights = EdgeWeights.for_graph(graph, distance_calculator)
+        if edge_weights.missing_count():
+            raise ValueError(
+                f"Missing coordinates for {edge_weights.missing_count()} edges"
+            )
+        return edge_weights.for_road_type(RoadType.DEFAULT)
+    
+    @classmethod
+    def graph_fingerprint(
+        cls,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> str:
+        """SHA-256 của mã đỉnh, cạnh CSR và trọng số cạnh (làm tròn 1e-6 km)
+        
+        Đổi tỉnh, cạnh, tọa độ hay hệ số đường đều làm đổi fingerprint, khi
+        đó file CH đã lưu không còn dùng được.
+        """
+        csr = graph.get_csr()
+        digest = hashlib.sha256()
+        digest.update("\n".join(csr.codes).encode("utf-8"))
+        digest.update(csr.offsets.tobytes())
+        digest.update(csr.targets.tobytes())
+        weights = np.round(cls._default_weights(graph, distance_calculator), 6)
+        digest.update(weights.tobytes())
+        return digest.hexdigest()
+    
+    @classmethod
+    def build(
+        cls,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> 'ContractionHierarchy':
+        """Contract lần lượt các đỉnh theo độ ưu tiên edge difference.
+
+        Độ ưu tiên = EDGE_DIFFERENCE_WEIGHT x (số shortcut phải thêm - số
+        cạnh bị xóa) + số láng giềng đã bị contract + độ sâu, được cập nhật
+        lười (lazy) khi lấy ra khỏi heap.
+        """
+        if not graph.is_built():
+            raise GraphNotBuiltError()
+        
+        csr = graph.get_csr()
+        size = csr.size()
+        weights = cls._default_weights(graph, distance_calculator).tolist()
+        adjacency: List[Dict[int, float]] = [{} for _ in range(size)]
+        for i in range(size):
+            for k in range(csr.offsets[i], csr.offsets[i + 1]):
+                adjacency[i][csr.targets[k]] = weights[k]
+        
+        ranks: List[int] = [-1] * size
+        upward: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+        middles: Dict[Tuple[int, int], int] = {}
+        deleted_neighbors: List[int] = [0] * size
+        levels: List[int] = [0] * size
+        
+        def priority(node: int) -> int:
+            shortcuts = cls._find_shortcuts(adjacency, node)
+            return (
+                cls.EDGE_DIFFERENCE_WEIGHT * (len(shortcuts) - len(adjacency[node])) +
+                deleted_neighbors[node] + levels[node]
+            )
+        
+        heap = [(priority(node), node) for node in range(size)]
+        heapq.heapify(heap)
+        rank = 0
+        
+        while heap:
+            _, node = heapq.heappop(heap)
+            if ranks[node] != -1:
+                continue
+            
+            # Lazy update: nếu độ ưu tiên đã tăng thì đưa lại vào heap
+            current_priority = priority(node)
+            if heap and current_priority > heap[0][0]:
+                heapq.heappush(heap, (current_priority, node))
+                continue
+            
+            shortcuts = cls._find_shortcuts(adjacency, node)
+            ranks[node] = rank
+            rank += 1
+            
+            for neighbor, weight in adjacency[node].items():
+                upward[node].append((neighbor, weight))
+                del adjacency[neighbor][node]
+                deleted_neighbors[neighbor] += 1
+                levels[neighbor] = max(levels[neighbor], levels[node] + 1)
+            adjacency[node] = {}
+            
+            for u, v, weight in shortcuts:
+                if weight < adjacency[u].get(v, float("inf")):
+                    adjacency[u][v] = weight
+                    adjacency[v][u] = weight
+                    middles[(u, v)] = node
+                    middles[(v, u)] = node
+        
+        return cls(
+            list(csr.codes), ranks, upward, middles,
+            fingerprint=cls.graph_fingerprint(graph, distance_calculator)
+        )
+    
+    @classmethod
+    def _find_shortcuts(
+        cls,
+        adjacency: List[Dict[int, float]],
+        node: int
+    ) -> List[Tuple[int, int, float]]:
+        """Các shortcut (u, v, km) cần thêm nếu contract ``node``.
+
+        Cặp láng giềng u-v cần shortcut khi không tìm được witness path
+        (đường không đi qua ``node``) ngắn hơn hoặc bằng u -> node -> v.
+        """
+        neighbors = list(adjacency[node].items())
+        shortcuts = []
+        
+        for i, (u, weight_u) in enumerate(neighbors):
+            targets = neighbors[i + 1:]
+            if not targets:
+                continue
+            limit = weight_u + max(weight for _, weight in targets)
+            witness = cls._witness_search(adjacency, u, node, limit)
+            
+            for v, weight_v in targets:
+                via_node = weight_u + weight_v
+                if witness.get(v, float("inf")) > via_node:
+                    shortcuts.append((u, v, via_node))
+        
+        return shortcuts
+    
+    @classmethod
+    def _witness_search(
+        cls,
+        adjacency: List[Dict[int, float]],
+        source: int,
+        excluded: int,
+        limit: float
+    ) -> Dict[int, float]:
+        """Dijkstra cục bộ từ ``source`` bỏ qua ``excluded``, giới hạn km và số đỉnh"""
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        settled = 0
+        
+        while heap and settled < cls.WITNESS_SETTLE_LIMIT:
+            distance, current = heapq.heappop(heap)
+            if distance > distances[current]:
+                continue
+            if distance > limit:
+                break
+            settled += 1
+            
+            for neighbor, weight in adjacency[current].items():
+                if neighbor == excluded:
+                    continue
+                new_distance = distance + weight
+                if new_distance < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = new_distance
+                    heapq.heappush(heap, (new_distance, neighbor))
+        
+        return distances
+    
+    def size(self) -> int:
+        return len(self._ranks)
+    
+    def get_codes(self) -> List[str]:
+        return list(self._codes)
+    
+    def shortcut_count(self) -> int:
+        return len(self._middles) // 2
+    
+    @property
+    def fingerprint(self) -> str:
+        return self._fingerprint
+    
+    def matches(
+        self,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> bool:
+        """CH được tiền xử lý trên đúng đồ thị (tỉnh, cạnh, trọng số) này?"""
+        return (
+            self._codes == graph.get_codes()
+            and self._fingerprint == self.graph_fingerprint(graph, distance_calculator)
+        )
+    
+    def query(
+        self,
+        start_code: str,
+        end_code: str
+    ) -> Tuple[Optional[List[str]], float, int]:
+        """Dijkstra hai chiều chỉ đi theo cạnh lên bậc cao hơn.
+
+        Returns:
+            Tuple (path, distance_km, nodes_expanded) với khoảng cách theo
+            RoadType.DEFAULT. ``path`` (mã tỉnh) đã được bung shortcut,
+            None nếu không có đường đi.
+        """
+        start, end = self._index[start_code], self._index[end_code]
+        if start == end:
+            return [start_code], 0.0, 0
+        
+        forward_distances: Dict[int, float] = {start: 0.0}
+        backward_distances: Dict[int, float] = {end: 0.0}
+        parents: Tuple[Dict[int, int], ...] = ({start: start}, {end: end})
+        forward_heap = [(0.0, start)]
+        backward_heap = [(0.0, end)]
+        upward_edges = self._upward
+        heappush, heappop = heapq.heappush, heapq.heappop
+        best = float("inf")
+        meeting = -1
+        nodes_expanded = 0
+        
+        while forward_heap or backward_heap:
+            # Mở rộng phía có khóa nhỏ hơn, dừng khi khóa nhỏ nhất >= best
+            forward_key = forward_heap[0][0] if forward_heap else best
+            backward_key = backward_heap[0][0] if backward_heap else best
+            if forward_key <= backward_key:
+                if forward_key >= best:
+                    break
+                distances, other, heap, side_parents = (
+                    forward_distances, backward_distances, forward_heap, parents[0]
+                )
+            else:
+                if backward_key >= best:
+                    break
+                distances, other, heap, side_parents = (
+                    backward_distances, forward_distances, backward_heap, parents[1]
+                )
+            
+            distance, current = heappop(heap)
+            if distance > distances[current]:
+                continue
+            nodes_expanded += 1
+            
+            other_distance = other.get(current)
+            if other_distance is not None and distance + other_distance < best:
+                best = distance + other_distance
+                meeting = current
+            
+            # Stall-on-demand: đỉnh bậc cao hơn đã cho đường ngắn hơn tới
+            # current thì current không nằm trên đường tối ưu, bỏ qua
+            upward = upward_edges[current]
+            stalled = False
+            for neighbor, weight in upward:
+                known = distances.get(neighbor)
+                if known is not None and known + weight < distance:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            
+            for neighbor, weight in upward:
+                new_distance = distance + weight
+                known = distances.get(neighbor)
+                if known is None or new_distance < known:
+                    distances[neighbor] = new_distance
+                    side_parents[neighbor] = current
+                    heappush(heap, (new_distance, neighbor))
+        
+        if meeting == -1:
+            return None, 0.0, nodes_expanded
+        
+        # Đường đi trên đồ thị CH: start -> meeting -> end
+        packed = [meeting]
+        node = meeting
+        while parents[0][node] != node:
+            node = parents[0][node]
+            packed.append(node)
+        packed.reverse()
+        node = meeting
+        while parents[1][node] != node:
+            node = parents[1][node]
+            packed.append(node)
+        
+        return [self._codes[i] for i in self._unpack(packed)], best, nodes_expanded
+    
+    def _unpack(self, packed: List[int]) -> List[int]:
+        """Thay mỗi shortcut bằng hai cạnh qua đỉnh giữa, lặp đến khi hết shortcut"""
+        path = [packed[0]]
+        stack = [(packed[i], packed[i + 1]) for i in range(len(packed) - 2, -1, -1)]
+        
+        while stack:
+            u, v = stack.pop()
+            middle = self._middles.get((u, v))
+            if middle is None:
+                path.append(v)
+            else:
+                stack.append((middle, v))
+                stack.append((u, middle))
+        
+        return path
+    
+    def save(self, file_path: str) -> None:
+        """Lưu kết quả tiền xử lý ra file JSON để nạp lại khi khởi động"""
+        data = {
+            "codes": self._codes,
+            "ranks": self._ranks,
+            "upward": [
+                [[neighbor, weight] for neighbor, weight in edges]
+                for edges in self._upward
+            ],
+            "middles": [
+                [u, v, middle] for (u, v), middle in self._middles.items() if u < v
+            ],
+            "fingerprint": self._fingerprint
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    
+    @classmethod
+    def load(cls, file_path: str) -> 'ContractionHierarchy':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        middles: Dict[Tuple[int, int], int] = {}
+        for u, v, middle in data["middles"]:
+            middles[(u, v)] = middle
+            middles[(v, u)] = middle
+        
+        return cls(
+            codes=data["codes"],
+            ranks=data["ranks"],
+            upward=[
+                [(neighbor, weight) for neighbor, weight in edges]
+                for edges in data["upward"]
+            ],
+            middles=middles,
+            fingerprint=data.get("fingerprint", "")
+        )
+
+
+class CHPathfinder:
+    """Trả lời truy vấn đường đi ngắn nhất theo km bằng ContractionHierarchy
+    gắn trên đồ thị. Nếu đồ thị chưa có (hoặc đã bị thay đổi), tự tiền xử lý lại;
+    chỉ một luồng tiền xử lý, các truy vấn đồng thời chờ kết quả đó.
+    """
+    
+    ALGORITHM = SearchAlgorithm.CONTRACTION_HIERARCHY
+
+    def __init__(
+        self,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> None:
+        if not graph.is_built():
+            raise GraphNotBuiltError()
+        
+        self.graph = graph
+        self.distance_calculator = distance_calculator
+        # Tránh nhiều request "ch" đồng thời cùng tiền xử lý (mỗi lần chiếm một worker)
+        self._build_lock = threading.Lock()
+    
+    def get_hierarchy(self) -> ContractionHierarchy:
+        hierarchy = self.graph.get_contraction_hierarchy()
+        if hierarchy is None:
+            with self._build_lock:
+                hierarchy = self.graph.get_contraction_hierarchy()
+                if hierarchy is None:
+                    hierarchy = ContractionHierarchy.build(
+                        self.graph, self.distance_calculator
+                    )
+                    self.graph.set_contraction_hierarchy(hierarchy)
+        return hierarchy
+    
+    def find_path(
+        self,
+        start_code: str,
+        end_code: str,
+        road_type: RoadType = RoadType.NATIONAL
+    ) -> PathResult:
+        """Tìm đường đi ngắn nhất (theo km ước lượng) giữa hai tỉnh bằng CH."""
+        start_time = time.perf_counter()
+        
+        start_province = self.graph.get_province(start_code)
+        if not start_province:
+            raise ValueError(f"Tỉnh bắt đầu {start_code} không có trong đồ thị")
+        
+        end_province = self.graph.get_province(end_code)
+        if not end_province:
+            raise ValueError(f"Tỉnh kết thúc {end_code} không có trong đồ thị")
+        
+        if not self.graph.same_component(start_code, end_code):
+            raise NoPathFoundError(
+                start=start_province.name,
+                end=end_province.name,
+                reason="Hai tỉnh không liên thông với nhau"
+            )
+        
+        path, distance_km, nodes_expanded = self.get_hierarchy().query(
+            start_code, end_code
+        )
+        
+        if path is None:
+            raise NoPathFoundError(
+                start=start_province.name,
+                end=end_province.name,
+                reason="Hai tỉnh không liên thông với nhau"
+            )
+        
+        factor = self.distance_calculator.ROAD_ADJUSTMENT_FACTORS.get(
+            road_type,
+            self.distance_calculator.ROAD_ADJUSTMENT_FACTORS[RoadType.UNKNOWN]
+        )
+        execution_time = time.perf_counter() - start_time
+        
+        return PathResult(
+            path=[self.graph.get_province(code) for code in path],
+            start=start_province,
+            end=end_province,
+            execution_time=execution_time,
+            total_distance_km=distance_km * factor,
+            road_type=road_type.value,
+            algorithm=self.ALGORITHM.value,
+            nodes_expanded=nodes_expanded
+        )
@@ -0,0 +1,184 @@
+"""Thuật toán Dijkstra tìm đường đi ngắn nhất theo km ước lượng.
+"""
+
+import heapq
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from graph.csr import CSRAdjacency
+from graph.edge_weights import EdgeWeights
+from graph.province_graph import ProvinceGraph
+from models.path_result import PathResult
+from models.road_segment import RoadType
+from models.search_algorithm import SearchAlgorithm
+from models.exceptions import GraphNotBuiltError, NoPathFoundError
+
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
+
+class DijkstraPathfinder:
+    """
+    Tìm đường đi ngắn nhất theo km trên đồ thị có trọng số.
+    
+    Trọng số cạnh = khoảng cách Haversine x hệ số ROAD_ADJUSTMENT_FACTORS
+    của loại đường, dùng hàng đợi ưu tiên (binary heap). Duyệt trên bản
+    CSR của đồ thị, trọng số lấy từ EdgeWeights gắn trên đồ thị (mảng
+    song song với ``csr.targets``).
+    """
+    
+    ALGORITHM = SearchAlgorithm.DIJKSTRA
+
+    def __init__(
+        self,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> None:
+        if not graph.is_built():
+            raise GraphNotBuiltError()
+        
+        self.graph = graph
+        self.distance_calculator = distance_calculator
+    
+    def find_path(
+        self,
+        start_code: str,
+        end_code: str,
+        road_type: RoadType = RoadType.NATIONAL
+    ) -> PathResult:
+        """Tìm đường đi ngắn nhất (theo km ước lượng) giữa hai tỉnh.
+
+        Args:
+            start_code: Mã tỉnh bắt đầu.
+            end_code: Mã tỉnh kết thúc.
+            road_type: Loại đường dùng để tính trọng số cạnh.
+
+        Returns:
+            PathResult: Kết quả kèm ``total_distance_km`` và số đỉnh đã mở rộng.
+        """
+        start_time = time.perf_counter()
+        
+        start_province = self.graph.get_province(start_code)
+        if not start_province:
+            raise ValueError(f"Tỉnh bắt đầu {start_code} không có trong đồ thị")
+        
+        end_province = self.graph.get_province(end_code)
+        if not end_province:
+            raise ValueError(f"Tỉnh kết thúc {end_code} không có trong đồ thị")
+        
+        if not self.graph.same_component(start_code, end_code):
+            raise NoPathFoundError(
+                start=start_province.name,
+                end=end_province.name,
+                reason="Hai tỉnh không liên thông với nhau"
+            )
+        
+        csr = self.graph.get_csr()
+        path, distance_km, nodes_expanded = self._search(
+            csr.index[start_code], csr.index[end_code], road_type
+        )
+        
+        if path is None:
+            raise NoPathFoundError(
+                start=start_province.name,
+                end=end_province.name,
+                reason="Hai tỉnh không liên thông với nhau"
+            )
+        
+        execution_time = time.perf_counter() - start_time
+        
+        return PathResult(
+            path=[self.graph.get_province(code) for code in path],
+            start=start_province,
+            end=end_province,
+            execution_time=execution_time,
+            total_distance_km=distance_km,
+            road_type=road_type.value,
+            algorithm=self.ALGORITHM.value,
+            nodes_expanded=nodes_expanded
+        )
+    
+    def _search(
+        self,
+        start: int,
+        end: int,
+        road_type: RoadType
+    ) -> Tuple[Optional[List[str]], float, int]:
+        """Dijkstra với lazy deletion: bỏ qua phần tử cũ khi lấy ra khỏi heap.
+
+        Khóa trong heap là ``khoảng cách đã đi + _heuristic``; lớp con có thể
+        thay ``_heuristic`` để thành A*.
+
+        Returns:
+            Tuple (path, distance_km, nodes_expanded). ``path`` là None nếu
+            không có đường đi.
+        """
+        csr = self.graph.get_csr()
+        offsets, targets = csr.offsets, csr.targets_view
+        weights = memoryview(self._get_edge_weights(road_type))
+        
+        distances: Dict[int, float] = {start: 0.0}
+        parents: Dict[int, int] = {start: start}
+        settled: Set[int] = set()
+        heap: List[Tuple[float, int]] = [(self._heuristic(start, end, road_type), start)]
+        nodes_expanded = 0
+        
+        while heap:
+            _, current = heapq.heappop(heap)
+            if current in settled:
+                continue
+            settled.add(current)
+            
+            if current == end:
+                return (
+                    self._reconstruct_path(csr, parents, end),
+                    distances[end],
+                    nodes_expanded
+                )
+            
+            nodes_expanded += 1
+            current_distance = distances[current]
+            
+            begin, stop = offsets[current], offsets[current + 1]
+            for neighbor, weight in zip(targets[begin:stop], weights[begin:stop]):
+                if neighbor in settled:
+                    continue
+                new_distance = current_distance + weight
+                if new_distance < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = current
+                    heapq.heappush(
+                        heap,
+                        (new_distance + self._heuristic(neighbor, end, road_type), neighbor)
+                    )
+        
+        return None, 0.0, nodes_expanded
+    
+    def _heuristic(self, node: int, end: int, road_type: RoadType) -> float:
+        """Ước lượng km còn lại tới đích. Dijkstra thuần: luôn bằng 0"""
+        return 0.0
+    
+    def _get_edge_weights(self, road_type: RoadType) -> np.ndarray:
+        """Trọng số (km) của từng cạnh CSR, dùng chung mảng gắn trên đồ thị"""
+        edge_weights = EdgeWeights.for_graph(self.graph, self.distance_calculator)
+        if edge_weights.missing_count():
+            raise ValueError(
+                f"Missing coordinates for {edge_weights.missing_count()} edges"
+            )
+        return edge_weights.for_road_type(road_type)
+    
+    @staticmethod
+    def _reconstruct_path(
+        csr: CSRAdjacency,
+        parents: Dict[int, int],
+        end: int
+    ) -> List[str]:
+        path = [csr.codes[end]]
+        current = end
+        while parents[current] != current:
+            current = parents[current]
+            path.append(csr.codes[current])
+        path.reverse()
+        return path
@@ -0,0 +1,162 @@
+"""Ma trận khoảng cách điểm đi - điểm đến (origin-destination) theo BFS.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from graph.edge_weights import EdgeWeights
+from graph.province_graph import ProvinceGraph
+from models.province import Province
+from models.road_segment import RoadType
+from models.exceptions import GraphNotBuiltError
+
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
+
+@dataclass
+class ODMatrix:
+    """Ma trận N điểm đi x M điểm đến
+
+    Attributes:
+        hops: Số cạnh (bước) của đường đi BFS, -1 nếu không liên thông
+        distances_km: Km ước lượng dọc đường đi BFS theo ``road_type``,
+                      NaN nếu không liên thông hoặc thiếu tọa độ
+    """
+    origins: List[Province]
+    destinations: List[Province]
+    hops: np.ndarray
+    distances_km: np.ndarray
+    road_type: RoadType
+    execution_time: float = 0.0
+
+    def to_dict(self) -> Dict:
+        distances = np.round(self.distances_km, 2)
+        return {
+            "origins": [{"code": p.code, "name": p.name} for p in self.origins],
+            "destinations": [{"code": p.code, "name": p.name} for p in self.destinations],
+            "road_type": self.road_type.value,
+            "hop_matrix": [
+                [None if h < 0 else int(h) for h in row]
+                for row in self.hops
+            ],
+            "distance_km_matrix": [
+                [None if d != d else float(d) for d in row]
+                for row in distances
+            ],
+            "execution_time_ms": self.execution_time * 1000
+        }
+
+
+class ODMatrixBuilder:
+    """
+    Tính ma trận OD bằng một cây BFS cho mỗi điểm đi.
+
+    Khi duyệt, mỗi đỉnh lưu cả đỉnh cha lẫn vị trí cạnh cha trong CSR. Km
+    tới mọi đỉnh được cộng dồn theo từng tầng BFS bằng NumPy từ mảng trọng
+    số cạnh tính trước (EdgeWeights).
+
+    Đường đi dùng chung cây BFS như find_paths_from (/path/batch) nên km
+    khớp với kết quả batch. Khi có nhiều đường cùng số bước, /path/find
+    (tra bảng HopDistanceTable) có thể chọn đường khác nên km có thể lệch.
+    """
+
+    UNVISITED = -1
+
+    def __init__(
+        self,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> None:
+        if not graph.is_built():
+            raise GraphNotBuiltError()
+
+        self.graph = graph
+        self.distance_calculator = distance_calculator
+
+    def build(
+        self,
+        origin_codes: List[str],
+        destination_codes: List[str],
+        road_type: RoadType = RoadType.NATIONAL
+    ) -> ODMatrix:
+        start_time = time.perf_counter()
+
+        for code in [*origin_codes, *destination_codes]:
+            if not self.graph.has_province(code):
+                raise ValueError(f"Tỉnh {code} không có trong đồ thị")
+
+        csr = self.graph.get_csr()
+        weights = EdgeWeights.for_graph(
+            self.graph, self.distance_calculator
+        ).for_road_type(road_type)
+        columns = np.array([csr.index[code] for code in destination_codes], dtype=np.intp)
+
+        hops = np.full((len(origin_codes), len(destination_codes)), -1, dtype=np.int32)
+        distances = np.full((len(origin_codes), len(destination_codes)), np.nan)
+
+        # Điểm đi trùng nhau chỉ duyệt một lần
+        rows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for row, code in enumerate(origin_codes):
+            if code not in rows:
+                rows[code] = self._distances_from(csr.index[code], weights)
+            depth, km = rows[code]
+            hops[row] = depth[columns]
+            distances[row] = km[columns]
+
+        return ODMatrix(
+            origins=[self.graph.get_province(code) for code in origin_codes],
+            destinations=[self.graph.get_province(code) for code in destination_codes],
+            hops=hops,
+            distances_km=distances,
+            road_type=road_type,
+            execution_time=time.perf_counter() - start_time
+        )
+
+    def _distances_from(
+        self,
+        start: int,
+        weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Một lượt BFS từ ``start``: (số cạnh, km dọc cây BFS) tới mọi đỉnh"""
+        csr = self.graph.get_csr()
+        offsets, targets = csr.offsets, csr.targets_view
+        size = csr.size()
+
+        parents = [self.UNVISITED] * size
+        parent_edges = [self.UNVISITED] * size
+        parents[start] = start
+        # Các tầng BFS (chỉ số đỉnh), tầng 0 là gốc
+        levels: List[List[int]] = []
+
+        frontier = [start]
+        while frontier:
+            next_frontier: List[int] = []
+            for current in frontier:
+                for k in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[k]
+                    if parents[neighbor] == -1:
+                        parents[neighbor] = current
+                        parent_edges[neighbor] = k
+                        next_frontier.append(neighbor)
+            if next_frontier:
+                levels.append(next_frontier)
+            frontier = next_frontier
+
+        depth = np.full(size, -1, dtype=np.int32)
+        km = np.full(size, np.nan)
+        depth[start] = 0
+        km[start] = 0.0
+
+        parents_array = np.array(parents, dtype=np.intp)
+        edges_array = np.array(parent_edges, dtype=np.intp)
+        # Tầng d chỉ phụ thuộc tầng d - 1 nên cộng dồn cả tầng một lượt
+        for level_depth, level in enumerate(levels, start=1):
+            nodes = np.array(level, dtype=np.intp)
+            depth[nodes] = level_depth
+            km[nodes] = km[parents_array[nodes]] + weights[edges_array[nodes]]
+
+        return depth, km
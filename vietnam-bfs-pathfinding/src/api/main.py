@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import sys
 from pathlib import Path
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Dict, Optional
 
 project_root = Path(__file__).parent.parent.parent
 src_root = project_root / "src"
@@ -17,9 +18,11 @@ from fastapi.exceptions import RequestValidationError
 from config.settings import get_settings
 from data.data_loader import DataLoader
 from models.province import ProvinceRegistry
+from models.exceptions import ServiceOverloadedError
 from services.pathfinding_service import PathfindingService
+from services.warmup import WarmupReport, parse_pairs, select_pairs, warm_up
 from api.routes import path_routes, province_routes
-from api.schemas import HealthResponse
+from api.schemas import HealthResponse, ReadinessResponse
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +31,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 _service: PathfindingService = None
+# Warm-up chạy nền sau khi khởi động; /ready trả 503 cho tới khi xong
+_warmup_task: Optional[asyncio.Task] = None
+_warmup_report: Optional[WarmupReport] = None
 
 
 def get_pathfinding_service() -> PathfindingService:
@@ -38,12 +44,56 @@ def get_pathfinding_service() -> PathfindingService:
     return _service
 
 
+async def _run_warmup(service: PathfindingService, settings) -> None:
+    """Làm nóng cache khi khởi động
+    
+    1. Km thực tế theo cạnh từ ORS Matrix API (nếu ORS_PREFETCH_EDGE_DISTANCES),
+       tối đa WARMUP_TIMEOUT_SECONDS
+    2. Các cặp tỉnh cấu hình sẵn + hay được hỏi ở lần chạy trước (nếu WARMUP_ENABLED)
+    """
+    global _warmup_report
+    
+    if settings.ors_prefetch_edge_distances:
+        try:
+            # ORS chậm / treo không được giữ API ở trạng thái warming_up mãi
+            await asyncio.wait_for(
+                service.prefetch_real_edge_distances_async(),
+                timeout=settings.warmup_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Edge distance prefetch timed out after "
+                f"{settings.warmup_timeout_seconds}s"
+            )
+        except Exception as e:
+            logger.error(f"Edge distance prefetch failed: {e}", exc_info=True)
+    
+    if not settings.warmup_enabled:
+        return
+    
+    pairs = select_pairs(
+        parse_pairs(settings.warmup_pairs),
+        service.access_stats.top(settings.warmup_top_n)
+    )
+    logger.info(f"Warming up {len(pairs)} province pairs...")
+    try:
+        _warmup_report = await warm_up(
+            service,
+            pairs,
+            concurrency=settings.warmup_concurrency,
+            timeout=settings.warmup_timeout_seconds
+        )
+    except Exception as e:
+        # Warm-up lỗi không được chặn server: vẫn báo ready, chỉ là cache nguội
+        logger.error(f"Warm-up failed: {e}", exc_info=True)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
     logger.info("Starting up Finding Distance API...")
     
-    global _service
+    global _service, _warmup_task, _warmup_report
     
     try:
         # Load settings
@@ -72,6 +122,9 @@ async def lifespan(app: FastAPI):
         logger.info("Creating pathfinding service...")
         _service = PathfindingService(registry)
         
+        if settings.warmup_enabled or settings.ors_prefetch_edge_distances:
+            _warmup_task = asyncio.create_task(_run_warmup(_service, settings))
+        
         logger.info(
             f"API started successfully with {registry.count()} provinces"
             f"\nURl:      localhost:{settings.api_port}/docs#/"
@@ -85,6 +138,13 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down Finding Distance API...")
+        if _warmup_task is not None and not _warmup_task.done():
+            _warmup_task.cancel()
+            await asyncio.gather(_warmup_task, return_exceptions=True)
+        _warmup_task = None
+        _warmup_report = None
+        if _service is not None:
+            await _service.aclose()
         _service = None
 
 
@@ -132,7 +192,11 @@ async def health_check() -> Dict:
             "status": "healthy",
             "version": "1.0.0",
             "total_provinces": province_count,
-            "graph_status": "built"
+            "graph_status": "built",
+            "route_cache": service.get_cache_stats(),
+            "executor": service.get_executor_stats(),
+            "routing": service.get_routing_stats(),
+            "pending_routes": service.get_pending_stats()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -144,6 +208,30 @@ async def health_check() -> Dict:
             }
         )
 
+
+@app.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Readiness check",
+    description="Sẵn sàng nhận traffic: service đã khởi tạo và warm-up cache đã xong (hoặc hết giờ)",
+    tags=["system"],
+    responses={503: {"model": ReadinessResponse}}
+)
+async def readiness_check() -> Dict:
+
+    warmup_pending = _warmup_task is not None and not _warmup_task.done()
+    if _service is None or warmup_pending:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up", "warmup": None}
+        )
+    
+    return {
+        "status": "ready",
+        "warmup": _warmup_report.to_dict() if _warmup_report else None
+    }
+
 # Error handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc: RequestValidationError):
@@ -196,6 +284,20 @@ async def http_exception_handler(request, exc: HTTPException):
     )
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def overloaded_exception_handler(request, exc: ServiceOverloadedError):
+    """Thread pool đã đầy: trả 503 để client thử lại thay vì xếp hàng vô hạn."""
+    logger.warning(f"Rejecting request, executor saturated: {exc.pending}/{exc.capacity}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "error": "ServiceOverloaded",
+            "message": exc.message
+        }
+    )
+
+
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     logger.error(f"Internal server error: {exc}", exc_info=True)
@@ -1,11 +1,17 @@
+import json
 import logging
-from typing import Dict, Any, Coroutine
+from typing import AsyncIterator, Dict, Any, Coroutine
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 
 from api.schemas import (
+    BatchPathRequest,
+    MatrixRequest,
+    MatrixResponse,
     PathRequest,
     PathResponse,
+    RealDistanceResponse,
     ReachableRequest,
     ReachableProvinceSchema,
     ConnectivityRequest,
@@ -58,14 +64,19 @@ async def find_path(
     try:
         logger.info(
             f"Finding path: {request.start} -> {request.end}, "
-            f"road_type={request.road_type}"
+            f"road_type={request.road_type}, algorithm={request.algorithm}"
         )
         
-        result = service.find_path(
+        result = await service.find_path_async(
             request.start,
             request.end,
             fuzzy_match=request.fuzzy_match,
-            road_type=request.road_type
+            road_type=request.road_type,
+            algorithm=request.algorithm,
+            latency_budget=(
+                request.latency_budget_ms / 1000
+                if request.latency_budget_ms is not None else None
+            )
         )
         
         response = result.to_dict()
@@ -95,6 +106,130 @@ async def find_path(
         )
 
 
+@router.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Tìm đường hàng loạt (NDJSON)",
+    description=(
+        "Tìm đường BFS cho nhiều cặp tỉnh, dùng chung một cây BFS cho mỗi tỉnh "
+        "xuất phát. Kết quả được stream dạng NDJSON (mỗi dòng một cặp, có "
+        "trường index theo thứ tự request) ngay khi có khoảng cách ORS, nên "
+        "thứ tự các dòng có thể khác thứ tự request. Cặp lỗi trả về dòng có "
+        "trường error thay vì result."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Mỗi dòng: {index, start, end, result} hoặc {index, start, end, error}",
+            "content": {"application/x-ndjson": {}}
+        },
+        422: {
+            "description": "Dữ liệu đầu vào không hợp lệ",
+            "model": ErrorResponse
+        }
+    }
+)
+async def find_paths_batch(
+    request: BatchPathRequest,
+    service: PathfindingService = Depends(get_service)
+) -> StreamingResponse:
+    logger.info(f"Batch pathfinding: {len(request.pairs)} pairs")
+    
+    try:
+        items = await service.estimate_paths_batch_async(
+            [(pair.start, pair.end) for pair in request.pairs],
+            fuzzy_match=request.fuzzy_match,
+            road_type=request.road_type
+        )
+    except InvalidInputError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    async def stream() -> AsyncIterator[str]:
+        async for item in service.iter_batch_results(items):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/matrix",
+    response_model=MatrixResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ma trận khoảng cách điểm đi - điểm đến",
+    description=(
+        "Ma trận số bước và km ước lượng (theo road_type) giữa N tỉnh điểm đi "
+        "và M tỉnh điểm đến, mỗi điểm đi chỉ duyệt một cây BFS"
+    ),
+    responses={
+        404: {
+            "description": "Không tìm thấy tỉnh",
+            "model": ErrorResponse
+        },
+        422: {
+            "description": "Dữ liệu đầu vào không hợp lệ",
+            "model": ErrorResponse
+        }
+    }
+)
+async def build_matrix(
+    request: MatrixRequest,
+    service: PathfindingService = Depends(get_service)
+) -> Dict:
+    try:
+        logger.info(
+            f"Building OD matrix: {len(request.origins)}x{len(request.destinations)}, "
+            f"road_type={request.road_type}"
+        )
+        
+        matrix = await service.build_od_matrix_async(
+            request.origins,
+            request.destinations,
+            fuzzy_match=request.fuzzy_match,
+            road_type=request.road_type
+        )
+        return matrix.to_dict()
+        
+    except ProvinceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except InvalidInputError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/real-distance/{token}",
+    response_model=RealDistanceResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Lấy khoảng cách thực tế đang chờ",
+    description="Khoảng cách ORS của một request /path/find đã trả về sớm do hết latency_budget_ms",
+    responses={
+        404: {
+            "description": "Token không tồn tại hoặc đã hết hạn",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_real_distance(
+    token: str,
+    service: PathfindingService = Depends(get_service)
+) -> Dict:
+    pending = service.get_pending_real_distance(token)
+    if pending is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Token '{token}' không tồn tại hoặc đã hết hạn"
+        )
+    return pending
+
+
 @router.post(
     "/reachable",
     response_model=Dict[str, ReachableProvinceSchema],
@@ -111,7 +246,7 @@ async def find_reachable(
     service: PathfindingService = Depends(get_service)
 ) -> Dict:
     try:
-        results = service.find_reachable(
+        results = await service.find_reachable_async(
             start=request.start,
             max_distance=request.max_distance,
             fuzzy_match=request.fuzzy_match
@@ -159,10 +294,10 @@ async def check_connectivity(
         )
         
         # Get province info
-        p1_info = service.get_province_info(request.province1)
-        p2_info = service.get_province_info(request.province2)
+        p1_info = await service.get_province_info_async(request.province1)
+        p2_info = await service.get_province_info_async(request.province2)
         
-        connected = service.check_connectivity(
+        connected = await service.check_connectivity_async(
             request.province1,
             request.province2
         )
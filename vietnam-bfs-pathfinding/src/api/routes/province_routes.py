@@ -9,7 +9,11 @@ from api.schemas import (
     ErrorResponse
 )
 from services.pathfinding_service import PathfindingService
-from models.exceptions import ProvinceNotFoundError, InvalidInputError
+from models.exceptions import (
+    ProvinceNotFoundError,
+    InvalidInputError,
+    ServiceOverloadedError
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +36,12 @@ async def get_all_provinces(
 ) -> List[Dict]:
     try:
         logger.info("Getting all provinces")
-        provinces = service.get_all_provinces()
+        provinces = await service.get_all_provinces_async()
         logger.info(f"Returned {len(provinces)} provinces")
         return provinces
         
+    except ServiceOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         raise HTTPException(
@@ -63,7 +69,7 @@ async def get_province(
 ) -> Dict:
     try:
         logger.info(f"Getting province info: {province_id}")
-        info = service.get_province_info(province_id)
+        info = await service.get_province_info_async(province_id)
         logger.info(f"Found province: {info['name']}")
         return info
         
@@ -78,6 +84,8 @@ async def get_province(
                 "suggestions": e.suggestions
             }
         )
+    except ServiceOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         raise HTTPException(
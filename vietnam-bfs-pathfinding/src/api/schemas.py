@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
 
@@ -75,6 +75,16 @@ class PathRequest(BaseModel):
         default="national",
         description="Loại đường: default (khoảng cách theo BFS), highway (cao tốc), national (quốc lộ), provincial (tỉnh lộ)"
     )
+    algorithm: Optional[str] = Field(
+        default="bfs",
+        description="Thuật toán: bfs (BFS một chiều), bidirectional_bfs (BFS hai chiều) - ít tỉnh nhất; dijkstra, astar, ch (Contraction Hierarchies) - ít km nhất theo road_type"
+    )
+    latency_budget_ms: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=60000,
+        description="Thời gian tối đa (ms) chờ khoảng cách thực tế từ ORS. Quá hạn thì trả về ngay kèm real_distance_token để lấy sau qua GET /path/real-distance/{token}; bỏ trống = chờ đến khi xong"
+    )
     
     @field_validator('start', 'end')
     @classmethod
@@ -93,13 +103,25 @@ class PathRequest(BaseModel):
             raise ValueError(f"road_type phải là một trong: {', '.join(allowed)}")
         return v.lower()
     
+    @field_validator('algorithm')
+    @classmethod
+    def validate_algorithm(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return "bfs"
+        allowed = ["bfs", "bidirectional_bfs", "dijkstra", "astar", "ch"]
+        if v.lower() not in allowed:
+            raise ValueError(f"algorithm phải là một trong: {', '.join(allowed)}")
+        return v.lower()
+    
     model_config = {
         "json_schema_extra": {
             "example": {
                 "start": "Hà Nội",
                 "end": "Hồ Chí Minh",
                 "fuzzy_match": True,
-                "road_type": "national"
+                "road_type": "national",
+                "algorithm": "bfs",
+                "latency_budget_ms": 200
             }
         }
     }
@@ -138,7 +160,12 @@ class PathResponse(BaseModel):
     distance: int = Field(..., description="Số lượng tỉnh trong đường đi")
     total_distance_km: float = Field(0.0, description="Tổng khoảng cách đường bộ ước lượng (km) - tính bằng tổng khoảng cách các đỉnh kề nhau")
     real_distance_km: Optional[float] = Field(None, description="Khoảng cách thực tế theo đường đi (km) - từ OSRM/OpenStreetMap")
+    real_distance_pending: bool = Field(False, description="ORS chưa trả lời trong latency_budget_ms, real_distance_km sẽ có sau")
+    real_distance_token: Optional[str] = Field(None, description="Token để lấy real_distance_km qua GET /path/real-distance/{token}")
     road_type: Optional[str] = Field(None, description="Loại đường được chọn")
+    algorithm: Optional[str] = Field(None, description="Thuật toán tìm đường đã dùng")
+    nodes_expanded: int = Field(0, description="Số đỉnh đã mở rộng khi tìm kiếm (0 nếu lấy từ cache)")
+    cached: bool = Field(False, description="Kết quả lấy từ route cache, không tìm kiếm lại")
     start_province: dict = Field(..., description="Thông tin tỉnh bắt đầu với tọa độ")
     end_province: dict = Field(..., description="Thông tin tỉnh kết thúc với tọa độ")
     execution_time_ms: float = Field(..., description="Thời gian tìm kiếm (ms)")
@@ -161,6 +188,9 @@ class PathResponse(BaseModel):
                 "total_distance_km": 180.5,
                 "real_distance_km": 195.3,
                 "road_type": "national",
+                "algorithm": "bfs",
+                "nodes_expanded": 12,
+                "cached": False,
                 "start_province": {
                     "code": "01",
                     "name": "Hà Nội",
@@ -186,6 +216,129 @@ class PathResponse(BaseModel):
     }
 
 
+class PathPairSchema(BaseModel):
+
+    start: str = Field(..., description="Tỉnh bắt đầu (mã hoặc tên)", min_length=1)
+    end: str = Field(..., description="Tỉnh kết thúc (mã hoặc tên)", min_length=1)
+
+
+class BatchPathRequest(BaseModel):
+
+    pairs: List[PathPairSchema] = Field(
+        ...,
+        description="Danh sách cặp tỉnh cần tìm đường",
+        min_length=1
+    )
+    fuzzy_match: bool = Field(
+        default=True,
+        description="Cho phép tìm kiếm gần đúng"
+    )
+    road_type: Optional[str] = Field(
+        default="national",
+        description="Loại đường dùng để ước lượng km: default, highway, national, provincial"
+    )
+    
+    @field_validator('road_type')
+    @classmethod
+    def validate_road_type(cls, v: Optional[str]) -> Optional[str]:
+        return PathRequest.validate_road_type(v)
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "pairs": [
+                    {"start": "Hà Nội", "end": "Hồ Chí Minh"},
+                    {"start": "01", "end": "48"},
+                    {"start": "Sài Gòn", "end": "Huế"}
+                ],
+                "fuzzy_match": True,
+                "road_type": "national"
+            }
+        }
+    }
+
+
+class MatrixRequest(BaseModel):
+
+    origins: List[str] = Field(
+        ...,
+        description="Danh sách tỉnh điểm đi (mã hoặc tên)",
+        min_length=1
+    )
+    destinations: List[str] = Field(
+        ...,
+        description="Danh sách tỉnh điểm đến (mã hoặc tên)",
+        min_length=1
+    )
+    fuzzy_match: bool = Field(
+        default=True,
+        description="Cho phép tìm kiếm gần đúng"
+    )
+    road_type: Optional[str] = Field(
+        default="national",
+        description="Loại đường dùng để ước lượng km: default, highway, national, provincial"
+    )
+    
+    @field_validator('road_type')
+    @classmethod
+    def validate_road_type(cls, v: Optional[str]) -> Optional[str]:
+        return PathRequest.validate_road_type(v)
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "origins": ["Hà Nội", "Đà Nẵng"],
+                "destinations": ["Hồ Chí Minh", "Huế", "Cần Thơ"],
+                "fuzzy_match": True,
+                "road_type": "national"
+            }
+        }
+    }
+
+
+class MatrixResponse(BaseModel):
+
+    origins: List[Dict[str, str]] = Field(..., description="Tỉnh điểm đi (mã, tên) theo thứ tự hàng")
+    destinations: List[Dict[str, str]] = Field(..., description="Tỉnh điểm đến (mã, tên) theo thứ tự cột")
+    road_type: str = Field(..., description="Loại đường dùng để ước lượng km")
+    hop_matrix: List[List[Optional[int]]] = Field(..., description="Số bước (cạnh) của đường đi BFS, null nếu không liên thông")
+    distance_km_matrix: List[List[Optional[float]]] = Field(..., description="Km ước lượng dọc đường đi BFS, null nếu không liên thông hoặc thiếu tọa độ")
+    execution_time_ms: float = Field(..., description="Thời gian tính ma trận (ms)")
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "origins": [{"code": "01", "name": "Hà Nội"}],
+                "destinations": [
+                    {"code": "79", "name": "Hồ Chí Minh"},
+                    {"code": "46", "name": "Huế"}
+                ],
+                "road_type": "national",
+                "hop_matrix": [[9, 5]],
+                "distance_km_matrix": [[1612.45, 712.3]],
+                "execution_time_ms": 0.42
+            }
+        }
+    }
+
+
+class RealDistanceResponse(BaseModel):
+
+    token: str = Field(..., description="Token nhận được từ /path/find")
+    status: str = Field(..., description="pending (ORS chưa trả lời), ready, unavailable (ORS lỗi)")
+    real_distance_km: Optional[float] = Field(None, description="Khoảng cách thực tế (km) khi status = ready")
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "token": "9f2c4e1a7b3d4c5e8f6a0b1c2d3e4f5a",
+                "status": "ready",
+                "real_distance_km": 1952.8
+            }
+        }
+    }
+
+
 class SearchRequest(BaseModel):
 
     query: str = Field(
@@ -356,6 +509,22 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="Phiên bản API")
     total_provinces: int = Field(..., description="Tổng số tỉnh")
     graph_status: str = Field(..., description="Trạng thái đồ thị")
+    route_cache: Optional[Dict] = Field(
+        None,
+        description="Thống kê cache kết quả tìm đường (hits/misses/evictions)"
+    )
+    executor: Optional[Dict] = Field(
+        None,
+        description="Thống kê thread pool xử lý request (đang chạy, hàng đợi, từ chối)"
+    )
+    routing: Optional[Dict] = Field(
+        None,
+        description="Trạng thái gọi ORS (circuit breaker: closed / open / half_open)"
+    )
+    pending_routes: Optional[Dict] = Field(
+        None,
+        description="Khoảng cách ORS còn chạy nền của các request đã trả về sớm (latency budget)"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -363,7 +532,77 @@ class HealthResponse(BaseModel):
                 "status": "healthy",
                 "version": "1.0.0",
                 "total_provinces": 34,
-                "graph_status": "built"
+                "graph_status": "built",
+                "route_cache": {
+                    "hits": 120,
+                    "misses": 30,
+                    "evictions": 0,
+                    "expirations": 2,
+                    "hit_rate": 0.8,
+                    "size": 28,
+                    "max_size": 1024,
+                    "ttl_seconds": 3600.0
+                },
+                "executor": {
+                    "max_workers": 8,
+                    "max_queue_size": 64,
+                    "active": 1,
+                    "queued": 0,
+                    "peak_pending": 12,
+                    "saturation": 0.0139,
+                    "completed": 150,
+                    "failed": 3,
+                    "rejected": 0,
+                    "avg_queue_wait_ms": 0.05,
+                    "avg_run_ms": 0.4
+                },
+                "routing": {
+                    "circuit_breaker": {
+                        "state": "closed",
+                        "consecutive_failures": 0,
+                        "failure_threshold": 5,
+                        "recovery_timeout": 30.0,
+                        "retry_in_seconds": None,
+                        "times_opened": 0,
+                        "short_circuited": 0,
+                        "total_failures": 0,
+                        "total_successes": 42
+                    },
+                    "single_flight": {
+                        "sync": {"executed": 0, "coalesced": 0, "in_flight": 0},
+                        "async": {"executed": 40, "coalesced": 25, "in_flight": 1}
+                    }
+                },
+                "pending_routes": {
+                    "size": 3,
+                    "pending": 1,
+                    "registered": 17,
+                    "evicted": 0
+                }
+            }
+        }
+    }
+
+
+class ReadinessResponse(BaseModel):
+
+    status: str = Field(..., description="ready / warming_up")
+    warmup: Optional[Dict] = Field(
+        None,
+        description="Kết quả warm-up cache (None khi warm-up bị tắt hoặc chưa xong)"
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "ready",
+                "warmup": {
+                    "requested": 20,
+                    "warmed": 19,
+                    "failed": 1,
+                    "timed_out": False,
+                    "elapsed_seconds": 2.314
+                }
             }
         }
     }
@@ -1,7 +1,11 @@
 from .province_graph import ProvinceGraph
 from .graph_builder import GraphBuilder
+from .hop_table import HopDistanceTable
+from .edge_weights import EdgeWeights
 
 __all__ = [
     "ProvinceGraph",
-    "GraphBuilder"
+    "GraphBuilder",
+    "HopDistanceTable",
+    "EdgeWeights"
 ]
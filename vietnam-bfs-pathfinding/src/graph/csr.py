@@ -0,0 +1,65 @@
+from array import array
+from typing import Dict, List
+
+
+class CSRAdjacency:
+    """
+    Danh sách kề dạng CSR (compressed sparse row) của đồ thị đã xây dựng.
+    
+    Mỗi tỉnh được gán một chỉ số nguyên 0..N-1. Láng giềng của đỉnh ``i``
+    là ``targets[offsets[i]:offsets[i + 1]]``. Hai mảng int32 liên tục nên
+    các thuật toán duyệt chỉ làm việc với số nguyên, không băm chuỗi.
+    """
+
+    def __init__(
+        self,
+        codes: List[str],
+        offsets: array,
+        targets: array
+    ) -> None:
+        if len(offsets) != len(codes) + 1:
+            raise ValueError("CSR offsets must have N + 1 entries")
+        if offsets[-1] != len(targets):
+            raise ValueError("CSR offsets do not match targets length")
+        
+        # Ánh xạ chỉ số <-> mã tỉnh
+        self.codes = codes
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(codes)}
+        self.offsets = offsets
+        self.targets = targets
+        # View chỉ đọc trên targets: cắt lát không sao chép dữ liệu
+        self.targets_view = memoryview(targets).toreadonly()
+    
+    @classmethod
+    def from_adjacency(
+        cls,
+        adjacency_list: Dict[str, List[str]]
+    ) -> 'CSRAdjacency':
+        """Đóng băng danh sách kề {mã: [mã_kề]} thành CSR, giữ thứ tự láng giềng"""
+        codes = list(adjacency_list.keys())
+        index = {code: i for i, code in enumerate(codes)}
+        
+        offsets = array('i', [0])
+        targets = array('i')
+        for code in codes:
+            targets.extend(index[neighbor] for neighbor in adjacency_list[code])
+            offsets.append(len(targets))
+        
+        return cls(codes, offsets, targets)
+    
+    def size(self) -> int:
+        return len(self.codes)
+    
+    def neighbors(self, i: int) -> memoryview:
+        """Chỉ số các đỉnh kề với đỉnh ``i`` (memoryview chỉ đọc, không sao chép)"""
+        return self.targets_view[self.offsets[i]:self.offsets[i + 1]]
+    
+    def degree(self, i: int) -> int:
+        return self.offsets[i + 1] - self.offsets[i]
+    
+    def memory_bytes(self) -> int:
+        """Dung lượng của hai mảng CSR (không tính bảng ánh xạ mã tỉnh)"""
+        return (
+            self.offsets.itemsize * len(self.offsets) +
+            self.targets.itemsize * len(self.targets)
+        )
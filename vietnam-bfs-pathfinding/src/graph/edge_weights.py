@@ -0,0 +1,167 @@
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from graph.csr import CSRAdjacency
+from graph.province_graph import ProvinceGraph
+from models.road_segment import RoadType
+from models.exceptions import GraphNotBuiltError
+
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
+
+class EdgeWeights:
+    """
+    Trọng số (km ước lượng) của mọi cạnh, tính trước cho từng RoadType.
+
+    Mỗi loại đường là một mảng float64 song song với ``csr.targets``:
+    ``weights[k]`` là độ dài cạnh ``i -> targets[k]`` với
+    ``offsets[i] <= k < offsets[i + 1]``. Cạnh có tỉnh thiếu tọa độ mang
+    giá trị NaN.
+
+    Ngoài ra có một mảng km đường bộ thực tế (có hướng, từ ORS) cùng bố
+    cục, NaN ở cạnh chưa có dữ liệu.
+    """
+
+    def __init__(
+        self,
+        csr: CSRAdjacency,
+        weights: Dict[RoadType, np.ndarray]
+    ) -> None:
+        for road_type, values in weights.items():
+            if len(values) != len(csr.targets):
+                raise ValueError(
+                    f"Edge weights for {road_type.value} do not match CSR targets"
+                )
+            values.flags.writeable = False
+
+        self.csr = csr
+        self._weights = weights
+        self._real = np.full(len(csr.targets), np.nan)
+        self._missing = int(np.isnan(next(iter(weights.values()))).sum()) if weights else 0
+
+    @classmethod
+    def build(
+        cls,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> 'EdgeWeights':
+        """Đường chim bay của mọi cạnh một lượt (NumPy), nhân hệ số từng loại đường
+
+        Lấy từ ma trận khoảng cách đã tính trước của DistanceCalculator nếu
+        ma trận chứa mọi tỉnh của đồ thị, ngược lại tính Haversine theo cạnh.
+        """
+        if not graph.is_built():
+            raise GraphNotBuiltError()
+
+        csr = graph.get_csr()
+
+        # Đỉnh nguồn của từng cạnh: chỉ số i lặp lại degree(i) lần
+        sources = np.repeat(
+            np.arange(csr.size()),
+            np.diff(np.frombuffer(csr.offsets, dtype=np.intc))
+        )
+        targets = np.frombuffer(csr.targets, dtype=np.intc)
+
+        rows = distance_calculator.get_matrix_rows(csr.codes)
+        if rows is not None:
+            matrix = distance_calculator.get_distance_matrix()
+            straight = matrix[rows[sources], rows[targets]]
+        else:
+            provinces = [graph.get_province(code) for code in csr.codes]
+            latitudes = np.array(
+                [p.latitude if p.latitude is not None else np.nan for p in provinces],
+                dtype=np.float64
+            )
+            longitudes = np.array(
+                [p.longitude if p.longitude is not None else np.nan for p in provinces],
+                dtype=np.float64
+            )
+            straight = distance_calculator.haversine_vector(
+                latitudes[sources], longitudes[sources],
+                latitudes[targets], longitudes[targets]
+            )
+
+        factors = distance_calculator.ROAD_ADJUSTMENT_FACTORS
+        weights = {
+            road_type: straight * factors.get(road_type, factors[RoadType.UNKNOWN])
+            for road_type in RoadType
+        }
+        return cls(csr, weights)
+
+    @classmethod
+    def for_graph(
+        cls,
+        graph: ProvinceGraph,
+        distance_calculator: 'DistanceCalculator'
+    ) -> 'EdgeWeights':
+        """Trọng số đã gắn trên đồ thị, tính và gắn vào nếu chưa có hoặc đã cũ"""
+        weights = graph.get_edge_weights()
+        if weights is None:
+            weights = cls.build(graph, distance_calculator)
+            graph.set_edge_weights(weights)
+        return weights
+
+    def for_road_type(self, road_type: RoadType) -> np.ndarray:
+        """Mảng trọng số chỉ đọc của một loại đường"""
+        return self._weights[road_type]
+
+    def missing_count(self) -> int:
+        """Số cạnh không có trọng số do thiếu tọa độ"""
+        return self._missing
+
+    def edge_index(self, from_code: str, to_code: str) -> Optional[int]:
+        """Vị trí ``k`` của cạnh from -> to trong csr.targets, None nếu không kề"""
+        i = self.csr.index.get(from_code)
+        j = self.csr.index.get(to_code)
+        if i is None or j is None:
+            return None
+
+        targets = self.csr.targets
+        for k in range(self.csr.offsets[i], self.csr.offsets[i + 1]):
+            if targets[k] == j:
+                return k
+        return None
+
+    def weight(
+        self,
+        from_code: str,
+        to_code: str,
+        road_type: RoadType
+    ) -> Optional[float]:
+        """Độ dài cạnh giữa hai tỉnh kề, None nếu không phải cạnh hoặc thiếu tọa độ"""
+        k = self.edge_index(from_code, to_code)
+        if k is None:
+            return None
+        value = float(self._weights[road_type][k])
+        return None if value != value else value
+
+    def get_real_weights(self) -> np.ndarray:
+        """Bản sao mảng km thực tế theo cạnh (NaN = chưa có)"""
+        return self._real.copy()
+
+    def set_real_weights(self, values: np.ndarray) -> None:
+        if len(values) != len(self.csr.targets):
+            raise ValueError("Real edge weights do not match CSR targets")
+        self._real = np.asarray(values, dtype=np.float64).copy()
+
+    def real_count(self) -> int:
+        """Số cạnh (có hướng) đã có km thực tế"""
+        return int(np.count_nonzero(~np.isnan(self._real)))
+
+    def real_path_distance(self, codes: List[str]) -> Optional[float]:
+        """Tổng km thực tế dọc đường đi, None nếu có cạnh chưa có dữ liệu"""
+        total = 0.0
+        for from_code, to_code in zip(codes, codes[1:]):
+            k = self.edge_index(from_code, to_code)
+            if k is None:
+                return None
+            value = float(self._real[k])
+            if value != value:
+                return None
+            total += value
+        return total
+
+    def memory_bytes(self) -> int:
+        return sum(values.nbytes for values in self._weights.values()) + self._real.nbytes
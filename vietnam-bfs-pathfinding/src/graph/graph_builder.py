@@ -1,6 +1,13 @@
+from typing import TYPE_CHECKING, Optional
+
+from graph.edge_weights import EdgeWeights
+from graph.hop_table import HopDistanceTable
 from graph.province_graph import ProvinceGraph
 from models.province import Province, ProvinceRegistry
 
+if TYPE_CHECKING:
+    from services.distance_service import DistanceCalculator
+
 
 class GraphBuilder:
     """
@@ -9,11 +16,24 @@ class GraphBuilder:
     Quy trình:
     1. Thêm tất cả các tỉnh làm đỉnh
     2. Thêm các cạnh dựa trên quan hệ neighbors của mỗi tỉnh
+    3. (Tùy chọn) Tính trước bảng khoảng cách / bước kế tiếp mọi cặp tỉnh
+    4. (Tùy chọn) Tính trước trọng số km của mọi cạnh theo từng loại đường
     """
 
     @staticmethod
-    def build_from_registry(registry: ProvinceRegistry) -> ProvinceGraph:
-        """Xây dựng đồ thị từ registry chứa thông tin các tỉnh"""
+    def build_from_registry(
+        registry: ProvinceRegistry,
+        precompute_tables: bool = False,
+        distance_calculator: Optional['DistanceCalculator'] = None
+    ) -> ProvinceGraph:
+        """Xây dựng đồ thị từ registry chứa thông tin các tỉnh
+        
+        Args:
+            registry: Registry đã được khởi tạo
+            precompute_tables: Tính trước HopDistanceTable để các truy vấn
+                               BFS trở thành tra bảng
+            distance_calculator: Nếu có, gắn EdgeWeights cho mọi RoadType
+        """
         if not registry.is_initialized():
             raise RuntimeError("ProvinceRegistry not initialized")
         
@@ -37,4 +57,12 @@ class GraphBuilder:
         
         graph.mark_as_built()
         
+        # Bước 3: Bảng khoảng cách mọi cặp tỉnh
+        if precompute_tables:
+            graph.set_hop_table(HopDistanceTable.build(graph))
+        
+        # Bước 4: Trọng số cạnh
+        if distance_calculator is not None:
+            graph.set_edge_weights(EdgeWeights.build(graph, distance_calculator))
+        
         return graph
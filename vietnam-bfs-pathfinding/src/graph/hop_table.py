@@ -0,0 +1,122 @@
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from graph.province_graph import ProvinceGraph
+
+
+class HopDistanceTable:
+    """
+    Bảng khoảng cách (số cạnh) và bước kế tiếp giữa mọi cặp tỉnh.
+    
+    Được tính trước một lần khi xây dựng đồ thị (BFS từ mỗi đỉnh), sau đó
+    mọi truy vấn đường đi / liên thông chỉ là tra bảng.
+    Hai bảng là mảng số nguyên phẳng N x N, hàng ``i`` cột ``j`` nằm ở
+    vị trí ``i * N + j`` (i, j là chỉ số tỉnh, không phải mã tỉnh).
+    """
+    
+    UNREACHABLE = -1
+    
+    def __init__(
+        self,
+        codes: List[str],
+        distances: array,
+        next_hops: array
+    ) -> None:
+        size = len(codes)
+        if len(distances) != size * size or len(next_hops) != size * size:
+            raise ValueError("Table size does not match number of provinces")
+        
+        self._codes = list(codes)
+        self._index: Dict[str, int] = {code: i for i, code in enumerate(codes)}
+        self._size = size
+        # distances[i * N + j]: số cạnh từ i tới j (-1 nếu không liên thông)
+        self._distances = distances
+        # next_hops[i * N + j]: chỉ số tỉnh kế tiếp sau i trên đường i -> j
+        self._next_hops = next_hops
+    
+    @classmethod
+    def build(cls, graph: 'ProvinceGraph') -> 'HopDistanceTable':
+        """Tính bảng bằng một lần BFS từ mỗi tỉnh đích.
+        
+        BFS gốc ``t`` cho mỗi đỉnh ``v`` đỉnh cha gần ``t`` hơn một bước,
+        chính là bước kế tiếp của ``v`` trên đường ``v -> t``.
+        """
+        csr = graph.get_csr()
+        codes, offsets, targets = csr.codes, csr.offsets, csr.targets_view
+        size = csr.size()
+        # int16 đủ cho đồ thị cấp tỉnh; đồ thị lớn hơn dùng int32
+        typecode = 'h' if size < 2 ** 15 else 'i'
+        
+        distances = array(typecode, [cls.UNREACHABLE]) * (size * size)
+        next_hops = array(typecode, [cls.UNREACHABLE]) * (size * size)
+        
+        for target in range(size):
+            distances[target * size + target] = 0
+            next_hops[target * size + target] = target
+            frontier = [target]
+            depth = 0
+            
+            while frontier:
+                depth += 1
+                next_frontier = []
+                for current in frontier:
+                    for neighbor in targets[offsets[current]:offsets[current + 1]]:
+                        cell = neighbor * size + target
+                        if distances[cell] == cls.UNREACHABLE:
+                            distances[cell] = depth
+                            next_hops[cell] = current
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+        
+        return cls(codes, distances, next_hops)
+    
+    def size(self) -> int:
+        return self._size
+    
+    def has_province(self, code: str) -> bool:
+        return code in self._index
+    
+    def distance(self, code1: str, code2: str) -> Optional[int]:
+        """Số cạnh ít nhất giữa 2 tỉnh, None nếu không liên thông"""
+        d = self._distances[self._index[code1] * self._size + self._index[code2]]
+        return None if d == self.UNREACHABLE else d
+    
+    def is_connected(self, code1: str, code2: str) -> bool:
+        return self.distance(code1, code2) is not None
+    
+    def path(self, start: str, end: str) -> Optional[List[str]]:
+        """Dựng đường đi ngắn nhất bằng cách đi theo bảng bước kế tiếp"""
+        size = self._size
+        current = self._index[start]
+        target = self._index[end]
+        
+        if self._distances[current * size + target] == self.UNREACHABLE:
+            return None
+        
+        path = [self._codes[current]]
+        while current != target:
+            current = self._next_hops[current * size + target]
+            path.append(self._codes[current])
+        return path
+    
+    def distances_from(
+        self,
+        code: str,
+        max_distance: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Khoảng cách từ một tỉnh tới mọi tỉnh đến được, gần trước xa sau"""
+        row = self._index[code] * self._size
+        reachable = [
+            (d, i)
+            for i, d in enumerate(self._distances[row:row + self._size])
+            if d != self.UNREACHABLE and (not max_distance or d <= max_distance)
+        ]
+        reachable.sort()
+        return {self._codes[i]: d for d, i in reachable}
+    
+    def memory_bytes(self) -> int:
+        return (
+            self._distances.itemsize * len(self._distances) +
+            self._next_hops.itemsize * len(self._next_hops)
+        )
@@ -1,8 +1,14 @@
-from typing import Dict, List, Optional, Set
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
+from graph.csr import CSRAdjacency
 from models.province import Province
 from models.exceptions import GraphNotBuiltError
 
+if TYPE_CHECKING:
+    from algorithms.contraction_hierarchy import ContractionHierarchy
+    from graph.edge_weights import EdgeWeights
+    from graph.hop_table import HopDistanceTable
+
 
 class ProvinceGraph:
     """
@@ -10,6 +16,8 @@ class ProvinceGraph:
     
     Sử dụng adjacency list để lưu trữ quan hệ kề giữa các tỉnh.
     Mỗi tỉnh là một đỉnh, mỗi cạnh thể hiện 2 tỉnh giáp nhau.
+    Sau mark_as_built, đồ thị được đóng băng thành CSRAdjacency (chỉ số
+    nguyên) để các thuật toán duyệt dùng.
     """
 
     def __init__(self) -> None:
@@ -19,6 +27,20 @@ class ProvinceGraph:
         self._provinces: Dict[str, Province] = {}
         # Đánh dấu đồ thị đã được xây dựng xong chưa
         self._is_built: bool = False
+        # Bản CSR để duyệt, tạo lại khi đồ thị thay đổi sau khi build
+        self._csr: Optional[CSRAdjacency] = None
+        # View chỉ đọc danh sách kề (tuple), tạo khi được dùng lần đầu
+        self._neighbor_views: Dict[str, Tuple[str, ...]] = {}
+        # Bảng khoảng cách mọi cặp tỉnh (tùy chọn, tính khi build)
+        self._hop_table: Optional['HopDistanceTable'] = None
+        # Trọng số cạnh theo từng loại đường, song song với CSR (tùy chọn)
+        self._edge_weights: Optional['EdgeWeights'] = None
+        # Kết quả tiền xử lý Contraction Hierarchies (tùy chọn)
+        self._contraction_hierarchy: Optional['ContractionHierarchy'] = None
+        # Nhãn thành phần liên thông dạng union-find: {mã_tỉnh: mã_tỉnh_cha}
+        # Gốc của cây chính là nhãn thành phần, được cập nhật trong add_edge
+        self._component_parent: Dict[str, str] = {}
+        self._component_size: Dict[str, int] = {}
     
     def add_province(self, province: Province) -> None:
         """Thêm một tỉnh (đỉnh) vào đồ thị"""
@@ -30,6 +52,9 @@ class ProvinceGraph:
         self._provinces[province.code] = province
         if province.code not in self._adjacency_list:
             self._adjacency_list[province.code] = []
+        self._component_parent[province.code] = province.code
+        self._component_size[province.code] = 1
+        self._invalidate_derived()
     
     def add_edge(self, code1: str, code2: str) -> None:
         """Thêm cạnh (quan hệ giáp ranh) giữa 2 tỉnh - cạnh vô hướng"""
@@ -42,6 +67,17 @@ class ProvinceGraph:
             self._adjacency_list[code1].append(code2)
         if code1 not in self._adjacency_list[code2]:
             self._adjacency_list[code2].append(code1)
+        
+        self._union_components(code1, code2)
+        self._invalidate_derived()
+    
+    def _invalidate_derived(self) -> None:
+        """Dữ liệu tính trước không còn đúng khi thêm đỉnh / cạnh"""
+        self._csr = None
+        self._neighbor_views = {}
+        self._hop_table = None
+        self._edge_weights = None
+        self._contraction_hierarchy = None
     
     def get_neighbors(self, code: str) -> List[str]:
         """Lấy danh sách mã các tỉnh kề với tỉnh có mã code"""
@@ -53,6 +89,23 @@ class ProvinceGraph:
         
         return self._adjacency_list[code].copy()
     
+    def iter_neighbors(self, code: str) -> Tuple[str, ...]:
+        """View chỉ đọc các tỉnh kề, không sao chép ở mỗi lần gọi.
+
+        Dành cho đường đọc trên đồ thị đã build; cần danh sách có thể
+        sửa đổi thì dùng get_neighbors.
+        """
+        view = self._neighbor_views.get(code)
+        if view is None:
+            if not self._is_built:
+                raise GraphNotBuiltError()
+            if code not in self._adjacency_list:
+                raise ValueError(f"Province {code} not found in graph")
+            
+            view = tuple(self._adjacency_list[code])
+            self._neighbor_views[code] = view
+        return view
+    
     def get_province(self, code: str) -> Optional[Province]:
         return self._provinces.get(code)
     
@@ -60,8 +113,88 @@ class ProvinceGraph:
         """Kiểm tra tỉnh có trong đồ thị không"""
         return code in self._provinces
     
+    def get_component(self, code: str) -> str:
+        """Nhãn thành phần liên thông của tỉnh (mã tỉnh gốc của union-find)"""
+        if code not in self._component_parent:
+            raise ValueError(f"Province {code} not found in graph")
+        
+        root = code
+        while self._component_parent[root] != root:
+            root = self._component_parent[root]
+        
+        # Nén đường đi để các lần tra sau gần như O(1)
+        while self._component_parent[code] != root:
+            self._component_parent[code], code = root, self._component_parent[code]
+        
+        return root
+    
+    def same_component(self, code1: str, code2: str) -> bool:
+        """Kiểm tra 2 tỉnh có liên thông không mà không cần duyệt đồ thị"""
+        return self.get_component(code1) == self.get_component(code2)
+    
+    def get_component_count(self) -> int:
+        return sum(
+            1 for code, parent in self._component_parent.items() if code == parent
+        )
+    
+    def _union_components(self, code1: str, code2: str) -> None:
+        root1 = self.get_component(code1)
+        root2 = self.get_component(code2)
+        if root1 == root2:
+            return
+        
+        # Gộp cây nhỏ vào cây lớn
+        if self._component_size[root1] < self._component_size[root2]:
+            root1, root2 = root2, root1
+        self._component_parent[root2] = root1
+        self._component_size[root1] += self._component_size.pop(root2)
+    
+    def get_codes(self) -> List[str]:
+        """Danh sách mã tỉnh theo thứ tự thêm vào đồ thị"""
+        return list(self._provinces.keys())
+    
+    def set_hop_table(self, table: Optional['HopDistanceTable']) -> None:
+        if table is not None and table.size() != len(self._provinces):
+            raise ValueError("Hop table does not match graph size")
+        self._hop_table = table
+    
+    def get_hop_table(self) -> Optional['HopDistanceTable']:
+        """Bảng khoảng cách mọi cặp tỉnh, None nếu chưa tính hoặc đã cũ"""
+        return self._hop_table
+    
+    def set_edge_weights(self, weights: Optional['EdgeWeights']) -> None:
+        if weights is not None and weights.csr is not self.get_csr():
+            raise ValueError("Edge weights do not match graph CSR")
+        self._edge_weights = weights
+    
+    def get_edge_weights(self) -> Optional['EdgeWeights']:
+        """Trọng số cạnh tính trước, None nếu chưa tính hoặc đã cũ"""
+        return self._edge_weights
+    
+    def set_contraction_hierarchy(
+        self,
+        hierarchy: Optional['ContractionHierarchy']
+    ) -> None:
+        if hierarchy is not None and hierarchy.get_codes() != self.get_codes():
+            raise ValueError("Contraction hierarchy does not match graph provinces")
+        self._contraction_hierarchy = hierarchy
+    
+    def get_contraction_hierarchy(self) -> Optional['ContractionHierarchy']:
+        """Kết quả tiền xử lý CH, None nếu chưa tính hoặc đã cũ"""
+        return self._contraction_hierarchy
+    
     def mark_as_built(self) -> None:
         self._is_built = True
+        self._csr = CSRAdjacency.from_adjacency(self._adjacency_list)
+    
+    def get_csr(self) -> CSRAdjacency:
+        """Danh sách kề dạng CSR cho các thuật toán duyệt theo chỉ số"""
+        if not self._is_built:
+            raise GraphNotBuiltError()
+        
+        if self._csr is None:
+            self._csr = CSRAdjacency.from_adjacency(self._adjacency_list)
+        return self._csr
     
     def is_built(self) -> bool:
         return self._is_built
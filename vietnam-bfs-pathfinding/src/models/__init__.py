@@ -1,10 +1,11 @@
 from .province import Province, ProvinceRegistry
-from .path_result import PathResult, PathStep
+from .path_result import BatchPathItem, PathResult, PathStep
 from .exceptions import (
     ProvinceNotFoundError,
     NoPathFoundError,
     InvalidInputError,
-    GraphNotBuiltError
+    GraphNotBuiltError,
+    ServiceOverloadedError
 )
 
 __all__ = [
@@ -12,8 +13,10 @@ __all__ = [
     "ProvinceRegistry",
     "PathResult",
     "PathStep",
+    "BatchPathItem",
     "ProvinceNotFoundError",
     "NoPathFoundError",
     "InvalidInputError",
-    "GraphNotBuiltError"
+    "GraphNotBuiltError",
+    "ServiceOverloadedError"
 ]
@@ -77,3 +77,25 @@ class GraphNotBuiltError(Exception):
     
     def __str__(self) -> str:
         return self.message
+
+
+class ServiceOverloadedError(Exception):
+    
+    def __init__(
+        self,
+        pending: int,
+        capacity: int,
+        retry_after: int = 1
+    ) -> None:
+        self.pending = pending
+        self.capacity = capacity
+        self.retry_after = retry_after
+        
+        self.message = (
+            f"Hệ thống đang quá tải ({pending}/{capacity} yêu cầu đang xử lý). "
+            "Vui lòng thử lại sau."
+        )
+        super().__init__(self.message)
+    
+    def __str__(self) -> str:
+        return self.message
@@ -71,6 +71,13 @@ class PathResult:
     road_type: Optional[str] = None
     # Khoảng cách thực tế theo đường đi (từ OSRM API)
     real_distance_km: Optional[float] = None
+    # Thuật toán đã dùng và số đỉnh đã mở rộng khi tìm kiếm
+    algorithm: Optional[str] = None
+    nodes_expanded: int = 0
+    # Lấy từ route cache (không tìm kiếm lại, nodes_expanded = 0)
+    cached: bool = False
+    # Token tra cứu real_distance_km khi ORS chưa trả lời trong ngân sách thời gian
+    real_distance_token: Optional[str] = None
     
     def __post_init__(self) -> None:
         if not self.path:
@@ -84,6 +91,9 @@ class PathResult:
         
         if self.execution_time < 0:
             raise ValueError("Execution time cannot be negative")
+        
+        if self.nodes_expanded < 0:
+            raise ValueError("Nodes expanded cannot be negative")
     
     @property
     def distance(self) -> int:
@@ -126,6 +136,9 @@ class PathResult:
             "distance": self.distance,
             "total_distance_km": round(self.total_distance_km, 2),
             "road_type": self.road_type,
+            "algorithm": self.algorithm,
+            "nodes_expanded": self.nodes_expanded,
+            "cached": self.cached,
             "start_province": {
                 "code": self.start.code,
                 "name": self.start.name,
@@ -151,6 +164,38 @@ class PathResult:
         # Thêm thông tin khoảng cách thực tế nếu có
         if self.real_distance_km is not None:
             result["real_distance_km"] = round(self.real_distance_km, 2)
+        if self.real_distance_token is not None:
+            result["real_distance_pending"] = True
+            result["real_distance_token"] = self.real_distance_token
         
         return result
     
+
+
+@dataclass
+class BatchPathItem:
+    """Kết quả của một cặp tỉnh trong request tìm đường hàng loạt
+
+    Đúng một trong hai ``result`` / ``error`` khác None: lỗi của từng cặp
+    được trả về cùng dòng kết quả thay vì làm hỏng cả batch.
+    """
+    index: int
+    start: str
+    end: str
+    result: Optional[PathResult] = None
+    error: Optional[Exception] = None
+    
+    def to_dict(self) -> Dict:
+        item = {
+            "index": self.index,
+            "start": self.start,
+            "end": self.end
+        }
+        if self.error is not None:
+            item["error"] = {
+                "error": type(self.error).__name__,
+                "message": str(self.error)
+            }
+        else:
+            item["result"] = self.result.to_dict()
+        return item
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class SearchAlgorithm(str, Enum):
+    """Thuật toán tìm đường được hỗ trợ"""
+    BFS = "bfs"  # BFS một chiều (ít cạnh nhất)
+    BIDIRECTIONAL_BFS = "bidirectional_bfs"  # BFS hai chiều (ít cạnh nhất)
+    DIJKSTRA = "dijkstra"  # Dijkstra (ít km ước lượng nhất)
+    ASTAR = "astar"  # A* với heuristic Haversine (ít km ước lượng nhất)
+    CONTRACTION_HIERARCHY = "ch"  # Contraction Hierarchies (ít km ước lượng nhất)
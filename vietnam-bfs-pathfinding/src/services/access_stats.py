@@ -0,0 +1,96 @@
+"""
+Thống kê số lần truy vấn theo cặp tỉnh
+
+Lưu ra file JSON khi tắt server để lần khởi động sau biết các cặp tỉnh được
+hỏi nhiều nhất và làm nóng (warm-up) cache cho chúng trước khi có traffic.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAIR_SEPARATOR = ":"
+
+
+class AccessStats:
+    """
+    Bộ đếm truy vấn theo cặp mã tỉnh (không phân biệt chiều).
+
+    ``path = None`` chỉ đếm trong bộ nhớ, không đọc / ghi file.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    @staticmethod
+    def _key(start_code: str, end_code: str) -> Tuple[str, str]:
+        low, high = sorted((start_code, end_code))
+        return (low, high)
+
+    def record(self, start_code: str, end_code: str) -> None:
+        if start_code == end_code:
+            return
+        with self._lock:
+            self._counts[self._key(start_code, end_code)] += 1
+
+    def top(self, limit: int) -> List[Tuple[str, str]]:
+        """``limit`` cặp tỉnh được hỏi nhiều nhất"""
+        if limit <= 0:
+            return []
+        with self._lock:
+            return [pair for pair, _ in self._counts.most_common(limit)]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._counts)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for pair, count in data.get("pairs", {}).items():
+                start_code, _, end_code = pair.partition(PAIR_SEPARATOR)
+                if start_code and end_code:
+                    self._counts[self._key(start_code, end_code)] += int(count)
+            logger.info(f"Loaded access stats for {len(self._counts)} province pairs")
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable access stats {self.path}: {e}")
+
+    def save(self) -> None:
+        """Ghi ra file (ghi file tạm rồi đổi tên để không hỏng file cũ)"""
+        if not self.path:
+            return
+
+        with self._lock:
+            pairs = {
+                f"{start_code}{PAIR_SEPARATOR}{end_code}": count
+                for (start_code, end_code), count in self._counts.most_common()
+            }
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"pairs": pairs}, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save access stats to {self.path}: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pairs": len(self._counts),
+                "total_requests": sum(self._counts.values())
+            }
@@ -0,0 +1,149 @@
+"""
+Circuit breaker cho các lời gọi ra dịch vụ ngoài (OpenRouteService)
+
+Khi ORS lỗi liên tục, mỗi request phải chờ timeout x số lần retry. Circuit
+breaker ghi nhận lỗi và "ngắt mạch" sau một ngưỡng: trong lúc mở, lời gọi
+bị từ chối ngay để service trả kết quả ước lượng. Hết thời gian hồi phục,
+breaker cho một số request thử (half-open) để kiểm tra ORS đã ổn chưa.
+"""
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Trạng thái của circuit breaker"""
+    CLOSED = "closed"  # Bình thường, mọi lời gọi được phép
+    OPEN = "open"  # Đang ngắt, từ chối ngay
+    HALF_OPEN = "half_open"  # Cho một số lời gọi thử để hồi phục
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker ba trạng thái closed -> open -> half_open -> closed.
+
+    Mỗi lời gọi được ``allow_request()`` cho phép phải kết thúc bằng đúng
+    một lần ``record_success()``, ``record_failure()`` hoặc ``release()``
+    (lời gọi bị hủy giữa chừng, không có kết quả để ghi).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("Circuit failure_threshold must be positive")
+        if recovery_timeout <= 0:
+            raise ValueError("Circuit recovery_timeout must be positive")
+        if half_open_max_calls <= 0:
+            raise ValueError("Circuit half_open_max_calls must be positive")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+
+        self._short_circuited = 0
+        self._times_opened = 0
+        self._total_failures = 0
+        self._total_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        """Chuyển open -> half_open khi hết thời gian hồi phục (gọi khi giữ lock)"""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+            logger.info("Circuit breaker half-open, probing ORS")
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return True
+
+            if (
+                state == CircuitState.HALF_OPEN
+                and self._half_open_in_flight < self.half_open_max_calls
+            ):
+                self._half_open_in_flight += 1
+                return True
+
+            self._short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._total_successes += 1
+            self._consecutive_failures = 0
+            if self._state == CircuitState.HALF_OPEN:
+                self._state = CircuitState.CLOSED
+                self._half_open_in_flight = 0
+                logger.info("Circuit breaker closed, ORS recovered")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._total_failures += 1
+            self._consecutive_failures += 1
+            if (
+                self._state == CircuitState.HALF_OPEN
+                or self._consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def release(self) -> None:
+        """Trả lại lượt thử half-open mà không ghi thành công / thất bại"""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def _open(self) -> None:
+        if self._state != CircuitState.OPEN:
+            self._times_opened += 1
+            logger.warning(
+                f"Circuit breaker opened after {self._consecutive_failures} "
+                f"consecutive failures, retry in {self.recovery_timeout}s"
+            )
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_in_flight = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == CircuitState.OPEN:
+                retry_in = round(
+                    self.recovery_timeout - (time.monotonic() - self._opened_at), 2
+                )
+            return {
+                "state": state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in_seconds": retry_in,
+                "times_opened": self._times_opened,
+                "short_circuited": self._short_circuited,
+                "total_failures": self._total_failures,
+                "total_successes": self._total_successes
+            }
@@ -1,8 +1,10 @@
 import logging
 import math
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
 
+import numpy as np
+
 from models.province import Province
 from models.road_segment import RoadSegment, RoadType
 
@@ -14,6 +16,7 @@ class DistanceCalculator:
     
     Hỗ trợ :
     - Haversine: Khoảng cách đường chim bay bằng tọa độ của tỉnh trong provinces.json
+    - Haversine dạng vector (NumPy): ma trận N x N hoặc vector theo từng cạnh
     - Road estimation: Ước lượng đường bộ (đường chim bay * hệ số điều chỉnh)
     """
     
@@ -29,8 +32,13 @@ class DistanceCalculator:
     
     EARTH_RADIUS_KM = 6371.0
     
+    # Số tỉnh tối đa để giữ ma trận N x N (float64) trong bộ nhớ
+    MATRIX_MAX_SIZE = 2000
+    
     def __init__(self):
-        pass
+        # Ma trận khoảng cách đường chim bay tính trước và chỉ số theo mã tỉnh
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_index: Dict[str, int] = {}
     
     @staticmethod
     @lru_cache(maxsize=10000)
@@ -62,6 +70,110 @@ class DistanceCalculator:
         
         return DistanceCalculator.EARTH_RADIUS_KM * c
     
+    @staticmethod
+    def haversine_vector(
+        lat1: np.ndarray, lon1: np.ndarray,
+        lat2: np.ndarray, lon2: np.ndarray
+    ) -> np.ndarray:
+        """Haversine theo từng phần tử (hỗ trợ broadcasting của NumPy)
+        
+        Args:
+            lat1, lon1: Mảng tọa độ điểm đầu
+            lat2, lon2: Mảng tọa độ điểm cuối (cùng shape hoặc broadcast được)
+            
+        Returns:
+            Mảng khoảng cách theo km
+        """
+        lat1_rad = np.radians(lat1)
+        lat2_rad = np.radians(lat2)
+        delta_lat = lat2_rad - lat1_rad
+        delta_lon = np.radians(lon2) - np.radians(lon1)
+        
+        a = (
+            np.sin(delta_lat / 2) ** 2 +
+            np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon / 2) ** 2
+        )
+        c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        
+        return DistanceCalculator.EARTH_RADIUS_KM * c
+    
+    @staticmethod
+    def haversine_matrix(
+        latitudes: np.ndarray,
+        longitudes: np.ndarray
+    ) -> np.ndarray:
+        """Ma trận khoảng cách đường chim bay N x N giữa mọi cặp điểm"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        
+        return DistanceCalculator.haversine_vector(
+            latitudes[:, np.newaxis], longitudes[:, np.newaxis],
+            latitudes[np.newaxis, :], longitudes[np.newaxis, :]
+        )
+    
+    def precompute(self, provinces: List[Province]) -> None:
+        """Tính trước ma trận khoảng cách cho danh sách tỉnh
+        
+        Đây là nguồn đường chim bay duy nhất sau khi tính: EdgeWeights
+        (trọng số cạnh cho Dijkstra / CH / ma trận OD / RoadSegment),
+        heuristic A* và estimate_road_distance đều chỉ tra ma trận.
+        Tỉnh thiếu tọa độ có giá trị NaN trong ma trận.
+        """
+        if len(provinces) > self.MATRIX_MAX_SIZE:
+            logger.warning(
+                f"Skip distance matrix: {len(provinces)} provinces "
+                f"> {self.MATRIX_MAX_SIZE}"
+            )
+            return
+        
+        latitudes = np.array(
+            [p.latitude if p.latitude is not None else np.nan for p in provinces],
+            dtype=np.float64
+        )
+        longitudes = np.array(
+            [p.longitude if p.longitude is not None else np.nan for p in provinces],
+            dtype=np.float64
+        )
+        
+        self._matrix = self.haversine_matrix(latitudes, longitudes)
+        self._matrix_index = {p.code: i for i, p in enumerate(provinces)}
+    
+    def get_distance_matrix(self) -> Optional[np.ndarray]:
+        """Ma trận đường chim bay đã tính trước (chỉ đọc), None nếu chưa có"""
+        if self._matrix is None:
+            return None
+        view = self._matrix.view()
+        view.flags.writeable = False
+        return view
+    
+    def get_matrix_index(self, code: str) -> Optional[int]:
+        return self._matrix_index.get(code)
+    
+    def get_matrix_rows(self, codes: List[str]) -> Optional[np.ndarray]:
+        """Chỉ số hàng trong ma trận của từng mã tỉnh (theo thứ tự ``codes``)
+        
+        None nếu chưa tính ma trận hoặc có mã tỉnh không nằm trong ma trận
+        (ví dụ đồ thị tổng hợp), khi đó người gọi tự tính Haversine.
+        """
+        if self._matrix is None:
+            return None
+        rows = [self._matrix_index.get(code) for code in codes]
+        if any(row is None for row in rows):
+            return None
+        return np.array(rows, dtype=np.intp)
+    
+    def straight_distance(self, province1: Province, province2: Province) -> float:
+        """Khoảng cách đường chim bay, tra ma trận nếu đã tính trước"""
+        i = self._matrix_index.get(province1.code)
+        j = self._matrix_index.get(province2.code)
+        if i is not None and j is not None:
+            return float(self._matrix[i, j])
+        
+        return self.haversine_distance(
+            province1.latitude, province1.longitude,
+            province2.latitude, province2.longitude
+        )
+    
     def estimate_road_distance(
         self,
         province1: Province,
@@ -91,10 +203,7 @@ class DistanceCalculator:
             )
         
         # Tính khoảng cách đường chim bay
-        straight_distance = self.haversine_distance(
-            province1.latitude, province1.longitude,
-            province2.latitude, province2.longitude
-        )
+        straight_distance = self.straight_distance(province1, province2)
         
         # Áp dụng hệ số điều chỉnh
         adjustment_factor = self.ROAD_ADJUSTMENT_FACTORS.get(
@@ -0,0 +1,141 @@
+"""
+Thread pool có giới hạn để route async chạy việc CPU / I/O chặn
+
+Route FastAPI là ``async def`` nên mọi lời gọi đồng bộ (BFS trên đồ thị
+lớn, đọc SQLite...) chạy thẳng trong event loop sẽ chặn mọi kết nối khác.
+BoundedExecutor đẩy các việc đó sang thread pool và từ chối ngay
+(ServiceOverloadedError -> HTTP 503) khi hàng đợi đã đầy, thay vì xếp hàng
+vô hạn.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from models.exceptions import ServiceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor với giới hạn số việc đang chờ.
+
+    - ``max_workers`` thread chạy đồng thời
+    - Tối đa ``max_queue_size`` việc xếp hàng chờ thread rảnh
+    - Vượt quá ``max_workers + max_queue_size``: raise ServiceOverloadedError
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue_size: int = 64) -> None:
+        if max_workers <= 0:
+            raise ValueError("Executor max_workers must be positive")
+        if max_queue_size < 0:
+            raise ValueError("Executor max_queue_size cannot be negative")
+
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="pathfinding"
+        )
+        self._lock = threading.Lock()
+
+        # Số việc đã nhận nhưng chưa xong (đang chạy + đang chờ)
+        self._pending = 0
+        self._active = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_size
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Chạy ``func(*args, **kwargs)`` trong pool và chờ kết quả
+
+        Raises:
+            ServiceOverloadedError: Pool và hàng đợi đã đầy
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise ServiceOverloadedError(self._pending, self.capacity)
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        submitted = time.perf_counter()
+        call = functools.partial(self._call, func, args, kwargs, submitted)
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._release()
+            raise
+        # Giảm _pending khi việc thật sự xong (hoặc bị hủy trước khi chạy),
+        # không phải khi coroutine chờ bị hủy: thread có thể vẫn đang chạy
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _call(
+        self,
+        func: Callable[..., T],
+        args: tuple,
+        kwargs: dict,
+        submitted: float
+    ) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._active += 1
+            self._total_wait += started - submitted
+
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._total_run += time.perf_counter() - started
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "active": self._active,
+                "queued": max(self._pending - self._active, 0),
+                "peak_pending": self._peak_pending,
+                "saturation": round(self._pending / self.capacity, 4),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": (
+                    round(self._total_wait / finished * 1000, 3) if finished else 0.0
+                ),
+                "avg_run_ms": (
+                    round(self._total_run / finished * 1000, 3) if finished else 0.0
+                )
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,190 @@
+"""
+Cache bền vững (SQLite) cho kết quả OpenRouteService
+
+Key là chuỗi tọa độ các waypoint, nên cùng một lộ trình không gọi lại ORS
+kể cả sau khi khởi động lại server. Toàn bộ entry còn hạn được nạp vào bộ
+nhớ lúc khởi tạo (warm load), tra cứu không chạm tới đĩa.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ORSCache:
+    """
+    Cache khoảng cách ORS theo chuỗi tọa độ, lưu trên SQLite.
+
+    - TTL: entry quá ``ttl_seconds`` bị bỏ qua và xóa
+    - Giới hạn ``max_entries``: xóa entry cũ nhất khi vượt quá
+    - ``db_path = ":memory:"`` để chỉ giữ trong bộ nhớ (không bền vững)
+    """
+
+    # Số chữ số thập phân của tọa độ trong key (~0.1m)
+    COORDINATE_PRECISION = 6
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float = 30 * 24 * 3600.0,
+        max_entries: int = 50000
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ORS cache ttl_seconds must be positive")
+        if max_entries <= 0:
+            raise ValueError("ORS cache max_entries must be positive")
+
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # {key: (created_at, distance_km)}, thứ tự = thứ tự ghi
+        self._entries: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        # Key hết hạn đã bỏ khỏi bộ nhớ, chờ xóa trên đĩa ở lần ghi kế tiếp
+        self._expired: Set[str] = set()
+        # _lock chỉ bảo vệ bộ nhớ, _db_lock bảo vệ kết nối SQLite
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and db_path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            db_path,
+            check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS routes ("
+            "key TEXT PRIMARY KEY, "
+            "distance_km REAL NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    @classmethod
+    def make_key(cls, coordinates: Sequence[Sequence[float]]) -> str:
+        """Key từ danh sách tọa độ [[lon, lat], ...] (giữ thứ tự waypoint)"""
+        return ";".join(
+            f"{lon:.{cls.COORDINATE_PRECISION}f},{lat:.{cls.COORDINATE_PRECISION}f}"
+            for lon, lat in coordinates
+        )
+
+    def _load(self) -> None:
+        """Nạp các entry còn hạn vào bộ nhớ, xóa entry hết hạn trên đĩa"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock, self._db_lock:
+            self._conn.execute("DELETE FROM routes WHERE created_at <= ?", (cutoff,))
+            rows = self._conn.execute(
+                "SELECT key, distance_km, created_at FROM routes "
+                "ORDER BY created_at"
+            ).fetchall()
+            for key, distance_km, created_at in rows:
+                self._entries[key] = (created_at, distance_km)
+            self._conn.commit()
+            self._delete(self._evict())
+
+        logger.info(f"ORS cache loaded {len(self._entries)} routes from {self.db_path}")
+
+    def get(self, coordinates: Sequence[Sequence[float]]) -> Optional[float]:
+        """Chỉ tra bộ nhớ, không chạm tới SQLite (an toàn khi gọi trong event loop)
+
+        Entry hết hạn bị bỏ khỏi bộ nhớ ngay, còn bản ghi trên đĩa được xóa
+        ở lần put / close kế tiếp (hoặc khi nạp lại lúc khởi động).
+        """
+        key = self.make_key(coordinates)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            created_at, distance_km = entry
+            if created_at <= time.time() - self.ttl_seconds:
+                del self._entries[key]
+                self._expired.add(key)
+                return None
+            return distance_km
+
+    def put(self, coordinates: Sequence[Sequence[float]], distance_km: float) -> None:
+        key = self.make_key(coordinates)
+        created_at = time.time()
+        with self._lock:
+            self._expired.discard(key)
+            self._entries.pop(key, None)
+            self._entries[key] = (created_at, distance_km)
+            stale = self._take_expired() + self._evict()
+
+        # Ghi đĩa ngoài _lock để get() không phải chờ commit SQLite
+        with self._db_lock:
+            self._execute(
+                "INSERT OR REPLACE INTO routes (key, distance_km, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, distance_km, created_at)
+            )
+            self._delete(stale)
+
+    def _take_expired(self) -> List[Tuple[str]]:
+        """Lấy các key get() đã thấy hết hạn để xóa trên đĩa (gọi khi đang giữ _lock)"""
+        expired = [(key,) for key in self._expired]
+        self._expired.clear()
+        return expired
+
+    def _evict(self) -> List[Tuple[str]]:
+        """Bỏ entry cũ nhất khỏi bộ nhớ khi vượt max_entries (gọi khi đang giữ _lock)
+
+        Returns:
+            Các key cần xóa trên đĩa
+        """
+        evicted: List[Tuple[str]] = []
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            evicted.append((key,))
+        return evicted
+
+    def _delete(self, keys: List[Tuple[str]]) -> None:
+        """Xóa các key trên đĩa (gọi khi đang giữ _db_lock)"""
+        if not keys or self._conn is None:
+            return
+        try:
+            self._conn.executemany("DELETE FROM routes WHERE key = ?", keys)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Bản ghi hết hạn còn sót sẽ bị xóa khi nạp lại (_load bỏ entry hết hạn)
+            logger.warning(f"ORS cache delete failed: {e}")
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Lỗi ghi đĩa không được làm hỏng request, cache bộ nhớ vẫn dùng được
+            logger.warning(f"ORS cache write failed: {e}")
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "db_path": self.db_path
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            stale = self._take_expired()
+        with self._db_lock:
+            if self._conn is not None:
+                self._delete(stale)
+                self._conn.close()
+                self._conn = None
@@ -1,48 +1,162 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional, Union
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+
+from config.settings import Settings, get_settings
 from algorithms.bfs import BFSPathfinder
+from algorithms.dijkstra import DijkstraPathfinder
+from algorithms.astar import AStarPathfinder
+from algorithms.contraction_hierarchy import CHPathfinder, ContractionHierarchy
+from algorithms.od_matrix import ODMatrix, ODMatrixBuilder
+from graph.edge_weights import EdgeWeights
 from graph.graph_builder import GraphBuilder
 from graph.province_graph import ProvinceGraph
 from models.province import Province, ProvinceRegistry
-from models.path_result import PathResult
+from models.path_result import BatchPathItem, PathResult
 from models.road_segment import RoadSegment, RoadType
+from models.search_algorithm import SearchAlgorithm
 from models.exceptions import (
     ProvinceNotFoundError,
     NoPathFoundError,
     InvalidInputError,
     GraphNotBuiltError
 )
+from services.access_stats import AccessStats
+from services.circuit_breaker import CircuitBreaker
 from services.distance_service import DistanceCalculator
+from services.executor import BoundedExecutor
+from services.ors_cache import ORSCache
+from services.pending_routes import PendingRouteRegistry
+from services.route_cache import CachedRoute, RouteCache
 from services.routing_service import RoutingService
 
 logger = logging.getLogger(__name__)
 
 
+def _edge_coordinates(from_province: Province, to_province: Province) -> List[List[float]]:
+    """Chuỗi tọa độ [lon, lat] của một cạnh, dùng làm key ORSCache"""
+    return [
+        [from_province.longitude, from_province.latitude],
+        [to_province.longitude, to_province.latitude]
+    ]
+
+
+@dataclass
+class _EdgePrefetchPlan:
+    """Trạng thái một lần prefetch km thực tế theo cạnh"""
+    edge_weights: EdgeWeights
+    provinces: List[Province]
+    # Mảng km thực tế theo cạnh đang được điền (NaN = chưa có)
+    real: np.ndarray
+    # {chỉ số tỉnh nguồn: [vị trí cạnh k còn thiếu]}
+    missing: Dict[int, List[int]]
+    # Các lô (chỉ số tỉnh nguồn, chỉ số tỉnh đích) cho Matrix API
+    batches: List[Tuple[List[int], List[int]]]
+    
+    def apply_matrix(
+        self,
+        sources: List[int],
+        destinations: List[int],
+        distances_km: List[List[Optional[float]]]
+    ) -> List[Tuple[Province, Province, float]]:
+        """Điền km từ một ma trận ORS, trả về các cạnh vừa điền để ghi cache"""
+        targets = self.edge_weights.csr.targets
+        column = {j: c for c, j in enumerate(destinations)}
+        filled = []
+        for row, i in enumerate(sources):
+            for k in self.missing[i]:
+                j = targets[k]
+                km = distances_km[row][column[j]]
+                if km is None:
+                    continue
+                self.real[k] = km
+                filled.append((self.provinces[i], self.provinces[j], km))
+        return filled
+
+
 class PathfindingService:
 
     def __init__(
         self,
         registry: ProvinceRegistry,
-        graph: Optional[ProvinceGraph] = None
+        graph: Optional[ProvinceGraph] = None,
+        settings: Optional[Settings] = None
     ) -> None:
 
         if not registry.is_initialized():
             raise RuntimeError("ProvinceRegistry must be initialized")
         
         self.registry = registry
+        self.settings = settings or get_settings()
+        
+        self.distance_calculator = DistanceCalculator()
+        self.distance_calculator.precompute(self.registry.get_all())
         
         if graph is None:
             logger.info("Building graph from registry")
-            self.graph = GraphBuilder.build_from_registry(registry)
+            self.graph = GraphBuilder.build_from_registry(
+                registry,
+                precompute_tables=self.settings.precompute_hop_tables,
+                distance_calculator=self.distance_calculator
+            )
         else:
             if not graph.is_built():
                 raise GraphNotBuiltError()
             self.graph = graph
         
         self.pathfinder = BFSPathfinder(self.graph)
-        self.distance_calculator = DistanceCalculator()
-        self.routing_service = RoutingService()
+        self.weighted_pathfinder = DijkstraPathfinder(
+            self.graph,
+            self.distance_calculator
+        )
+        self.astar_pathfinder = AStarPathfinder(
+            self.graph,
+            self.distance_calculator
+        )
+        self.ch_pathfinder = CHPathfinder(
+            self.graph,
+            self.distance_calculator
+        )
+        self.od_matrix_builder = ODMatrixBuilder(
+            self.graph,
+            self.distance_calculator
+        )
+        if self.settings.contraction_hierarchy_enabled:
+            self._prepare_contraction_hierarchy()
+        self.routing_service = RoutingService(
+            cache=self._create_ors_cache(),
+            base_url=self.settings.ors_base_url,
+            api_key=self.settings.ors_api_key or None,
+            max_connections=self.settings.ors_max_connections,
+            max_keepalive_connections=self.settings.ors_max_keepalive_connections,
+            keepalive_expiry=self.settings.ors_keepalive_expiry,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=self.settings.ors_circuit_failure_threshold,
+                recovery_timeout=self.settings.ors_circuit_recovery_seconds
+            )
+        )
+        self.executor = BoundedExecutor(
+            max_workers=self.settings.executor_max_workers,
+            max_queue_size=self.settings.executor_max_queue_size
+        )
+        self.route_cache: RouteCache[CachedRoute] = RouteCache(
+            max_size=self.settings.route_cache_max_size,
+            ttl_seconds=self.settings.route_cache_ttl_seconds
+        )
+        # Thống kê cặp tỉnh hay được hỏi, dùng cho warm-up lần khởi động sau
+        self.access_stats = AccessStats(self.settings.get_access_stats_path())
+        # Khoảng cách ORS còn chạy nền của các request đã trả về sớm
+        self.pending_routes = PendingRouteRegistry(
+            max_size=self.settings.pending_route_max_size,
+            ttl_seconds=self.settings.pending_route_ttl_seconds
+        )
         
         logger.info(
             f"PathfindingService initialized with {self.registry.count()} provinces"
@@ -53,9 +167,142 @@ class PathfindingService:
         start: Union[str, Province],
         end: Union[str, Province],
         fuzzy_match: bool = True,
-        road_type: str = "national"
+        road_type: str = "national",
+        algorithm: str = "bfs"
     ) -> PathResult:
 
+        result, cache_key, entry = self._find_estimated_path(
+            start, end, fuzzy_match, road_type, algorithm
+        )
+        if result.real_distance_km is None:
+            self._attach_real_distance(result)
+        self._finish_path(result, cache_key, entry)
+        self.access_stats.record(result.start.code, result.end.code)
+        return result
+    
+    async def find_path_async(
+        self,
+        start: Union[str, Province],
+        end: Union[str, Province],
+        fuzzy_match: bool = True,
+        road_type: str = "national",
+        algorithm: str = "bfs",
+        latency_budget: Optional[float] = None
+    ) -> PathResult:
+        """Bản async của find_path: chờ ORS bằng AsyncClient, không chặn event loop
+        
+        Phần tìm đường trên đồ thị chạy trong thread pool (self.executor).
+        
+        Args:
+            latency_budget: Số giây tối đa chờ ORS (None = chờ đến khi xong).
+                Hết thời gian thì trả về ngay với ``real_distance_km = None``
+                và ``real_distance_token`` để lấy kết quả sau
+                (get_pending_real_distance); lời gọi ORS vẫn chạy tiếp.
+        """
+        if latency_budget is not None and latency_budget < 0:
+            raise InvalidInputError(
+                "latency_budget_ms",
+                "Ngân sách thời gian không được âm",
+                str(latency_budget)
+            )
+        result = await self._find_path_async(
+            start, end, fuzzy_match, road_type, algorithm, latency_budget
+        )
+        self.access_stats.record(result.start.code, result.end.code)
+        return result
+    
+    async def warm_route_async(
+        self,
+        start: Union[str, Province],
+        end: Union[str, Province]
+    ) -> PathResult:
+        """Tìm đường với tham số mặc định để làm nóng cache (không tính vào access_stats)"""
+        return await self._find_path_async(
+            start, end, True, "national", SearchAlgorithm.BFS.value
+        )
+    
+    async def _find_path_async(
+        self,
+        start: Union[str, Province],
+        end: Union[str, Province],
+        fuzzy_match: bool,
+        road_type: str,
+        algorithm: str,
+        latency_budget: Optional[float] = None
+    ) -> PathResult:
+        result, cache_key, entry = await self.executor.run(
+            self._find_estimated_path,
+            start, end, fuzzy_match, road_type, algorithm
+        )
+        if result.real_distance_km is None and latency_budget is not None:
+            return await self._finish_path_within(
+                result, cache_key, entry, latency_budget
+            )
+        if result.real_distance_km is None:
+            await self._attach_real_distance_async(result)
+        self._finish_path(result, cache_key, entry)
+        return result
+    
+    async def _finish_path_within(
+        self,
+        result: PathResult,
+        cache_key: tuple,
+        entry: Optional[CachedRoute],
+        latency_budget: float
+    ) -> PathResult:
+        """Chờ ORS tối đa ``latency_budget`` giây, quá hạn thì trả bản sao kèm token
+        
+        Task ORS chạy nền trên chính ``result`` rồi ghi vào cache như bình
+        thường; asyncio.wait không hủy task khi hết giờ. Kết quả có sẵn
+        (cạnh đã prefetch, ORS cache) xong ngay ở bước đầu của task nên
+        vẫn được trả về kể cả khi ngân sách bằng 0.
+        """
+        async def complete() -> Optional[float]:
+            await self._attach_real_distance_async(result)
+            self._finish_path(result, cache_key, entry)
+            return result.real_distance_km
+        
+        task = asyncio.ensure_future(complete())
+        done, _ = await asyncio.wait({task}, timeout=latency_budget)
+        if done:
+            return result
+        
+        token = self.pending_routes.register(task)
+        logger.info(
+            f"ORS did not answer within {latency_budget * 1000:.0f}ms, "
+            f"returning estimate with token {token}"
+        )
+        return replace(
+            result,
+            path=list(result.path),
+            road_segments=list(result.road_segments),
+            real_distance_token=token
+        )
+    
+    def get_pending_real_distance(self, token: str) -> Optional[Dict]:
+        """Trạng thái khoảng cách ORS của một request đã trả về sớm
+        
+        Returns:
+            {"token", "status", "real_distance_km"}, None nếu token không
+            tồn tại hoặc đã hết hạn
+        """
+        route = self.pending_routes.get(token)
+        return route.to_dict() if route is not None else None
+    
+    def _find_estimated_path(
+        self,
+        start: Union[str, Province],
+        end: Union[str, Province],
+        fuzzy_match: bool,
+        road_type: str,
+        algorithm: str
+    ) -> Tuple[PathResult, tuple, Optional[CachedRoute]]:
+        """Tìm đường và tính km ước lượng (từ cache nếu có), chưa gọi ORS
+        
+        Returns:
+            (result, cache_key, entry): ``entry`` là entry cache đã dùng,
+            None nếu vừa tính mới
+        """
         if not start or not end:
             raise InvalidInputError(
                 "start/end",
@@ -67,79 +314,481 @@ class PathfindingService:
         
         logger.info(
             f"Finding path: {start_province.name} ({start_province.code}) -> "
-            f"{end_province.name} ({end_province.code}), road_type={road_type}"
+            f"{end_province.name} ({end_province.code}), road_type={road_type}, "
+            f"algorithm={algorithm}"
         )
         
         try:
-            result = self.pathfinder.find_path(
+            algorithm_enum = SearchAlgorithm(algorithm.lower())
+        except ValueError:
+            logger.warning(f"Invalid algorithm: {algorithm}, using BFS")
+            algorithm_enum = SearchAlgorithm.BFS
+        
+        road_type_enum = self._parse_road_type(road_type)
+        cache_key = self._route_cache_key(
+            start_province.code, end_province.code, road_type_enum, algorithm_enum
+        )
+        
+        started = time.perf_counter()
+        entry = self.route_cache.get(cache_key)
+        if entry is not None:
+            result = self._result_from_cache(entry, start_province, road_type)
+            result.execution_time = time.perf_counter() - started
+            return result, cache_key, entry
+        
+        try:
+            result = self._run_algorithm(
                 start_province.code,
-                end_province.code
+                end_province.code,
+                algorithm_enum,
+                road_type_enum
             )
+            self._attach_road_segments(result, road_type_enum, road_type)
+            return result, cache_key, None
             
-            try:
-                road_type_enum = RoadType(road_type.lower())
-            except ValueError:
-                logger.warning(f"Invalid road_type: {road_type}, using NATIONAL")
-                road_type_enum = RoadType.NATIONAL
-            
-            road_segments = []
-            total_distance = 0.0
+        except NoPathFoundError as e:
+            logger.warning(f"No path found: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error finding path: {e}")
+            raise
+    
+    def _finish_path(
+        self,
+        result: PathResult,
+        cache_key: tuple,
+        entry: Optional[CachedRoute]
+    ) -> None:
+        """Lưu kết quả (hoặc khoảng cách ORS của chiều mới) vào cache"""
+        if entry is None:
+            self._cache_route(result, cache_key)
+            logger.info(
+                f"Path found: {result.distance} provinces, "
+                f"{result.total_distance_km:.2f}km, "
+                f"{result.nodes_expanded} nodes expanded, "
+                f"{result.execution_time * 1000:.2f}ms"
+            )
+            return
+        
+        if result.real_distance_km is not None:
+            entry.real_distances[result.start.code] = result.real_distance_km
+        logger.info(
+            f"Path served from cache: {result.distance} provinces, "
+            f"{result.execution_time * 1000:.2f}ms"
+        )
+    
+    def _run_algorithm(
+        self,
+        start_code: str,
+        end_code: str,
+        algorithm_enum: SearchAlgorithm,
+        road_type_enum: RoadType
+    ) -> PathResult:
+        """Chạy thuật toán tìm đường tương ứng (chưa gắn km / ORS)"""
+        if algorithm_enum == SearchAlgorithm.DIJKSTRA:
+            return self.weighted_pathfinder.find_path(
+                start_code, end_code, road_type=road_type_enum
+            )
+        if algorithm_enum == SearchAlgorithm.ASTAR:
+            return self.astar_pathfinder.find_path(
+                start_code, end_code, road_type=road_type_enum
+            )
+        if algorithm_enum == SearchAlgorithm.CONTRACTION_HIERARCHY:
+            return self.ch_pathfinder.find_path(
+                start_code, end_code, road_type=road_type_enum
+            )
+        return self.pathfinder.find_path(
+            start_code, end_code, algorithm=algorithm_enum
+        )
+    
+    @staticmethod
+    def _route_cache_key(
+        start_code: str,
+        end_code: str,
+        road_type_enum: RoadType,
+        algorithm_enum: SearchAlgorithm
+    ) -> tuple:
+        """Key đối xứng: (A, B) và (B, A) dùng chung một entry
+        
+        Đồ thị vô hướng và trọng số Haversine đối xứng nên đường đi ngược
+        của một đường ngắn nhất vẫn là đường ngắn nhất.
+        """
+        low, high = sorted((start_code, end_code))
+        return (low, high, road_type_enum.value, algorithm_enum.value)
+    
+    def _result_from_cache(
+        self,
+        entry: CachedRoute,
+        start_province: Province,
+        road_type: str
+    ) -> PathResult:
+        """Bản sao kết quả đã cache theo chiều được hỏi, timestamp mới.
+        ``real_distance_km`` là None nếu chiều này chưa có khoảng cách ORS.
+        Không có lượt tìm kiếm nào nên ``nodes_expanded`` = 0, ``cached`` = True"""
+        result = entry.result
+        if result.start.code != start_province.code:
+            result = self._reverse_result(result)
+        
+        return replace(
+            result,
+            path=list(result.path),
+            road_segments=list(result.road_segments),
+            road_type=road_type,
+            real_distance_km=entry.real_distances.get(start_province.code),
+            execution_time=0.0,
+            nodes_expanded=0,
+            cached=True,
+            timestamp=datetime.now()
+        )
+    
+    def _cache_route(self, result: PathResult, cache_key: tuple) -> None:
+        entry = CachedRoute(result=replace(
+            result,
+            path=list(result.path),
+            road_segments=list(result.road_segments)
+        ))
+        if result.real_distance_km is not None:
+            entry.real_distances[result.start.code] = result.real_distance_km
+        
+        self.route_cache.set(cache_key, entry)
+    
+    @staticmethod
+    def _reverse_result(result: PathResult) -> PathResult:
+        """Đường đi theo chiều ngược lại (end -> start)"""
+        road_segments = [
+            RoadSegment(
+                from_province=segment.to_province,
+                to_province=segment.from_province,
+                distance_km=segment.distance_km,
+                road_type=segment.road_type,
+                road_name=segment.road_name
+            )
+            for segment in reversed(result.road_segments)
+        ]
+        return replace(
+            result,
+            path=result.path[::-1],
+            start=result.end,
+            end=result.start,
+            road_segments=road_segments
+        )
+    
+    async def find_reachable_async(self, *args, **kwargs) -> Dict[str, tuple]:
+        """find_reachable chạy trong thread pool"""
+        return await self.executor.run(self.find_reachable, *args, **kwargs)
+    
+    async def check_connectivity_async(self, *args, **kwargs) -> bool:
+        """check_connectivity chạy trong thread pool"""
+        return await self.executor.run(self.check_connectivity, *args, **kwargs)
+    
+    async def get_province_info_async(self, *args, **kwargs) -> Dict:
+        """get_province_info chạy trong thread pool"""
+        return await self.executor.run(self.get_province_info, *args, **kwargs)
+    
+    async def get_all_provinces_async(self) -> List[Dict]:
+        """get_all_provinces chạy trong thread pool"""
+        return await self.executor.run(self.get_all_provinces)
+    
+    def get_executor_stats(self) -> Dict:
+        return self.executor.get_stats()
+    
+    def get_routing_stats(self) -> Dict:
+        return self.routing_service.get_stats()
+    
+    def get_cache_stats(self) -> Dict:
+        return self.route_cache.get_stats()
+    
+    def _create_ors_cache(self) -> Optional[ORSCache]:
+        """Mở (và warm load) cache ORS trên đĩa nếu được cấu hình"""
+        cache_path = self.settings.get_ors_cache_path()
+        if not cache_path:
+            return None
+        
+        try:
+            return ORSCache(
+                cache_path,
+                ttl_seconds=self.settings.ors_cache_ttl_seconds,
+                max_entries=self.settings.ors_cache_max_entries
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"ORS cache disabled, could not open {cache_path}: {e}")
+            return None
+    
+    def get_access_stats(self) -> Dict:
+        return self.access_stats.get_stats()
+    
+    def get_pending_stats(self) -> Dict:
+        return self.pending_routes.get_stats()
+    
+    def close(self) -> None:
+        """Giải phóng tài nguyên khi tắt server"""
+        self.executor.shutdown()
+        self.routing_service.close()
+        self.access_stats.save()
+    
+    async def aclose(self) -> None:
+        """Như close(), đóng thêm AsyncClient của RoutingService"""
+        self.pending_routes.cancel_all()
+        self.executor.shutdown()
+        await self.routing_service.aclose()
+        self.access_stats.save()
+    
+    @staticmethod
+    def _parse_road_type(road_type: str) -> RoadType:
+        try:
+            return RoadType(road_type.lower())
+        except ValueError:
+            logger.warning(f"Invalid road_type: {road_type}, using NATIONAL")
+            return RoadType.NATIONAL
+    
+    def _attach_road_segments(
+        self,
+        result: PathResult,
+        road_type_enum: RoadType,
+        road_type: str
+    ) -> None:
+        """Tạo các RoadSegment dọc đường đi và tính tổng km ước lượng
+        
+        Độ dài từng đoạn tra từ EdgeWeights của đồ thị, chỉ tính lại khi
+        cạnh không có trọng số (thiếu tọa độ).
+        """
+        edge_weights = EdgeWeights.for_graph(self.graph, self.distance_calculator)
+        road_segments = []
+        total_distance = 0.0
+        
+        for from_prov, to_prov in zip(result.path, result.path[1:]):
+            distance = edge_weights.weight(
+                from_prov.code,
+                to_prov.code,
+                road_type_enum
+            )
             
-            for i in range(len(result.path) - 1):
-                from_prov = result.path[i]
-                to_prov = result.path[i + 1]
-                
-                try:
+            try:
+                if distance is None:
                     segment = self.distance_calculator.create_road_segment(
                         from_prov,
                         to_prov,
                         road_type_enum
                     )
-                    road_segments.append(segment)
-                    total_distance += segment.distance_km
-                    
-                    logger.debug(
-                        f"Segment {i+1}: {from_prov.name} -> {to_prov.name}, "
-                        f"{segment.distance_km:.2f}km"
+                else:
+                    segment = RoadSegment(
+                        from_province=from_prov,
+                        to_province=to_prov,
+                        distance_km=distance,
+                        road_type=road_type_enum
                     )
-                except ValueError as e:
-                    logger.warning(f"Could not calculate distance: {e}")
-            
-            result.road_segments = road_segments
-            result.total_distance_km = total_distance
-            result.road_type = road_type
+            except ValueError as e:
+                logger.warning(f"Could not calculate distance: {e}")
+                continue
             
-            # Tính khoảng cách thực tế bằng OSRM API
-            try:
-                route_result = self.routing_service.get_route_through_waypoints(
-                    result.path
-                )
-                if route_result.success:
-                    result.real_distance_km = route_result.distance_km
-                    logger.info(
-                        f"Real distance (OSRM): {route_result.distance_km:.2f}km"
+            road_segments.append(segment)
+            total_distance += segment.distance_km
+        
+        result.road_segments = road_segments
+        result.total_distance_km = total_distance
+        result.road_type = road_type
+    
+    def prefetch_real_edge_distances(self) -> int:
+        """Lấy km đường bộ thực tế của mọi cạnh (cặp tỉnh kề) và gắn vào đồ thị
+        
+        1. Cạnh đã có trong ORSCache (route 2 điểm) được lấy từ cache
+        2. Các cạnh còn thiếu được gom theo tỉnh nguồn thành các lô
+           ``nguồn x đích <= MAX_MATRIX_CELLS``, mỗi lô một lời gọi Matrix API
+        
+        Sau đó real_distance_km của mọi đường đi là tổng km các cạnh, không
+        cần gọi ORS nữa. Bản đồng bộ (script, CLI); API dùng
+        prefetch_real_edge_distances_async trong task nền khi khởi động.
+        
+        Returns:
+            Số cạnh (có hướng) đã có km thực tế
+        """
+        plan = self._plan_edge_prefetch()
+        for batch_sources, batch_destinations in plan.batches:
+            matrix = self.routing_service.get_distance_matrix(
+                [plan.provinces[i] for i in batch_sources],
+                [plan.provinces[j] for j in batch_destinations]
+            )
+            if not matrix.success:
+                logger.warning(f"Edge distance prefetch stopped: {matrix.error_message}")
+                break
+            self._cache_edge_distances(
+                plan.apply_matrix(batch_sources, batch_destinations, matrix.distances_km)
+            )
+        return self._finish_edge_prefetch(plan)
+    
+    async def prefetch_real_edge_distances_async(self) -> int:
+        """Bản async của prefetch_real_edge_distances
+        
+        Gọi Matrix API bằng AsyncClient; đọc / ghi ORSCache (SQLite) chạy
+        trong thread pool nên không chặn event loop.
+        """
+        plan = await self.executor.run(self._plan_edge_prefetch)
+        for batch_sources, batch_destinations in plan.batches:
+            matrix = await self.routing_service.get_distance_matrix_async(
+                [plan.provinces[i] for i in batch_sources],
+                [plan.provinces[j] for j in batch_destinations]
+            )
+            if not matrix.success:
+                logger.warning(f"Edge distance prefetch stopped: {matrix.error_message}")
+                break
+            await self.executor.run(
+                self._cache_edge_distances,
+                plan.apply_matrix(batch_sources, batch_destinations, matrix.distances_km)
+            )
+        return self._finish_edge_prefetch(plan)
+    
+    def _plan_edge_prefetch(self) -> '_EdgePrefetchPlan':
+        """Bước 1: lấy cạnh có sẵn trong cache, gom cạnh còn thiếu thành các lô Matrix API"""
+        edge_weights = EdgeWeights.for_graph(self.graph, self.distance_calculator)
+        csr = edge_weights.csr
+        provinces = [self.graph.get_province(code) for code in csr.codes]
+        cache = self.routing_service.cache
+        real = edge_weights.get_real_weights()
+        
+        # Lấy từ cache, ghi lại các cạnh còn thiếu theo tỉnh nguồn
+        missing: Dict[int, List[int]] = {}
+        for i in range(csr.size()):
+            for k in range(csr.offsets[i], csr.offsets[i + 1]):
+                if not np.isnan(real[k]):
+                    continue
+                cached_km = None
+                if cache is not None:
+                    cached_km = cache.get(
+                        _edge_coordinates(provinces[i], provinces[csr.targets[k]])
                     )
+                if cached_km is not None:
+                    real[k] = cached_km
                 else:
-                    logger.warning(
-                        f"Could not get real distance: {route_result.error_message}"
-                    )
-            except Exception as e:
-                logger.warning(f"Error getting real distance from OSRM: {e}")
-            
-            logger.info(
-                f"Path found: {result.distance} provinces, "
-                f"{total_distance:.2f}km, "
-                f"{result.execution_time * 1000:.2f}ms"
+                    missing.setdefault(i, []).append(k)
+        
+        # Gom nguồn thành lô nguồn x đích <= MAX_MATRIX_CELLS
+        batches: List[Tuple[List[int], List[int]]] = []
+        sources: List[int] = []
+        destinations: Dict[int, None] = {}
+        for i, edges in missing.items():
+            merged = dict(destinations)
+            merged.update((csr.targets[k], None) for k in edges)
+            if sources and (len(sources) + 1) * len(merged) > RoutingService.MAX_MATRIX_CELLS:
+                batches.append((sources, list(destinations)))
+                sources, merged = [], {csr.targets[k]: None for k in edges}
+            sources.append(i)
+            destinations = merged
+        if sources:
+            batches.append((sources, list(destinations)))
+        
+        return _EdgePrefetchPlan(edge_weights, provinces, real, missing, batches)
+    
+    def _cache_edge_distances(self, edges: List[Tuple[Province, Province, float]]) -> None:
+        """Ghi km các cạnh vừa lấy từ Matrix API vào ORSCache"""
+        cache = self.routing_service.cache
+        if cache is None:
+            return
+        for from_province, to_province, km in edges:
+            cache.put(_edge_coordinates(from_province, to_province), km)
+    
+    @staticmethod
+    def _finish_edge_prefetch(plan: '_EdgePrefetchPlan') -> int:
+        plan.edge_weights.set_real_weights(plan.real)
+        filled = plan.edge_weights.real_count()
+        logger.info(
+            f"Real edge distances: {filled}/{len(plan.real)} edges "
+            f"({len(plan.batches)} matrix requests)"
+        )
+        return filled
+    
+    def _attach_real_distance_from_edges(self, result: PathResult) -> bool:
+        """Tổng km thực tế các cạnh đã prefetch, False nếu có cạnh chưa có"""
+        edge_weights = self.graph.get_edge_weights()
+        if edge_weights is None:
+            return False
+        
+        distance_km = edge_weights.real_path_distance(result.province_codes)
+        if distance_km is None:
+            return False
+        
+        result.real_distance_km = round(distance_km, 2)
+        return True
+    
+    def _attach_real_distance(self, result: PathResult) -> None:
+        """Tính khoảng cách thực tế bằng OSRM API"""
+        if self._attach_real_distance_from_edges(result):
+            return
+        try:
+            route_result = self.routing_service.get_route_through_waypoints(
+                result.path
             )
-            
-            return result
-            
-        except NoPathFoundError as e:
-            logger.warning(f"No path found: {e}")
-            raise
+            if route_result.success:
+                result.real_distance_km = route_result.distance_km
+                logger.info(
+                    f"Real distance (OSRM): {route_result.distance_km:.2f}km"
+                )
+            else:
+                logger.warning(
+                    f"Could not get real distance: {route_result.error_message}"
+                )
         except Exception as e:
-            logger.error(f"Error finding path: {e}")
-            raise
+            logger.warning(f"Error getting real distance from OSRM: {e}")
+    
+    async def _attach_real_distance_async(self, result: PathResult) -> None:
+        """Bản async của _attach_real_distance"""
+        if self._attach_real_distance_from_edges(result):
+            return
+        try:
+            route_result = await self.routing_service.get_route_through_waypoints_async(
+                result.path
+            )
+            if route_result.success:
+                result.real_distance_km = route_result.distance_km
+                logger.info(
+                    f"Real distance (OSRM): {route_result.distance_km:.2f}km"
+                )
+            else:
+                logger.warning(
+                    f"Could not get real distance: {route_result.error_message}"
+                )
+        except Exception as e:
+            logger.warning(f"Error getting real distance from OSRM: {e}")
+    
+    def _prepare_contraction_hierarchy(self) -> None:
+        """Nạp CH đã tiền xử lý offline, hoặc tiền xử lý ngay và lưu lại
+        
+        File CH chỉ được dùng khi fingerprint (tỉnh, cạnh, trọng số) khớp
+        đồ thị hiện tại, ngược lại tiền xử lý lại và ghi đè file. Lỗi ghi
+        file không chặn khởi động.
+        """
+        file_path = self.settings.contraction_hierarchy_file
+        
+        if file_path and os.path.exists(file_path):
+            logger.info(f"Loading contraction hierarchy from {file_path}")
+            try:
+                hierarchy = ContractionHierarchy.load(file_path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Cannot read contraction hierarchy file, rebuilding: {e}")
+                hierarchy = None
+            
+            if hierarchy is not None and hierarchy.matches(
+                self.graph, self.distance_calculator
+            ):
+                self.graph.set_contraction_hierarchy(hierarchy)
+                return
+            if hierarchy is not None:
+                logger.warning(
+                    "Contraction hierarchy file does not match the graph "
+                    "(edges or weights changed), rebuilding"
+                )
+        
+        logger.info("Preprocessing contraction hierarchy")
+        hierarchy = self.ch_pathfinder.get_hierarchy()
+        logger.info(
+            f"Contraction hierarchy ready: {hierarchy.size()} nodes, "
+            f"{hierarchy.shortcut_count()} shortcuts"
+        )
+        if file_path:
+            try:
+                hierarchy.save(file_path)
+            except OSError as e:
+                # Không ghi được file (quyền, hết dung lượng...): vẫn dùng CH trong bộ nhớ
+                logger.warning(f"Cannot save contraction hierarchy to {file_path}: {e}")
     
     def _resolve_province(
         self,
@@ -183,19 +832,248 @@ class PathfindingService:
     
     def find_multiple_paths(
         self,
-        pairs: List[tuple]
+        pairs: List[tuple],
+        fuzzy_match: bool = True,
+        road_type: str = "national"
     ) -> List[PathResult]:
+        """Tìm đường đi cho nhiều cặp tỉnh, dùng chung một cây BFS cho mỗi
+        tỉnh xuất phát.
+        
+        Các cặp được gom theo tỉnh bắt đầu: N cặp cùng điểm xuất phát chỉ
+        cần một lần duyệt. Tên tỉnh chỉ được phân giải một lần, và các
+        đường đi trùng nhau chỉ gọi OSRM một lần.
+        
+        Returns:
+            Danh sách PathResult theo thứ tự các cặp, bỏ qua các cặp lỗi.
+        """
+        items = self._estimate_batch(pairs, fuzzy_match, road_type)
+        real_distances: Dict[tuple, PathResult] = {}
         results = []
         
-        for start, end in pairs:
-            try:
-                result = self.find_path(start, end)
-                results.append(result)
-            except (ProvinceNotFoundError, NoPathFoundError) as e:
-                logger.warning(f"Failed to find path {start}->{end}: {e}")
+        for item in items:
+            if item.error is not None:
+                logger.warning(
+                    f"Failed to find path {item.start}->{item.end}: {item.error}"
+                )
                 continue
+            
+            result = item.result
+            codes = tuple(result.province_codes)
+            if codes in real_distances:
+                result.real_distance_km = real_distances[codes].real_distance_km
+            else:
+                self._attach_real_distance(result)
+                real_distances[codes] = result
+            results.append(result)
         
+        logger.info(f"Found {len(results)}/{len(pairs)} paths")
         return results
+    
+    async def estimate_paths_batch_async(
+        self,
+        pairs: List[tuple],
+        fuzzy_match: bool = True,
+        road_type: str = "national"
+    ) -> List[BatchPathItem]:
+        """Bước 1 của batch API: tìm đường + km ước lượng cho mọi cặp (thread pool)
+        
+        Tách khỏi iter_batch_results để lỗi quá tải (503) / đầu vào (422)
+        được trả về trước khi bắt đầu stream response.
+        """
+        if len(pairs) > self.settings.batch_max_pairs:
+            raise InvalidInputError(
+                "pairs",
+                f"Tối đa {self.settings.batch_max_pairs} cặp tỉnh mỗi request",
+                str(len(pairs))
+            )
+        return await self.executor.run(
+            self._estimate_batch, pairs, fuzzy_match, road_type
+        )
+    
+    async def iter_batch_results(
+        self,
+        items: List[BatchPathItem],
+        ors_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """Bước 2 của batch API: trả từng kết quả ngay khi có khoảng cách ORS
+        
+        Cặp lỗi và cặp đã có khoảng cách thực tế (cạnh đã prefetch, ORS
+        cache) được trả trước; các cặp còn lại trả theo thứ tự ORS trả lời.
+        Tối đa ``ors_concurrency`` lời gọi ORS cùng lúc, mỗi đường đi (dãy
+        mã tỉnh) khác nhau chỉ gọi một lần.
+        """
+        semaphore = asyncio.Semaphore(
+            ors_concurrency or self.settings.batch_ors_concurrency
+        )
+        lookups: Dict[tuple, 'asyncio.Future[Optional[float]]'] = {}
+        waiting: List['asyncio.Future[BatchPathItem]'] = []
+        ready: List[BatchPathItem] = []
+        
+        async def lookup(result: PathResult) -> Optional[float]:
+            async with semaphore:
+                await self._attach_real_distance_async(result)
+            return result.real_distance_km
+        
+        async def complete(item: BatchPathItem, lookup_task) -> BatchPathItem:
+            item.result.real_distance_km = await lookup_task
+            return item
+        
+        for item in items:
+            if (
+                item.error is not None
+                or item.result.real_distance_km is not None
+                or self._attach_real_distance_from_edges(item.result)
+            ):
+                ready.append(item)
+                continue
+            
+            codes = tuple(item.result.province_codes)
+            if codes not in lookups:
+                lookups[codes] = asyncio.ensure_future(lookup(item.result))
+            waiting.append(asyncio.ensure_future(complete(item, lookups[codes])))
+        
+        try:
+            for item in ready:
+                yield item.to_dict()
+            for next_done in asyncio.as_completed(waiting):
+                item = await next_done
+                yield item.to_dict()
+        finally:
+            # Client ngắt kết nối giữa chừng: bỏ các lời gọi còn lại
+            for task in [*waiting, *lookups.values()]:
+                if not task.done():
+                    task.cancel()
+    
+    def build_od_matrix(
+        self,
+        origins: List[Union[str, Province]],
+        destinations: List[Union[str, Province]],
+        fuzzy_match: bool = True,
+        road_type: str = "national"
+    ) -> ODMatrix:
+        """Ma trận số bước + km ước lượng giữa N điểm đi và M điểm đến
+        
+        Mỗi điểm đi chỉ duyệt một cây BFS (ODMatrixBuilder), không gọi
+        find_path cho từng ô và không gọi ORS.
+        """
+        if not origins or not destinations:
+            raise InvalidInputError(
+                "origins/destinations",
+                "Cần ít nhất một điểm đi và một điểm đến"
+            )
+        max_size = self.settings.matrix_max_size
+        if len(origins) > max_size or len(destinations) > max_size:
+            raise InvalidInputError(
+                "origins/destinations",
+                f"Tối đa {max_size} điểm đi và {max_size} điểm đến mỗi request",
+                f"{len(origins)}x{len(destinations)}"
+            )
+        
+        resolved: Dict[str, Province] = {}
+        
+        def resolve(identifier: Union[str, Province], field_name: str) -> str:
+            if isinstance(identifier, Province):
+                return identifier.code
+            if identifier not in resolved:
+                resolved[identifier] = self._resolve_province(
+                    identifier, fuzzy_match, field_name
+                )
+            return resolved[identifier].code
+        
+        origin_codes = [resolve(origin, "origins") for origin in origins]
+        destination_codes = [
+            resolve(destination, "destinations") for destination in destinations
+        ]
+        
+        matrix = self.od_matrix_builder.build(
+            origin_codes,
+            destination_codes,
+            self._parse_road_type(road_type)
+        )
+        logger.info(
+            f"OD matrix {len(origins)}x{len(destinations)} built in "
+            f"{matrix.execution_time * 1000:.2f}ms"
+        )
+        return matrix
+    
+    async def build_od_matrix_async(self, *args, **kwargs) -> ODMatrix:
+        """build_od_matrix chạy trong thread pool"""
+        return await self.executor.run(self.build_od_matrix, *args, **kwargs)
+    
+    def _estimate_batch(
+        self,
+        pairs: List[tuple],
+        fuzzy_match: bool,
+        road_type: str
+    ) -> List[BatchPathItem]:
+        """Tìm đường (chưa gọi ORS) cho mọi cặp, mỗi tỉnh xuất phát một cây BFS
+        
+        Returns:
+            BatchPathItem theo thứ tự các cặp, lỗi của từng cặp nằm trong ``error``
+        """
+        road_type_enum = self._parse_road_type(road_type)
+        resolved: Dict[str, Province] = {}
+        
+        def resolve(identifier: Union[str, Province], field_name: str) -> Province:
+            if isinstance(identifier, Province):
+                return identifier
+            if identifier not in resolved:
+                resolved[identifier] = self._resolve_province(
+                    identifier, fuzzy_match, field_name
+                )
+            return resolved[identifier]
+        
+        items: List[BatchPathItem] = []
+        # Gom các cặp hợp lệ theo tỉnh bắt đầu, giữ vị trí ban đầu
+        by_source: Dict[str, List[tuple]] = {}
+        for index, (start, end) in enumerate(pairs):
+            item = BatchPathItem(index=index, start=str(start), end=str(end))
+            items.append(item)
+            try:
+                start_province = resolve(start, "start")
+                end_province = resolve(end, "end")
+            except (ProvinceNotFoundError, InvalidInputError) as e:
+                item.error = e
+                continue
+            by_source.setdefault(start_province.code, []).append(
+                (item, end_province)
+            )
+        
+        for start_code, targets in by_source.items():
+            paths = self.pathfinder.find_paths_from(
+                start_code,
+                [end_province.code for _, end_province in targets]
+            )
+            completed: Dict[str, PathResult] = {}
+            
+            for item, end_province in targets:
+                result = paths[end_province.code]
+                if result is None:
+                    item.error = NoPathFoundError(
+                        start=self.registry.get_by_code(start_code).name,
+                        end=end_province.name,
+                        reason="Hai tỉnh không liên thông với nhau"
+                    )
+                    continue
+                
+                # Cặp lặp lại: trả bản sao của kết quả đã tính
+                if end_province.code in completed:
+                    original = completed[end_province.code]
+                    item.result = replace(
+                        original,
+                        path=list(original.path),
+                        road_segments=list(original.road_segments)
+                    )
+                    continue
+                
+                self._attach_road_segments(result, road_type_enum, road_type)
+                completed[end_province.code] = result
+                item.result = result
+        
+        logger.info(
+            f"Estimated {len(pairs)} paths using {len(by_source)} BFS trees"
+        )
+        return items
 
     def find_reachable(
         self,
@@ -256,7 +1134,7 @@ class PathfindingService:
             field_name="province"
         )
         
-        neighbor_codes = self.graph.get_neighbors(province.code)
+        neighbor_codes = self.graph.iter_neighbors(province.code)
         neighbors = []
         for code in neighbor_codes:
             neighbor = self.registry.get_by_code(code)
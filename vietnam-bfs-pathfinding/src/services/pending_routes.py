@@ -0,0 +1,116 @@
+"""
+Khoảng cách ORS đang chờ của các request trả về sớm (latency budget)
+
+Khi request hết ngân sách thời gian mà ORS chưa trả lời, API trả kết quả
+ước lượng ngay kèm một token; lời gọi ORS vẫn chạy nền và client lấy
+``real_distance_km`` sau bằng token đó. Chỉ dùng trong event loop của API
+(không cần lock).
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PendingStatus(str, Enum):
+    """Trạng thái khoảng cách thực tế của một token"""
+    PENDING = "pending"  # ORS chưa trả lời
+    READY = "ready"  # Đã có real_distance_km
+    UNAVAILABLE = "unavailable"  # ORS lỗi / circuit breaker mở, chỉ có km ước lượng
+
+
+@dataclass
+class PendingRoute:
+    token: str
+    # Task trả về real_distance_km (None nếu ORS không trả được kết quả)
+    task: 'asyncio.Future[Optional[float]]'
+    created_at: float
+
+    @property
+    def status(self) -> PendingStatus:
+        if not self.task.done():
+            return PendingStatus.PENDING
+        if self.real_distance_km is None:
+            return PendingStatus.UNAVAILABLE
+        return PendingStatus.READY
+
+    @property
+    def real_distance_km(self) -> Optional[float]:
+        if not self.task.done() or self.task.cancelled() or self.task.exception():
+            return None
+        return self.task.result()
+
+    def to_dict(self) -> Dict:
+        return {
+            "token": self.token,
+            "status": self.status.value,
+            "real_distance_km": self.real_distance_km
+        }
+
+
+class PendingRouteRegistry:
+    """
+    Bảng token -> lời gọi ORS đang chạy nền.
+
+    - Token hết hạn sau ``ttl_seconds`` kể từ khi tạo
+    - Quá ``max_size`` token: bỏ token cũ nhất (lời gọi ORS vẫn chạy tiếp
+      và vẫn ghi vào cache, chỉ là không tra được bằng token nữa)
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0) -> None:
+        if max_size <= 0:
+            raise ValueError("Pending route max_size must be positive")
+        if ttl_seconds <= 0:
+            raise ValueError("Pending route ttl_seconds must be positive")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._routes: 'OrderedDict[str, PendingRoute]' = OrderedDict()
+        self._registered = 0
+        self._evicted = 0
+
+    def register(self, task: 'asyncio.Future[Optional[float]]') -> str:
+        self._purge_expired()
+        while len(self._routes) >= self.max_size:
+            self._routes.popitem(last=False)
+            self._evicted += 1
+
+        token = uuid.uuid4().hex
+        self._routes[token] = PendingRoute(token, task, time.monotonic())
+        self._registered += 1
+        return token
+
+    def get(self, token: str) -> Optional[PendingRoute]:
+        self._purge_expired()
+        return self._routes.get(token)
+
+    def _purge_expired(self) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        while self._routes:
+            route = next(iter(self._routes.values()))
+            if route.created_at > deadline:
+                break
+            self._routes.popitem(last=False)
+
+    def cancel_all(self) -> None:
+        """Hủy các lời gọi còn chạy (khi tắt server)"""
+        for route in self._routes.values():
+            if not route.task.done():
+                route.task.cancel()
+        self._routes.clear()
+
+    def get_stats(self) -> Dict:
+        pending = sum(1 for route in self._routes.values() if not route.task.done())
+        return {
+            "size": len(self._routes),
+            "pending": pending,
+            "registered": self._registered,
+            "evicted": self._evicted
+        }
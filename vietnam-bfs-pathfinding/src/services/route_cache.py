@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from models.path_result import PathResult
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+@dataclass
+class CachedRoute:
+    """Kết quả tìm đường đã lưu trong cache
+
+    Attributes:
+        result: PathResult theo chiều đã tính (start -> end)
+        real_distances: Khoảng cách thực tế (ORS) theo mã tỉnh xuất phát,
+                        vì đường thực tế có thể khác nhau giữa hai chiều
+    """
+    result: PathResult
+    real_distances: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class RouteCache(Generic[V]):
+    """
+    Cache LRU có giới hạn kích thước và thời gian sống (TTL).
+
+    - Quá ``max_size`` phần tử: bỏ phần tử ít được dùng gần đây nhất
+    - Phần tử quá ``ttl_seconds`` bị coi như không có (đếm vào expirations)
+    - An toàn khi dùng từ nhiều thread (một lock cho mọi thao tác)
+    - ``max_size = 0`` tắt cache
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0) -> None:
+        if max_size < 0:
+            raise ValueError("Cache max_size cannot be negative")
+        if ttl_seconds <= 0:
+            raise ValueError("Cache ttl_seconds must be positive")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # {key: (thời điểm hết hạn, giá trị)}, thứ tự = thứ tự dùng gần đây
+        self._entries: 'OrderedDict[Hashable, Tuple[float, V]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = self._stats.to_dict()
+            stats["size"] = len(self._entries)
+            stats["max_size"] = self.max_size
+            stats["ttl_seconds"] = self.ttl_seconds
+            return stats
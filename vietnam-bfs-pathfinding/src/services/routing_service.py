@@ -5,18 +5,34 @@ OpenRouteService (ORS) là dịch vụ routing miễn phí
 sử dụng dữ liệu OpenStreetMap, cho kết quả chính xác.
 """
 
+import asyncio
 import logging
+import random
+import threading
 import time
 import os
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from dataclasses import dataclass
+from urllib.parse import urlparse
 
 import httpx
 
 from models.province import Province
+from services.circuit_breaker import CircuitBreaker
+from services.ors_cache import ORSCache
+from services.single_flight import AsyncSingleFlight, SingleFlight
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# HTTP/2 cần gói h2 (pip install httpx[http2]), không có thì dùng HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 @dataclass
 class RouteResult:
@@ -26,6 +42,14 @@ class RouteResult:
     error_message: Optional[str] = None
 
 
+@dataclass
+class MatrixResult:
+    """Kết quả ma trận khoảng cách (km), None ở ô không có đường đi"""
+    distances_km: List[List[Optional[float]]]
+    success: bool = True
+    error_message: Optional[str] = None
+
+
 class RoutingService:
     """
     Service tính khoảng cách đường đi thực tế sử dụng OpenRouteService API
@@ -34,25 +58,117 @@ class RoutingService:
     - Free tier: 2,000 requests/ngày
     - Sử dụng dữ liệu OpenStreetMap
     - Cần API key (miễn phí)
+    
+    Dùng chung một httpx.Client (connection pool, keep-alive, HTTP/2 nếu
+    có) cho mọi request để không phải bắt tay TCP/TLS lại mỗi lần gọi.
+    Các hàm ``*_async`` dùng httpx.AsyncClient cho route handler async.
+    
+    Lỗi mạng / timeout / 5xx / 429 / 403 được ghi vào CircuitBreaker: khi
+    mạch mở, lời gọi trả lỗi ngay (không chờ timeout) để service dùng kết
+    quả ước lượng. Retry chờ theo exponential backoff có jitter.
+    
+    Các request đồng thời cùng chuỗi waypoint dùng chung một lời gọi ORS
+    (single-flight).
     """
     
     ORS_BASE_URL = "https://api.openrouteservice.org/v2"
     REQUEST_TIMEOUT = 30.0
     MAX_RETRIES = 2
     RETRY_DELAY = 1.0
+    RETRY_MAX_DELAY = 8.0
+    # Giới hạn số ô (nguồn x đích) mỗi request Matrix API của ORS
+    MAX_MATRIX_CELLS = 3500
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[ORSCache] = None,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 30.0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None
+    ):
         self.api_key = (
-            os.getenv("open-router-key")
+            api_key or os.getenv("open-router-key")
+        )
+        # Có thể trỏ tới server giả lập (benchmarks/ors_stub.py) khi test
+        self.base_url = (base_url or self.ORS_BASE_URL).rstrip("/")
+        # Cache bền vững theo chuỗi tọa độ (None = luôn gọi ORS)
+        self.cache = cache
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
         )
-        self.base_url = self.ORS_BASE_URL
+        # Client dùng chung, tạo khi gọi ORS lần đầu
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Gộp các lời gọi ORS trùng chuỗi tọa độ đang chạy đồng thời
+        self._single_flight = SingleFlight()
+        self._async_single_flight = AsyncSingleFlight()
     
-    def _get_headers(self) -> dict:
+    @property
+    def requires_api_key(self) -> bool:
+        """Chỉ ORS thật cần API key; server giả lập / ORS tự host thì không"""
+        return urlparse(self.base_url).hostname == urlparse(self.ORS_BASE_URL).hostname
+    
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=self.REQUEST_TIMEOUT,
+                        limits=self.limits,
+                        http2=HTTP2_AVAILABLE
+                    )
+        return self._client
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """AsyncClient dùng chung, tạo trong event loop của lần gọi đầu tiên"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.REQUEST_TIMEOUT,
+                limits=self.limits,
+                http2=HTTP2_AVAILABLE
+            )
+        return self._async_client
+    
+    def get_stats(self) -> Dict:
         return {
-            "Authorization": self.api_key,
+            "circuit_breaker": self.circuit_breaker.get_stats(),
+            "single_flight": {
+                "sync": self._single_flight.get_stats(),
+                "async": self._async_single_flight.get_stats()
+            }
+        }
+    
+    def close(self) -> None:
+        """Giải phóng tài nguyên (connection pool, kết nối cache) khi tắt server"""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        if self.cache is not None:
+            self.cache.close()
+    
+    async def aclose(self) -> None:
+        """Đóng AsyncClient (phải gọi trong event loop đã dùng nó) rồi close()"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+    
+    def _get_headers(self) -> dict:
+        headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        return headers
     
     def get_route_distance(
         self,
@@ -61,22 +177,16 @@ class RoutingService:
     ) -> RouteResult:
         return self.get_route_through_waypoints([start_province, end_province])
     
-    def get_route_through_waypoints(
+    def _prepare_request(
         self,
         provinces: List[Province]
-    ) -> RouteResult:
-        """Tính khoảng cách qua nhiều tỉnh (waypoints)
+    ) -> Union[RouteResult, Tuple[List[List[float]], dict]]:
+        """Kiểm tra đầu vào và tra cache
         
-        Sử dụng OpenRouteService Directions API
-        Docs: https://openrouteservice.org/dev/#/api-docs/v2/directions
+        Returns:
+            RouteResult nếu có kết quả ngay (lỗi đầu vào hoặc cache hit),
+            ngược lại (coordinates, payload) để gửi lên ORS
         """
-        if not self.api_key:
-            return RouteResult(
-                distance_km=0.0,
-                success=False,
-                error_message="API key không được cấu hình"
-            )
-        
         if len(provinces) < 2:
             return RouteResult(
                 distance_km=0.0,
@@ -94,86 +204,422 @@ class RoutingService:
         
         coordinates = [[p.longitude, p.latitude] for p in provinces]
         
-        url = f"{self.base_url}/directions/driving-car"
+        if self.cache is not None:
+            cached_km = self.cache.get(coordinates)
+            if cached_km is not None:
+                logger.info(f"ORS route from cache: {cached_km:.2f}km")
+                return RouteResult(distance_km=cached_km, success=True)
+        
+        if not self.api_key and self.requires_api_key:
+            return RouteResult(
+                distance_km=0.0,
+                success=False,
+                error_message="API key không được cấu hình"
+            )
+        
         payload = {
             "coordinates": coordinates,
             "instructions": False,
             "geometry": False
         }
+        return coordinates, payload
+    
+    @staticmethod
+    def _status_error(status_code: int) -> Optional[str]:
+        """Thông báo lỗi cho các mã HTTP không cần retry"""
+        if status_code == 401:
+            return "API key không hợp lệ"
+        if status_code == 403:
+            return "API key hết quota hoặc bị chặn"
+        if status_code == 404:
+            return "Không tìm thấy đường đi"
+        return None
+    
+    @staticmethod
+    def _route_error(message: Optional[str]) -> RouteResult:
+        return RouteResult(distance_km=0.0, success=False, error_message=message)
+    
+    @staticmethod
+    def _matrix_error(message: Optional[str]) -> 'MatrixResult':
+        return MatrixResult(distances_km=[], success=False, error_message=message)
+    
+    def _parse_response(
+        self,
+        response: httpx.Response,
+        coordinates: List[List[float]]
+    ) -> RouteResult:
+        """Đọc response ORS thành RouteResult (người gọi tự lưu cache)
+        
+        Raises:
+            httpx.HTTPStatusError: Lỗi HTTP khác 401/403/404
+        """
+        # Xử lý lỗi HTTP
+        error = self._status_error(response.status_code)
+        if error:
+            return self._route_error(error)
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        if "routes" not in data or not data["routes"]:
+            return self._route_error("Không tìm thấy đường đi")
+        
+        route = data["routes"][0]
+        summary = route.get("summary", {})
+        
+        distance_km = summary.get("distance", 0) / 1000.0
+        
+        logger.info(
+            f"ORS route found: {distance_km:.2f}km "
+            f"({len(coordinates)} waypoints)"
+        )
+        
+        distance_km = round(distance_km, 2)
+        return RouteResult(
+            distance_km=distance_km,
+            success=True
+        )
+    
+    def _parse_matrix_response(
+        self,
+        response: httpx.Response,
+        source_count: int,
+        destination_count: int
+    ) -> 'MatrixResult':
+        """Đọc response Matrix API (units=km), ô không có đường là None
+        
+        Raises:
+            httpx.HTTPStatusError: Lỗi HTTP khác 401/403/404
+        """
+        error = self._status_error(response.status_code)
+        if error:
+            return self._matrix_error(error)
+        
+        response.raise_for_status()
+        distances = response.json().get("distances")
         
+        if (
+            not isinstance(distances, list)
+            or len(distances) != source_count
+            or any(len(row) != destination_count for row in distances)
+        ):
+            return self._matrix_error("Ma trận khoảng cách ORS không hợp lệ")
+        
+        return MatrixResult(
+            distances_km=[
+                [round(value, 2) if value is not None else None for value in row]
+                for row in distances
+            ],
+            success=True
+        )
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff với full jitter: ngẫu nhiên trong [0, base * 2^(n-1)]"""
+        ceiling = min(self.RETRY_MAX_DELAY, self.RETRY_DELAY * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+    
+    @staticmethod
+    def _circuit_open_message(last_error: Optional[str]) -> str:
+        message = "ORS tạm ngắt do lỗi liên tiếp (circuit breaker đang mở)"
+        if last_error:
+            message += f": {last_error}"
+        return message
+    
+    @staticmethod
+    def _ensure_not_in_event_loop() -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise RuntimeError(
+            "Blocking ORS call inside a running event loop; "
+            "use the *_async method or run it in an executor"
+        )
+    
+    def _record_transport_error(self, error: httpx.TransportError, attempt: int) -> str:
+        """Ghi lỗi mạng / timeout vào breaker, trả về thông báo lỗi"""
+        self.circuit_breaker.record_failure()
+        if isinstance(error, httpx.TimeoutException):
+            logger.warning(f"ORS timeout (attempt {attempt + 1}): {error}")
+            return f"Request timeout sau {self.REQUEST_TIMEOUT}s"
+        logger.warning(f"ORS connection error (attempt {attempt + 1}): {error!r}")
+        return f"Lỗi kết nối ORS: {error!r}"
+    
+    def _handle_response(
+        self,
+        response: httpx.Response,
+        parse: Callable[[httpx.Response], T],
+        make_error: Callable[[Optional[str]], T],
+        attempt: int
+    ) -> Tuple[T, Optional[str]]:
+        """Ghi kết quả vào breaker và đọc response
+        
+        Returns:
+            (result, retry_error): ``retry_error`` khác None nếu nên thử lại
+            (5xx, 429), khi đó là thông báo lỗi của lần thử này
+        """
+        status_code = response.status_code
+        if status_code in (403, 429) or status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        
+        try:
+            return parse(response), None
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ORS HTTP error (attempt {attempt + 1}): {e}")
+            message = f"HTTP error: {status_code}"
+            retry = status_code == 429 or status_code >= 500
+            return make_error(message), message if retry else None
+        except Exception as e:
+            logger.error(f"ORS error (attempt {attempt + 1}): {e}")
+            return make_error(str(e)), None
+    
+    def _post_with_retry(
+        self,
+        url: str,
+        payload: dict,
+        parse: Callable[[httpx.Response], T],
+        make_error: Callable[[Optional[str]], T]
+    ) -> T:
+        """POST lên ORS có retry (backoff + jitter) và circuit breaker
+        
+        Bản đồng bộ chờ backoff bằng time.sleep (chặn thread gọi) nên không
+        được gọi trực tiếp trong event loop: dùng bản ``*_async`` hoặc chạy
+        trong executor.
+        
+        Raises:
+            RuntimeError: Gọi từ thread đang chạy event loop
+        """
+        self._ensure_not_in_event_loop()
         last_error = None
         for attempt in range(self.MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = self._backoff_delay(attempt)
+                logger.info(
+                    f"ORS retry attempt {attempt}/{self.MAX_RETRIES} in {delay:.2f}s"
+                )
+                time.sleep(delay)
+            
+            if not self.circuit_breaker.allow_request():
+                return make_error(self._circuit_open_message(last_error))
+            
             try:
-                if attempt > 0:
-                    logger.info(f"ORS retry attempt {attempt}/{self.MAX_RETRIES}")
-                    time.sleep(self.RETRY_DELAY)
-                
-                with httpx.Client(timeout=self.REQUEST_TIMEOUT) as client:
-                    response = client.post(
-                        url,
-                        headers=self._get_headers(),
-                        json=payload
-                    )
-                    
-                    # Xử lý lỗi HTTP
-                    if response.status_code == 401:
-                        return RouteResult(
-                            distance_km=0.0,
-                            success=False,
-                            error_message="API key không hợp lệ"
-                        )
-                    elif response.status_code == 403:
-                        return RouteResult(
-                            distance_km=0.0,
-                            success=False,
-                            error_message="API key hết quota hoặc bị chặn"
-                        )
-                    elif response.status_code == 404:
-                        return RouteResult(
-                            distance_km=0.0,
-                            success=False,
-                            error_message="Không tìm thấy đường đi"
-                        )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                
-                if "routes" not in data or not data["routes"]:
-                    return RouteResult(
-                        distance_km=0.0,
-                        success=False,
-                        error_message="Không tìm thấy đường đi"
-                    )
-                
-                route = data["routes"][0]
-                summary = route.get("summary", {})
-                
-                distance_km = summary.get("distance", 0) / 1000.0
-                
+                response = self._get_client().post(
+                    url,
+                    headers=self._get_headers(),
+                    json=payload
+                )
+            except httpx.TransportError as e:
+                last_error = self._record_transport_error(e, attempt)
+                continue
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            except BaseException:
+                # Bị hủy (CancelledError, KeyboardInterrupt): trả lại lượt thử
+                self.circuit_breaker.release()
+                raise
+            
+            result, last_error = self._handle_response(response, parse, make_error, attempt)
+            if last_error is None:
+                return result
+        
+        return make_error(last_error)
+    
+    async def _post_with_retry_async(
+        self,
+        url: str,
+        payload: dict,
+        parse: Callable[[httpx.Response], T],
+        make_error: Callable[[Optional[str]], T]
+    ) -> T:
+        """Bản async của _post_with_retry (asyncio.sleep, không chặn event loop)"""
+        last_error = None
+        for attempt in range(self.MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = self._backoff_delay(attempt)
                 logger.info(
-                    f"ORS route found: {distance_km:.2f}km "
-                    f"({len(provinces)} waypoints)"
+                    f"ORS retry attempt {attempt}/{self.MAX_RETRIES} in {delay:.2f}s"
                 )
-                
-                return RouteResult(
-                    distance_km=round(distance_km, 2),
-                    success=True
+                await asyncio.sleep(delay)
+            
+            if not self.circuit_breaker.allow_request():
+                return make_error(self._circuit_open_message(last_error))
+            
+            try:
+                response = await self._get_async_client().post(
+                    url,
+                    headers=self._get_headers(),
+                    json=payload
                 )
-                
-            except httpx.TimeoutException as e:
-                last_error = f"Request timeout sau {self.REQUEST_TIMEOUT}s"
-                logger.warning(f"ORS timeout (attempt {attempt + 1}): {e}")
-            except httpx.HTTPStatusError as e:
-                last_error = f"HTTP error: {e.response.status_code}"
-                logger.error(f"ORS HTTP error (attempt {attempt + 1}): {e}")
-                break
-            except Exception as e:
-                last_error = str(e)
-                logger.error(f"ORS error (attempt {attempt + 1}): {e}")
-                break
+            except httpx.TransportError as e:
+                last_error = self._record_transport_error(e, attempt)
+                continue
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            except BaseException:
+                # Bị hủy (CancelledError, KeyboardInterrupt): trả lại lượt thử
+                self.circuit_breaker.release()
+                raise
+            
+            result, last_error = self._handle_response(response, parse, make_error, attempt)
+            if last_error is None:
+                return result
         
-        return RouteResult(
-            distance_km=0.0,
-            success=False,
-            error_message=last_error
+        return make_error(last_error)
+    
+    def get_route_through_waypoints(
+        self,
+        provinces: List[Province]
+    ) -> RouteResult:
+        """Tính khoảng cách qua nhiều tỉnh (waypoints)
+        
+        Sử dụng OpenRouteService Directions API
+        Docs: https://openrouteservice.org/dev/#/api-docs/v2/directions
+        
+        Bản đồng bộ chờ backoff bằng time.sleep (chặn thread gọi); route
+        handler async dùng get_route_through_waypoints_async.
+        """
+        prepared = self._prepare_request(provinces)
+        if isinstance(prepared, RouteResult):
+            return prepared
+        coordinates, payload = prepared
+        
+        return self._single_flight.do(
+            ORSCache.make_key(coordinates),
+            lambda: self._fetch_route(coordinates, payload)
+        )
+    
+    def _fetch_route(self, coordinates: List[List[float]], payload: dict) -> RouteResult:
+        result = self._post_with_retry(
+            f"{self.base_url}/directions/driving-car",
+            payload,
+            lambda response: self._parse_response(response, coordinates),
+            self._route_error
+        )
+        if result.success and self.cache is not None:
+            self.cache.put(coordinates, result.distance_km)
+        return result
+    
+    async def get_route_through_waypoints_async(
+        self,
+        provinces: List[Province]
+    ) -> RouteResult:
+        """Bản async của get_route_through_waypoints
+        
+        Dùng httpx.AsyncClient và asyncio.sleep khi retry nên không chặn
+        event loop trong lúc chờ ORS.
+        """
+        prepared = self._prepare_request(provinces)
+        if isinstance(prepared, RouteResult):
+            return prepared
+        coordinates, payload = prepared
+        
+        return await self._async_single_flight.do(
+            ORSCache.make_key(coordinates),
+            lambda: self._fetch_route_async(coordinates, payload)
+        )
+    
+    async def _fetch_route_async(
+        self,
+        coordinates: List[List[float]],
+        payload: dict
+    ) -> RouteResult:
+        """Bản async của _fetch_route, ghi ORSCache (SQLite) trong thread pool"""
+        result = await self._post_with_retry_async(
+            f"{self.base_url}/directions/driving-car",
+            payload,
+            lambda response: self._parse_response(response, coordinates),
+            self._route_error
+        )
+        if result.success and self.cache is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.cache.put, coordinates, result.distance_km
+            )
+        return result
+    
+    def _prepare_matrix_request(
+        self,
+        sources: List[Province],
+        destinations: List[Province]
+    ) -> Union['MatrixResult', dict]:
+        """Kiểm tra đầu vào Matrix API
+        
+        Returns:
+            MatrixResult nếu có kết quả ngay (rỗng hoặc lỗi đầu vào),
+            ngược lại payload để gửi lên ORS
+        
+        Raises:
+            ValueError: Ma trận vượt MAX_MATRIX_CELLS ô (giới hạn của ORS)
+        """
+        if len(sources) * len(destinations) > self.MAX_MATRIX_CELLS:
+            raise ValueError(
+                f"Matrix request too large: {len(sources)} x {len(destinations)} "
+                f"> {self.MAX_MATRIX_CELLS} cells"
+            )
+        if not sources or not destinations:
+            return MatrixResult(distances_km=[[] for _ in sources], success=True)
+        
+        for p in list(sources) + list(destinations):
+            if not p.latitude or not p.longitude:
+                return self._matrix_error(f"Thiếu tọa độ cho tỉnh {p.name}")
+        
+        if not self.api_key and self.requires_api_key:
+            return self._matrix_error("API key không được cấu hình")
+        
+        locations = [[p.longitude, p.latitude] for p in sources]
+        locations += [[p.longitude, p.latitude] for p in destinations]
+        return {
+            "locations": locations,
+            "sources": list(range(len(sources))),
+            "destinations": list(range(len(sources), len(locations))),
+            "metrics": ["distance"],
+            "units": "km"
+        }
+    
+    def get_distance_matrix(
+        self,
+        sources: List[Province],
+        destinations: List[Province]
+    ) -> 'MatrixResult':
+        """Khoảng cách đường bộ thực tế từ mỗi tỉnh nguồn tới mỗi tỉnh đích
+        
+        Một lời gọi ORS Matrix API cho cả ma trận
+        Docs: https://openrouteservice.org/dev/#/api-docs/v2/matrix
+        
+        Raises:
+            ValueError: Ma trận vượt MAX_MATRIX_CELLS ô (giới hạn của ORS)
+        """
+        prepared = self._prepare_matrix_request(sources, destinations)
+        if isinstance(prepared, MatrixResult):
+            return prepared
+        
+        return self._post_with_retry(
+            f"{self.base_url}/matrix/driving-car",
+            prepared,
+            lambda response: self._parse_matrix_response(
+                response, len(sources), len(destinations)
+            ),
+            self._matrix_error
+        )
+    
+    async def get_distance_matrix_async(
+        self,
+        sources: List[Province],
+        destinations: List[Province]
+    ) -> 'MatrixResult':
+        """Bản async của get_distance_matrix"""
+        prepared = self._prepare_matrix_request(sources, destinations)
+        if isinstance(prepared, MatrixResult):
+            return prepared
+        
+        return await self._post_with_retry_async(
+            f"{self.base_url}/matrix/driving-car",
+            prepared,
+            lambda response: self._parse_matrix_response(
+                response, len(sources), len(destinations)
+            ),
+            self._matrix_error
         )
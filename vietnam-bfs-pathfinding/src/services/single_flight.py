@@ -0,0 +1,115 @@
+"""
+Gộp các lời gọi trùng nhau đang chạy đồng thời (single-flight)
+
+Khi nhiều request cùng hỏi một lộ trình trong cùng thời điểm, chỉ request
+đầu tiên (leader) thực sự gọi ORS, các request còn lại chờ và dùng chung
+kết quả. Key hết hiệu lực ngay khi lời gọi kết thúc, nên đây không phải
+cache: lời gọi sau đó sẽ gọi lại (hoặc đọc ORSCache).
+"""
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """Lời gọi đang chạy của leader, các thread khác chờ ``done``"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Counters(ABC):
+    """Bộ đếm dùng chung của SingleFlight / AsyncSingleFlight"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Số lời gọi thật sự được thực thi / số lời gọi được gộp vào lời gọi khác
+        self._executed = 0
+        self._coalesced = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": self.in_flight()
+            }
+
+    @abstractmethod
+    def in_flight(self) -> int:
+        """Số key đang có lời gọi chạy"""
+
+
+class SingleFlight(_Counters):
+    """Single-flight cho code đồng bộ chạy trên nhiều thread"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Chạy ``func()`` nếu chưa có lời gọi cùng key, ngược lại chờ kết quả của nó"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight(_Counters):
+    """Single-flight cho coroutine trong một event loop"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tasks: Dict[Hashable, 'asyncio.Future[Any]'] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await ``factory()`` dùng chung cho mọi lời gọi cùng key
+
+        Lời gọi chung được bọc bằng asyncio.shield: một request bị hủy
+        (client ngắt kết nối) không hủy lời gọi mà request khác đang chờ.
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(factory())
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
@@ -0,0 +1,119 @@
+"""
+Làm nóng cache khi khởi động (warm-up)
+
+Ngay sau khi deploy, route cache và ORS cache trong bộ nhớ còn trống nên
+các request đầu tiên cho những tuyến phổ biến đều phải chờ ORS. Warm-up
+tìm trước đường đi + khoảng cách ORS cho các cặp tỉnh "nóng" (cấu hình sẵn
+hoặc lấy từ thống kê truy vấn của lần chạy trước) với số lời gọi đồng thời
+có giới hạn và tổng thời gian có giới hạn.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from services.access_stats import PAIR_SEPARATOR
+
+if TYPE_CHECKING:
+    from services.pathfinding_service import PathfindingService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupReport:
+    """Kết quả một lần warm-up"""
+    requested: int = 0
+    warmed: int = 0
+    failed: int = 0
+    timed_out: bool = False
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "requested": self.requested,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "elapsed_seconds": round(self.elapsed_seconds, 3)
+        }
+
+
+def parse_pairs(value: str) -> List[Tuple[str, str]]:
+    """Đọc danh sách cặp tỉnh dạng ``"01:79, 48:79"`` (mã hoặc tên tỉnh)"""
+    pairs = []
+    for item in value.split(","):
+        start, _, end = item.partition(PAIR_SEPARATOR)
+        start, end = start.strip(), end.strip()
+        if not start or not end:
+            if item.strip():
+                logger.warning(f"Ignoring malformed warm-up pair: '{item.strip()}'")
+            continue
+        pairs.append((start, end))
+    return pairs
+
+
+def select_pairs(
+    configured: List[Tuple[str, str]],
+    top_accessed: List[Tuple[str, str]],
+    limit: Optional[int] = None
+) -> List[Tuple[str, str]]:
+    """Cặp cấu hình trước, sau đó đến cặp hay được hỏi, bỏ trùng (không phân biệt chiều)"""
+    selected = []
+    seen = set()
+    for start, end in [*configured, *top_accessed]:
+        key = frozenset((start, end))
+        if key in seen:
+            continue
+        seen.add(key)
+        selected.append((start, end))
+    return selected if limit is None else selected[:limit]
+
+
+async def warm_up(
+    service: 'PathfindingService',
+    pairs: List[Tuple[str, str]],
+    concurrency: int = 4,
+    timeout: float = 30.0
+) -> WarmupReport:
+    """Tìm trước đường đi và khoảng cách ORS cho ``pairs``
+
+    Tối đa ``concurrency`` cặp chạy cùng lúc. Hết ``timeout`` giây thì các
+    cặp còn lại bị hủy; kết quả đã có vẫn nằm trong cache.
+    """
+    if concurrency <= 0:
+        raise ValueError("Warm-up concurrency must be positive")
+
+    report = WarmupReport(requested=len(pairs))
+    if not pairs:
+        return report
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm_pair(start: str, end: str) -> None:
+        async with semaphore:
+            try:
+                await service.warm_route_async(start, end)
+                report.warmed += 1
+            except Exception as e:
+                report.failed += 1
+                logger.warning(f"Warm-up failed for {start} -> {end}: {e}")
+
+    tasks = [asyncio.ensure_future(warm_pair(start, end)) for start, end in pairs]
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    if pending:
+        report.timed_out = True
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        f"Warm-up finished: {report.warmed}/{report.requested} pairs warmed, "
+        f"{report.failed} failed, timed_out={report.timed_out}, "
+        f"{report.elapsed_seconds:.2f}s"
+    )
+    return report
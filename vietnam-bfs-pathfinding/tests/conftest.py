@@ -0,0 +1,119 @@
+"""Fixture dùng chung cho các test.
+
+Import giống ``src/api/main.py``: thư mục gốc dự án (config, benchmarks)
+và ``src`` (algorithms, graph, models, services) nằm trên sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from benchmarks.ors_stub import start_stub_server  # noqa: E402
+from benchmarks.synthetic import build_grid_graph  # noqa: E402
+from config.settings import Settings  # noqa: E402
+from data.data_loader import DataLoader  # noqa: E402
+from graph.graph_builder import GraphBuilder  # noqa: E402
+from models.province import Province, ProvinceRegistry  # noqa: E402
+from services.distance_service import DistanceCalculator  # noqa: E402
+from services.pathfinding_service import PathfindingService  # noqa: E402
+
+
+def initialize_registry() -> ProvinceRegistry:
+    """Nạp 34 tỉnh vào ProvinceRegistry (singleton) nếu chưa nạp"""
+    registry = ProvinceRegistry()
+    if not registry.is_initialized():
+        loader = DataLoader()
+        loader.load_data(
+            provinces_path=str(project_root / "data" / "provinces.json"),
+            adjacency_path=str(project_root / "data" / "adjacency.json")
+        )
+        registry.initialize(loader.get_provinces(), loader.get_adjacency())
+    return registry
+
+
+def make_province(code: str) -> Province:
+    """Tỉnh giả (mã 2 chữ số) cho các đồ thị nhỏ dựng tay"""
+    return Province(
+        code=code,
+        name=f"Tỉnh {code}",
+        full_name=f"Tỉnh {code}",
+        code_name=f"tinh_{code}",
+        latitude=10.0 + int(code),
+        longitude=105.0
+    )
+
+
+@pytest.fixture(scope="session")
+def registry() -> ProvinceRegistry:
+    return initialize_registry()
+
+
+@pytest.fixture(scope="session")
+def distance_calculator(registry: ProvinceRegistry) -> DistanceCalculator:
+    calculator = DistanceCalculator()
+    calculator.precompute(registry.get_all())
+    return calculator
+
+
+@pytest.fixture(scope="session")
+def graph(registry, distance_calculator):
+    """Đồ thị 34 tỉnh kèm bảng hop và trọng số cạnh"""
+    return GraphBuilder.build_from_registry(
+        registry,
+        precompute_tables=True,
+        distance_calculator=distance_calculator
+    )
+
+
+@pytest.fixture(scope="session")
+def grid_graph():
+    """Đồ thị lưới tổng hợp 15 x 15 (có cạnh chéo ngẫu nhiên)"""
+    return build_grid_graph(rows=15, cols=15, diagonal_ratio=0.2, seed=3)
+
+
+@pytest.fixture
+def ors_stub():
+    """Chạy server ORS giả lập cục bộ: ``ors_stub(**options) -> (server, base_url)``"""
+    servers = []
+
+    def start(**options):
+        server, base_url = start_stub_server(**options)
+        servers.append(server)
+        return server, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_settings(tmp_path):
+    """Settings cho test: không đọc / ghi file trong data/, không warm-up"""
+    def factory(**overrides) -> Settings:
+        values = {
+            "data_path": str(tmp_path),
+            "ors_cache_file": "",
+            "access_stats_file": "",
+            "warmup_enabled": False,
+            "ors_prefetch_edge_distances": False
+        }
+        values.update(overrides)
+        return Settings(**values)
+    return factory
+
+
+@pytest.fixture
+def make_service(registry, make_settings, ors_stub):
+    """``make_service(**stub_options) -> (service, stub_server)``"""
+    def factory(**stub_options):
+        server, base_url = ors_stub(**stub_options)
+        service = PathfindingService(registry, settings=make_settings(ors_base_url=base_url))
+        service.routing_service._backoff_delay = lambda attempt: 0.0
+        return service, server
+    return factory
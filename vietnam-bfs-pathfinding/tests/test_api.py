@@ -0,0 +1,156 @@
+"""Endpoint của API qua TestClient, ORS là server giả lập"""
+
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from benchmarks.ors_stub import start_stub_server
+from config.settings import get_settings
+
+
+def read_ndjson(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+@pytest.fixture(scope="module")
+def client(registry, tmp_path_factory):
+    server, base_url = start_stub_server()
+    monkeypatch = pytest.MonkeyPatch()
+    for name, value in {
+        "ORS_BASE_URL": base_url,
+        "DATA_PATH": str(tmp_path_factory.mktemp("api")),
+        "ORS_CACHE_FILE": "",
+        "ACCESS_STATS_FILE": "",
+        "WARMUP_ENABLED": "true",
+        "WARMUP_PAIRS": "01:79",
+        "ORS_PREFETCH_EDGE_DISTANCES": "false",
+        "BATCH_MAX_PAIRS": "20",
+        "MATRIX_MAX_SIZE": "50"
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+    # Lifespan tự nạp lại registry (singleton) từ data/
+    registry.reset()
+
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        get_settings.cache_clear()
+        monkeypatch.undo()
+        server.shutdown()
+        server.server_close()
+
+
+def test_ready_after_warm_up(client):
+    response = client.get("/ready")
+    for _ in range(100):
+        if response.status_code == 200:
+            break
+        assert response.json()["status"] == "warming_up"
+        time.sleep(0.05)
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["warmup"]["warmed"] == 1
+
+
+def test_find_path_within_latency_budget(client):
+    response = client.post(
+        "/api/v1/path/find",
+        json={"start": "Hà Nội", "end": "Hồ Chí Minh", "latency_budget_ms": 5000}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["path_codes"][0] == "01" and body["path_codes"][-1] == "79"
+    assert body["real_distance_km"] is not None
+    assert not body["real_distance_pending"]
+
+    response = client.post(
+        "/api/v1/path/find",
+        json={"start": "01", "end": "79", "latency_budget_ms": -1}
+    )
+    assert response.status_code == 422
+
+
+def test_unknown_real_distance_token(client):
+    assert client.get("/api/v1/path/real-distance/unknown").status_code == 404
+
+
+def test_batch_streams_one_line_per_pair(client):
+    pairs = [
+        {"start": "01", "end": "79"},
+        {"start": "Hà Nội", "end": "Đà Nẵng"},
+        {"start": "01", "end": "Tỉnh Không Tồn Tại"},
+        {"start": "79", "end": "79"}
+    ]
+    response = client.post(
+        "/api/v1/path/batch",
+        json={"pairs": pairs, "fuzzy_match": False, "road_type": "national"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = read_ndjson(response)
+    assert sorted(line["index"] for line in lines) == list(range(len(pairs)))
+    by_index = {line["index"]: line for line in lines}
+    for index, pair in enumerate(pairs):
+        assert by_index[index]["start"] == pair["start"]
+        assert by_index[index]["end"] == pair["end"]
+
+    # Cặp lỗi trả về trên dòng riêng, không làm hỏng cả lô
+    assert "error" in by_index[2] and "result" not in by_index[2]
+    assert by_index[0]["result"]["path_codes"][-1] == "79"
+    assert by_index[0]["result"]["real_distance_km"] is not None
+    assert by_index[3]["result"]["path_codes"] == ["79"]
+
+
+def test_batch_rejects_empty_or_oversized_requests(client):
+    response = client.post("/api/v1/path/batch", json={"pairs": []})
+    assert response.status_code == 422
+
+    pairs = [{"start": "01", "end": "79"}] * 21
+    response = client.post("/api/v1/path/batch", json={"pairs": pairs})
+    assert response.status_code == 422
+
+
+def test_matrix(client):
+    origins = ["01", "48", "79"]
+    response = client.post(
+        "/api/v1/path/matrix",
+        json={"origins": origins, "destinations": origins, "road_type": "highway"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["code"] for p in body["origins"]] == origins
+    assert [p["code"] for p in body["destinations"]] == origins
+
+    hops, km = body["hop_matrix"], body["distance_km_matrix"]
+    assert len(hops) == len(km) == len(origins)
+    for i in range(len(origins)):
+        assert len(hops[i]) == len(km[i]) == len(origins)
+        assert hops[i][i] == 0 and km[i][i] == 0
+        for j in range(len(origins)):
+            # Đồ thị vô hướng: số bước đối xứng
+            assert hops[i][j] == hops[j][i]
+            if i != j:
+                assert hops[i][j] > 0 and km[i][j] > 0
+
+
+def test_matrix_errors(client):
+    response = client.post(
+        "/api/v1/path/matrix",
+        json={"origins": ["01"], "destinations": ["Tỉnh Không Tồn Tại"], "fuzzy_match": False}
+    )
+    assert response.status_code == 404
+
+    response = client.post(
+        "/api/v1/path/matrix",
+        json={"origins": ["01"] * 51, "destinations": ["79"]}
+    )
+    assert response.status_code == 422
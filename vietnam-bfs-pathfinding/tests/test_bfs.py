@@ -0,0 +1,125 @@
+"""BFSPathfinder: BFS con trỏ cha trên bản CSR của đồ thị"""
+
+import random
+
+import pytest
+
+from algorithms.bfs import BFSPathfinder
+from graph.province_graph import ProvinceGraph
+from models.exceptions import NoPathFoundError
+from models.search_algorithm import SearchAlgorithm
+
+from conftest import make_province
+
+
+def random_pairs(graph, count, seed=11):
+    rng = random.Random(seed)
+    codes = graph.get_codes()
+    return [(rng.choice(codes), rng.choice(codes)) for _ in range(count)]
+
+
+def assert_valid_path(graph, result, start, end):
+    codes = result.province_codes
+    assert codes[0] == start and codes[-1] == end
+    assert len(set(codes)) == len(codes)
+    for a, b in zip(codes, codes[1:]):
+        assert b in graph.get_neighbors(a)
+
+
+def test_bfs_path_is_shortest(grid_graph):
+    pathfinder = BFSPathfinder(grid_graph)
+    for start, end in random_pairs(grid_graph, 100):
+        result = pathfinder.find_path(start, end)
+        distances = pathfinder.find_all_paths_from(start)
+        assert result.distance == distances[end] + 1
+        assert_valid_path(grid_graph, result, start, end)
+
+
+def test_bfs_same_start_and_end(grid_graph):
+    code = grid_graph.get_codes()[0]
+    result = BFSPathfinder(grid_graph).find_path(code, code)
+    assert result.province_codes == [code]
+
+
+def test_find_all_paths_respects_max_distance(grid_graph):
+    pathfinder = BFSPathfinder(grid_graph)
+    start = grid_graph.get_codes()[0]
+    everything = pathfinder.find_all_paths_from(start)
+    limited = pathfinder.find_all_paths_from(start, max_distance=3)
+
+    assert len(everything) == len(grid_graph.get_codes())
+    assert limited == {code: d for code, d in everything.items() if d <= 3}
+
+
+def test_disconnected_provinces_raise():
+    graph = ProvinceGraph()
+    for code in ("01", "02", "03"):
+        graph.add_province(make_province(code))
+    graph.add_edge("01", "02")
+    graph.mark_as_built()
+
+    pathfinder = BFSPathfinder(graph)
+    assert pathfinder.find_path("01", "02").province_codes == ["01", "02"]
+    with pytest.raises(NoPathFoundError):
+        pathfinder.find_path("01", "03")
+    assert not pathfinder.is_connected("01", "03")
+
+
+def test_unsupported_algorithm_is_rejected(grid_graph):
+    codes = grid_graph.get_codes()
+    with pytest.raises(ValueError):
+        BFSPathfinder(grid_graph).find_path(codes[0], codes[1], algorithm=SearchAlgorithm.DIJKSTRA)
+
+
+def test_bidirectional_bfs_matches_bfs(grid_graph):
+    pathfinder = BFSPathfinder(grid_graph)
+    for start, end in random_pairs(grid_graph, 200):
+        bfs = pathfinder.find_path(start, end, algorithm=SearchAlgorithm.BFS)
+        bidirectional = pathfinder.find_path(
+            start, end, algorithm=SearchAlgorithm.BIDIRECTIONAL_BFS
+        )
+        assert bidirectional.distance == bfs.distance
+        assert_valid_path(grid_graph, bidirectional, start, end)
+
+
+def test_bidirectional_bfs_expands_fewer_nodes(grid_graph):
+    pathfinder = BFSPathfinder(grid_graph)
+    pairs = random_pairs(grid_graph, 50)
+    bfs = sum(
+        pathfinder.find_path(s, e, algorithm=SearchAlgorithm.BFS).nodes_expanded
+        for s, e in pairs
+    )
+    bidirectional = sum(
+        pathfinder.find_path(s, e, algorithm=SearchAlgorithm.BIDIRECTIONAL_BFS).nodes_expanded
+        for s, e in pairs
+    )
+    assert bidirectional < bfs
+
+
+def test_find_paths_from_shares_one_tree(grid_graph):
+    pathfinder = BFSPathfinder(grid_graph)
+    start = grid_graph.get_codes()[0]
+    ends = [end for _, end in random_pairs(grid_graph, 30)] + [start]
+    results = pathfinder.find_paths_from(start, ends)
+
+    assert set(results) == set(ends)
+    expanded = {result.nodes_expanded for result in results.values()}
+    # Một lần duyệt cho mọi đích
+    assert len(expanded) == 1
+    for end, result in results.items():
+        assert result.distance == pathfinder.find_path(start, end).distance
+        assert_valid_path(grid_graph, result, start, end)
+
+
+def test_find_paths_from_reports_unreachable_targets():
+    graph = ProvinceGraph()
+    for code in ("01", "02", "03"):
+        graph.add_province(make_province(code))
+    graph.add_edge("01", "02")
+    graph.mark_as_built()
+
+    results = BFSPathfinder(graph).find_paths_from("01", ["02", "03"])
+    assert results["02"].province_codes == ["01", "02"]
+    assert results["03"] is None
+    with pytest.raises(ValueError):
+        BFSPathfinder(graph).find_paths_from("01", ["99"])
@@ -0,0 +1,138 @@
+"""RouteCache (LRU + TTL trong bộ nhớ) và ORSCache (SQLite)"""
+
+import sqlite3
+
+import pytest
+
+from services import ors_cache as ors_cache_module
+from services import route_cache as route_cache_module
+from services.ors_cache import ORSCache
+from services.route_cache import RouteCache
+
+HANOI_HCM = [[105.8542, 21.0285], [106.6297, 10.8231]]
+HCM_HANOI = [[106.6297, 10.8231], [105.8542, 21.0285]]
+
+
+def test_route_cache_evicts_least_recently_used():
+    cache: RouteCache[str] = RouteCache(max_size=2, ttl_seconds=60)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_route_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(route_cache_module.time, "monotonic", lambda: now[0])
+    cache: RouteCache[str] = RouteCache(max_size=4, ttl_seconds=5)
+    cache.set("a", "A")
+
+    now[0] += 4.9
+    assert cache.get("a") == "A"
+    now[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+    assert cache.size() == 0
+
+
+def test_route_cache_disabled_with_zero_size():
+    cache: RouteCache[str] = RouteCache(max_size=0)
+    cache.set("a", "A")
+    assert cache.get("a") is None
+
+
+def test_ors_cache_persists_across_reopen(tmp_path):
+    db_path = str(tmp_path / "ors.sqlite3")
+    cache = ORSCache(db_path)
+    cache.put(HANOI_HCM, 1712.5)
+    cache.close()
+
+    reopened = ORSCache(db_path)
+    assert reopened.get(HANOI_HCM) == 1712.5
+    # Key giữ thứ tự waypoint: chiều ngược lại là lộ trình khác
+    assert reopened.get(HCM_HANOI) is None
+    reopened.close()
+
+
+def test_ors_cache_drops_expired_entries(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ors_cache_module.time, "time", lambda: now[0])
+    db_path = str(tmp_path / "ors.sqlite3")
+    cache = ORSCache(db_path, ttl_seconds=60)
+    cache.put(HANOI_HCM, 1712.5)
+
+    now[0] += 61
+    assert cache.get(HANOI_HCM) is None
+    cache.close()
+    assert ORSCache(db_path, ttl_seconds=60).size() == 0
+
+
+def test_ors_cache_get_defers_expired_delete(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ors_cache_module.time, "time", lambda: now[0])
+    db_path = str(tmp_path / "ors.sqlite3")
+    cache = ORSCache(db_path, ttl_seconds=60)
+    cache.put(HANOI_HCM, 1712.5)
+
+    def count_rows():
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+    class NoDiskAccess:
+        def __getattr__(self, name):
+            raise AssertionError(f"get() touched SQLite: {name}")
+
+    # get() chạy trong event loop: chỉ tra bộ nhớ, không chạm tới SQLite
+    conn, cache._conn = cache._conn, NoDiskAccess()
+    now[0] += 61
+    assert cache.get(HANOI_HCM) is None
+    cache._conn = conn
+    assert count_rows() == 1
+
+    # Bản ghi hết hạn bị xóa ở lần put kế tiếp
+    cache.put(HCM_HANOI, 1720.0)
+    assert count_rows() == 1
+    assert cache.get(HCM_HANOI) == 1720.0
+    cache.close()
+
+
+def test_ors_cache_evicts_oldest_on_disk(tmp_path):
+    db_path = str(tmp_path / "ors.sqlite3")
+    cache = ORSCache(db_path, max_entries=1)
+    cache.put(HANOI_HCM, 1712.5)
+    cache.put(HCM_HANOI, 1720.0)
+    assert cache.get(HANOI_HCM) is None
+    cache.close()
+
+    reopened = ORSCache(db_path, max_entries=1)
+    assert reopened.size() == 1
+    assert reopened.get(HCM_HANOI) == 1720.0
+    reopened.close()
+
+
+def test_ors_cache_keeps_working_in_memory_after_close():
+    cache = ORSCache(":memory:", max_entries=1)
+    cache.close()
+    cache.put(HANOI_HCM, 1712.5)
+    cache.put(HCM_HANOI, 1720.0)
+    assert cache.get(HCM_HANOI) == 1720.0
+    assert cache.size() == 1
+
+
+def test_ors_cache_key_rounds_coordinates():
+    assert ORSCache.make_key([[105.85420001, 21.0285]]) == \
+        ORSCache.make_key([[105.8542, 21.02849999]])
+
+
+def test_ors_cache_rejects_invalid_configuration():
+    with pytest.raises(ValueError):
+        ORSCache(":memory:", ttl_seconds=0)
+    with pytest.raises(ValueError):
+        ORSCache(":memory:", max_entries=0)
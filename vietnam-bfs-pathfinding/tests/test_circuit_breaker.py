@@ -0,0 +1,95 @@
+"""Chuyển trạng thái của CircuitBreaker (đồng hồ giả, không sleep)"""
+
+import pytest
+
+from services import circuit_breaker as circuit_breaker_module
+from services.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock)
+    return clock
+
+
+def _open_breaker(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10.0)
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    stats = breaker.get_stats()
+    assert stats["times_opened"] == 1
+    assert stats["short_circuited"] == 1
+    assert stats["retry_in_seconds"] == 10.0
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = _open_breaker(clock)
+    clock.now += 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    assert breaker.allow_request()
+    # Chỉ một lời gọi thử trong lúc half-open
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = _open_breaker(clock)
+    clock.now += 10.0
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.get_stats()["times_opened"] == 2
+
+    clock.now += 9.9
+    assert not breaker.allow_request()
+    clock.now += 0.1
+    assert breaker.allow_request()
+
+
+def test_release_returns_half_open_slot(clock):
+    breaker = _open_breaker(clock)
+    clock.now += 10.0
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_rejects_invalid_configuration():
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+    with pytest.raises(ValueError):
+        CircuitBreaker(recovery_timeout=0)
+    with pytest.raises(ValueError):
+        CircuitBreaker(half_open_max_calls=0)
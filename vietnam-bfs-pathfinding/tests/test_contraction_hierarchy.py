@@ -0,0 +1,75 @@
+"""Contraction Hierarchies: kết quả giống Dijkstra, file tiền xử lý gắn với đồ thị"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from algorithms.contraction_hierarchy import CHPathfinder, ContractionHierarchy
+from algorithms.dijkstra import DijkstraPathfinder
+from benchmarks.synthetic import build_grid_graph
+from models.road_segment import RoadType
+
+from test_bfs import assert_valid_path, random_pairs
+
+
+@pytest.mark.parametrize("road_type", [RoadType.DEFAULT, RoadType.NATIONAL])
+def test_ch_matches_dijkstra_on_provinces(graph, distance_calculator, road_type):
+    dijkstra = DijkstraPathfinder(graph, distance_calculator)
+    ch = CHPathfinder(graph, distance_calculator)
+    codes = graph.get_codes()
+    for start in codes:
+        for end in codes:
+            expected = dijkstra.find_path(start, end, road_type)
+            result = ch.find_path(start, end, road_type)
+            assert result.total_distance_km == pytest.approx(expected.total_distance_km)
+            assert_valid_path(graph, result, start, end)
+
+
+def test_ch_matches_dijkstra_on_grid(distance_calculator):
+    grid = build_grid_graph(rows=20, cols=20, diagonal_ratio=0.2, seed=5)
+    dijkstra = DijkstraPathfinder(grid, distance_calculator)
+    ch = CHPathfinder(grid, distance_calculator)
+    for start, end in random_pairs(grid, 150):
+        expected = dijkstra.find_path(start, end, RoadType.NATIONAL)
+        result = ch.find_path(start, end, RoadType.NATIONAL)
+        assert result.total_distance_km == pytest.approx(expected.total_distance_km)
+        assert_valid_path(grid, result, start, end)
+
+
+def test_ch_file_is_rejected_when_graph_changes(tmp_path, distance_calculator):
+    grid = build_grid_graph(rows=6, cols=6, seed=1)
+    hierarchy = ContractionHierarchy.build(grid, distance_calculator)
+    file_path = tmp_path / "ch.json"
+    hierarchy.save(str(file_path))
+
+    loaded = ContractionHierarchy.load(str(file_path))
+    start, end = grid.get_codes()[0], grid.get_codes()[-1]
+    assert loaded.fingerprint == hierarchy.fingerprint
+    assert loaded.matches(grid, distance_calculator)
+    assert loaded.query(start, end) == hierarchy.query(start, end)
+
+    # Cùng mã đỉnh nhưng tọa độ / cạnh khác
+    moved = build_grid_graph(rows=6, cols=6, seed=2)
+    rewired = build_grid_graph(rows=6, cols=6, diagonal_ratio=0.9, seed=1)
+    assert moved.get_codes() == grid.get_codes()
+    assert not loaded.matches(moved, distance_calculator)
+    assert not loaded.matches(rewired, distance_calculator)
+
+
+def test_concurrent_queries_build_the_hierarchy_once(distance_calculator, monkeypatch):
+    grid = build_grid_graph(rows=8, cols=8, seed=4)
+    ch = CHPathfinder(grid, distance_calculator)
+    build = ContractionHierarchy.build
+    builds = []
+
+    def counting_build(*args, **kwargs):
+        builds.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(ContractionHierarchy, "build", counting_build)
+    start, end = grid.get_codes()[0], grid.get_codes()[-1]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: ch.find_path(start, end), range(8)))
+
+    assert len(builds) == 1
+    assert len({result.total_distance_km for result in results}) == 1
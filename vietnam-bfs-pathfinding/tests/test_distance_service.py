@@ -0,0 +1,88 @@
+"""DistanceCalculator: Haversine dạng vector và ma trận khoảng cách tính trước"""
+
+import numpy as np
+import pytest
+
+from algorithms.astar import AStarPathfinder
+from algorithms.dijkstra import DijkstraPathfinder
+from graph.edge_weights import EdgeWeights
+from graph.graph_builder import GraphBuilder
+from models.road_segment import RoadType
+from services.distance_service import DistanceCalculator
+
+
+def test_distance_matrix_matches_scalar_haversine(registry, distance_calculator):
+    provinces = registry.get_all()
+    matrix = distance_calculator.get_distance_matrix()
+    assert matrix.shape == (len(provinces), len(provinces))
+    assert np.allclose(matrix, matrix.T)
+    assert np.all(np.diag(matrix) == 0)
+
+    for a in provinces:
+        for b in provinces:
+            i = distance_calculator.get_matrix_index(a.code)
+            j = distance_calculator.get_matrix_index(b.code)
+            assert matrix[i, j] == pytest.approx(
+                DistanceCalculator.haversine_distance(
+                    a.latitude, a.longitude, b.latitude, b.longitude
+                )
+            )
+
+
+def test_distance_matrix_is_read_only(distance_calculator):
+    matrix = distance_calculator.get_distance_matrix()
+    with pytest.raises(ValueError):
+        matrix[0, 1] = 0.0
+
+
+def test_road_distance_reads_matrix(registry, distance_calculator):
+    hanoi, hcm = registry.get_by_code("01"), registry.get_by_code("79")
+    uncached = DistanceCalculator()
+    straight = uncached.estimate_road_distance(hanoi, hcm, RoadType.DEFAULT)
+
+    assert distance_calculator.estimate_road_distance(hanoi, hcm, RoadType.DEFAULT) == \
+        pytest.approx(straight)
+    segment = distance_calculator.create_road_segment(hanoi, hcm, RoadType.NATIONAL)
+    assert segment.distance_km == pytest.approx(straight * 1.35)
+
+
+def test_precompute_skips_oversized_input(registry, monkeypatch):
+    calculator = DistanceCalculator()
+    monkeypatch.setattr(DistanceCalculator, "MATRIX_MAX_SIZE", 10)
+    calculator.precompute(registry.get_all())
+    assert calculator.get_distance_matrix() is None
+
+
+def test_matrix_rows_follow_requested_order(distance_calculator):
+    rows = distance_calculator.get_matrix_rows(["79", "01"])
+    assert rows.tolist() == [
+        distance_calculator.get_matrix_index("79"),
+        distance_calculator.get_matrix_index("01")
+    ]
+    assert distance_calculator.get_matrix_rows(["01", "X0001"]) is None
+    assert DistanceCalculator().get_matrix_rows(["01"]) is None
+
+
+def test_edge_weights_and_astar_read_the_matrix(registry, distance_calculator, monkeypatch):
+    graph = GraphBuilder.build_from_registry(registry)
+    expected = EdgeWeights.build(graph, DistanceCalculator())
+
+    def no_haversine(*args, **kwargs):
+        raise AssertionError("straight-line distance should come from the matrix")
+
+    # Ma trận đã tính trước là nguồn đường chim bay duy nhất
+    monkeypatch.setattr(DistanceCalculator, "haversine_vector", no_haversine)
+    monkeypatch.setattr(DistanceCalculator, "haversine_distance", no_haversine)
+
+    weights = EdgeWeights.for_graph(graph, distance_calculator)
+    for road_type in RoadType:
+        assert weights.for_road_type(road_type) == pytest.approx(
+            expected.for_road_type(road_type)
+        )
+
+    dijkstra = DijkstraPathfinder(graph, distance_calculator)
+    astar = AStarPathfinder(graph, distance_calculator)
+    for end in ("79", "96", "48"):
+        assert astar.find_path("01", end).total_distance_km == pytest.approx(
+            dijkstra.find_path("01", end).total_distance_km
+        )
@@ -0,0 +1,74 @@
+"""BoundedExecutor: giới hạn số việc blocking đang chờ / chạy"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from models.exceptions import ServiceOverloadedError
+from services.executor import BoundedExecutor
+
+
+def test_executor_rejects_when_full():
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue_size=1)
+        release = threading.Event()
+        running = [
+            asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServiceOverloadedError):
+            await executor.run(lambda: None)
+
+        release.set()
+        await asyncio.gather(*running)
+        stats = executor.get_stats()
+        executor.shutdown()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["peak_pending"] == 2
+
+
+def test_executor_keeps_slot_until_cancelled_work_finishes():
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue_size=0)
+        release = threading.Event()
+        task = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # Thread vẫn đang chạy nên pool vẫn đầy
+        with pytest.raises(ServiceOverloadedError):
+            await executor.run(lambda: None)
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while executor.get_stats()["saturation"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        result = await executor.run(lambda: 42)
+        executor.shutdown()
+        return result
+
+    assert asyncio.run(scenario()) == 42
+
+
+def test_executor_propagates_errors():
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue_size=0)
+
+        def failing_call():
+            raise RuntimeError("boom")
+
+        try:
+            with pytest.raises(RuntimeError):
+                await executor.run(failing_call)
+            return await executor.run(lambda: 7)
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == 7
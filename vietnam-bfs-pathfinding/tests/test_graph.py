@@ -0,0 +1,122 @@
+"""ProvinceGraph: thành phần liên thông, CSR, view danh sách kề và trọng số cạnh"""
+
+import pytest
+
+from graph.csr import CSRAdjacency
+from graph.edge_weights import EdgeWeights
+from graph.province_graph import ProvinceGraph
+from models.road_segment import RoadType
+
+from conftest import make_province
+
+
+def small_graph(edges, codes=("01", "02", "03", "04", "05")) -> ProvinceGraph:
+    graph = ProvinceGraph()
+    for code in codes:
+        graph.add_province(make_province(code))
+    for a, b in edges:
+        graph.add_edge(a, b)
+    graph.mark_as_built()
+    return graph
+
+
+def test_components_follow_added_edges():
+    graph = small_graph([("01", "02"), ("03", "04")])
+    assert graph.get_component_count() == 3
+    assert graph.same_component("01", "02")
+    assert not graph.same_component("02", "03")
+
+    graph.add_edge("02", "03")
+    assert graph.get_component_count() == 2
+    assert graph.same_component("01", "04")
+    assert graph.get_component("04") == graph.get_component("01")
+    assert not graph.same_component("01", "05")
+
+
+def test_component_of_unknown_province_raises():
+    graph = small_graph([])
+    with pytest.raises(ValueError):
+        graph.get_component("99")
+
+
+def test_province_graph_is_connected(graph):
+    assert graph.get_component_count() == 1
+
+
+def test_csr_matches_adjacency_list(graph):
+    csr = graph.get_csr()
+    assert csr.codes == graph.get_codes()
+    assert len(csr.targets) == 2 * graph.get_edge_count()
+    for i, code in enumerate(csr.codes):
+        neighbors = [csr.codes[j] for j in csr.neighbors(i)]
+        assert neighbors == graph.get_neighbors(code)
+        assert csr.degree(i) == len(neighbors)
+
+
+def test_csr_is_rebuilt_after_graph_changes():
+    graph = small_graph([("01", "02")])
+    csr = graph.get_csr()
+    assert graph.get_csr() is csr
+
+    graph.add_edge("02", "03")
+    rebuilt = graph.get_csr()
+    assert rebuilt is not csr
+    assert [rebuilt.codes[j] for j in rebuilt.neighbors(rebuilt.index["02"])] == ["01", "03"]
+
+
+def test_csr_rejects_mismatched_offsets():
+    csr = CSRAdjacency.from_adjacency({"01": ["02"], "02": ["01"]})
+    with pytest.raises(ValueError):
+        CSRAdjacency(csr.codes, csr.offsets[:-1], csr.targets)
+
+
+def test_iter_neighbors_is_a_cached_read_only_view(graph):
+    view = graph.iter_neighbors("01")
+    assert isinstance(view, tuple)
+    assert list(view) == graph.get_neighbors("01")
+    assert graph.iter_neighbors("01") is view
+
+    # get_neighbors vẫn trả bản sao có thể sửa
+    copy = graph.get_neighbors("01")
+    copy.append("99")
+    assert "99" not in graph.iter_neighbors("01")
+
+
+def test_iter_neighbors_is_refreshed_after_graph_changes():
+    graph = small_graph([("01", "02")])
+    assert graph.iter_neighbors("02") == ("01",)
+    graph.add_edge("02", "03")
+    assert graph.iter_neighbors("02") == ("01", "03")
+    with pytest.raises(ValueError):
+        graph.iter_neighbors("99")
+
+
+def test_edge_weights_follow_road_factors(graph, distance_calculator):
+    weights = graph.get_edge_weights()
+    assert weights is not None
+    assert weights.missing_count() == 0
+
+    default = weights.for_road_type(RoadType.DEFAULT)
+    for road_type in (RoadType.HIGHWAY, RoadType.NATIONAL, RoadType.PROVINCIAL):
+        factor = distance_calculator.ROAD_ADJUSTMENT_FACTORS[road_type]
+        assert weights.for_road_type(road_type) == pytest.approx(default * factor)
+
+    hanoi, neighbor = "01", graph.get_neighbors("01")[0]
+    assert weights.weight(hanoi, neighbor, RoadType.NATIONAL) == pytest.approx(
+        distance_calculator.estimate_road_distance(
+            graph.get_province(hanoi), graph.get_province(neighbor), RoadType.NATIONAL
+        )
+    )
+    assert weights.weight("01", "79", RoadType.NATIONAL) is None
+    assert weights.real_path_distance(["01", neighbor]) is None
+
+
+def test_edge_weights_are_dropped_when_graph_changes(distance_calculator):
+    graph = small_graph([("01", "02")])
+    weights = EdgeWeights.for_graph(graph, distance_calculator)
+    assert EdgeWeights.for_graph(graph, distance_calculator) is weights
+
+    graph.add_edge("02", "03")
+    assert graph.get_edge_weights() is None
+    rebuilt = EdgeWeights.for_graph(graph, distance_calculator)
+    assert len(rebuilt.for_road_type(RoadType.DEFAULT)) == 4
@@ -0,0 +1,65 @@
+"""HopDistanceTable: khoảng cách và bước kế tiếp của mọi cặp tỉnh"""
+
+from algorithms.bfs import BFSPathfinder
+from graph.hop_table import HopDistanceTable
+from graph.province_graph import ProvinceGraph
+
+from conftest import make_province
+
+
+def test_hop_table_matches_bfs(graph):
+    table = graph.get_hop_table()
+    assert table is not None
+    pathfinder = BFSPathfinder(graph)
+    codes = graph.get_codes()
+
+    for start in codes:
+        # Bỏ bảng hop để BFS duyệt thật
+        graph.set_hop_table(None)
+        try:
+            expected = pathfinder.find_all_paths_from(start)
+        finally:
+            graph.set_hop_table(table)
+        assert table.distances_from(start) == expected
+
+        for end in codes:
+            path = table.path(start, end)
+            assert len(path) - 1 == table.distance(start, end)
+            assert path[0] == start and path[-1] == end
+            for a, b in zip(path, path[1:]):
+                assert b in graph.get_neighbors(a)
+
+
+def test_bfs_answers_from_hop_table(graph):
+    result = BFSPathfinder(graph).find_path("01", "79")
+    path = graph.get_hop_table().path("01", "79")
+    assert result.province_codes == path
+    # Tra bảng không phải route cache hit: mỗi bước next-hop tính một lần mở rộng
+    assert not result.cached
+    assert result.nodes_expanded == len(path) - 1
+
+
+def test_hop_table_marks_disconnected_pairs():
+    graph = ProvinceGraph()
+    for code in ("01", "02", "03"):
+        graph.add_province(make_province(code))
+    graph.add_edge("01", "02")
+    graph.mark_as_built()
+
+    table = HopDistanceTable.build(graph)
+    assert table.distance("01", "02") == 1
+    assert table.distance("01", "03") is None
+    assert table.path("01", "03") is None
+    assert not table.is_connected("02", "03")
+
+
+def test_hop_table_is_dropped_when_graph_changes():
+    graph = ProvinceGraph()
+    for code in ("01", "02", "03"):
+        graph.add_province(make_province(code))
+    graph.add_edge("01", "02")
+    graph.mark_as_built()
+    graph.set_hop_table(HopDistanceTable.build(graph))
+
+    graph.add_edge("02", "03")
+    assert graph.get_hop_table() is None
@@ -0,0 +1,31 @@
+"""ODMatrixBuilder: ma trận số bước và km, một cây BFS cho mỗi điểm đi"""
+
+import numpy as np
+import pytest
+
+from algorithms.bfs import BFSPathfinder
+from algorithms.od_matrix import ODMatrixBuilder
+from models.road_segment import RoadType
+
+
+def test_od_matrix_matches_bfs_tree(graph, distance_calculator):
+    codes = graph.get_codes()
+    origins, destinations = codes[:10], codes
+    matrix = ODMatrixBuilder(graph, distance_calculator).build(
+        origins, destinations, RoadType.NATIONAL
+    )
+    assert matrix.hops.shape == (len(origins), len(destinations))
+
+    table = graph.get_hop_table()
+    weights = graph.get_edge_weights()
+    pathfinder = BFSPathfinder(graph)
+    for row, origin in enumerate(origins):
+        paths = pathfinder.find_paths_from(origin, destinations)
+        for column, destination in enumerate(destinations):
+            assert matrix.hops[row, column] == table.distance(origin, destination)
+            path = paths[destination].province_codes
+            expected_km = sum(
+                weights.weight(a, b, RoadType.NATIONAL) for a, b in zip(path, path[1:])
+            )
+            assert matrix.distances_km[row, column] == pytest.approx(expected_km)
+    assert np.all(matrix.hops[np.arange(len(origins)), np.arange(len(origins))] == 0)
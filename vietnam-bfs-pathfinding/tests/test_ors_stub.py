@@ -0,0 +1,31 @@
+"""Server ORS giả lập: ghi lại (record) rồi phát lại (replay) response"""
+
+from services.routing_service import RoutingService
+
+
+def test_record_then_replay(ors_stub, registry, tmp_path):
+    recordings = str(tmp_path / "ors_recordings.json")
+    hanoi_hcm = [registry.get_by_code("01"), registry.get_by_code("79")]
+    hanoi_hue = [registry.get_by_code("01"), registry.get_by_code("46")]
+
+    upstream, upstream_url = ors_stub()
+    recorder, recorder_url = ors_stub(
+        mode="record", recordings_path=recordings, upstream_url=upstream_url
+    )
+    service = RoutingService(base_url=recorder_url)
+    recorded = service.get_route_through_waypoints(hanoi_hcm)
+    service.close()
+    assert recorded.success
+    assert recorder.stats["recorded"] == 1
+
+    replayer, replay_url = ors_stub(mode="replay", recordings_path=recordings, strict=True)
+    service = RoutingService(base_url=replay_url)
+    replayed = service.get_route_through_waypoints(hanoi_hcm)
+    # strict: request không có trong file trả 404 thay vì tự tổng hợp
+    missing = service.get_route_through_waypoints(hanoi_hue)
+    service.close()
+
+    assert replayed.success and replayed.distance_km == recorded.distance_km
+    assert not missing.success
+    assert replayer.stats["replayed"] == 1
+    assert upstream.stats["requests"] == 1
@@ -0,0 +1,148 @@
+"""PathfindingService với server ORS giả lập"""
+
+import asyncio
+
+import pytest
+
+from algorithms.contraction_hierarchy import ContractionHierarchy
+from graph.edge_weights import EdgeWeights
+from models.exceptions import InvalidInputError
+from services.pathfinding_service import PathfindingService
+from services.pending_routes import PendingStatus
+
+
+def test_cache_hit_reports_no_search(make_service):
+    service, server = make_service()
+    first = service.find_path("01", "79", algorithm="dijkstra")
+    second = service.find_path("01", "79", algorithm="dijkstra")
+    reverse = service.find_path("79", "01", algorithm="dijkstra")
+    other_road = service.find_path("01", "79", road_type="highway", algorithm="dijkstra")
+    service.close()
+
+    assert first.nodes_expanded > 0 and not first.cached
+    assert second.cached and second.nodes_expanded == 0
+    assert second.province_codes == first.province_codes
+    assert second.real_distance_km == first.real_distance_km
+    assert reverse.cached and reverse.nodes_expanded == 0
+    assert reverse.province_codes == first.province_codes[::-1]
+    assert not other_road.cached
+    assert service.get_cache_stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("algorithm", ["bfs", "astar"])
+def test_async_find_path_matches_sync(make_service, registry, make_settings, algorithm):
+    service, _ = make_service()
+    expected = service.find_path("Hà Nội", "Hồ Chí Minh", algorithm=algorithm)
+    service.close()
+
+    # Service mới: không có route cache từ lần gọi đồng bộ
+    async_service = PathfindingService(
+        registry,
+        settings=make_settings(ors_base_url=service.settings.ors_base_url)
+    )
+
+    async def scenario():
+        result = await async_service.find_path_async(
+            "Hà Nội", "Hồ Chí Minh", algorithm=algorithm
+        )
+        await async_service.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+    assert not result.cached
+    assert result.province_codes == expected.province_codes
+    assert result.total_distance_km == pytest.approx(expected.total_distance_km)
+    assert result.real_distance_km == expected.real_distance_km
+
+
+def test_async_prefetch_fills_edge_distances(make_service):
+    service, server = make_service()
+
+    async def scenario():
+        filled = await service.prefetch_real_edge_distances_async()
+        result = await service.find_path_async("01", "79")
+        await service.aclose()
+        return filled, result
+
+    filled, result = asyncio.run(scenario())
+    weights = EdgeWeights.for_graph(service.graph, service.distance_calculator)
+    assert filled == len(weights.csr.targets)
+    assert weights.real_count() == filled
+    # Một lô Matrix API cho cả đồ thị, đường đi sau đó không gọi ORS nữa
+    assert server.stats["requests"] == 1
+    assert result.real_distance_km == pytest.approx(
+        weights.real_path_distance(result.province_codes), abs=0.01
+    )
+
+
+def test_latency_budget_returns_token(make_service):
+    service, _ = make_service(latency=0.3)
+
+    async def scenario():
+        result = await service.find_path_async("01", "79", latency_budget=0.02)
+        pending = service.get_pending_real_distance(result.real_distance_token)
+
+        route = service.pending_routes.get(result.real_distance_token)
+        await route.task
+        ready = service.get_pending_real_distance(result.real_distance_token)
+
+        # Đã có trong route cache: trả về ngay kể cả khi ngân sách bằng 0
+        cached = await service.find_path_async("01", "79", latency_budget=0)
+        await service.aclose()
+        return result, pending, ready, cached
+
+    result, pending, ready, cached = asyncio.run(scenario())
+    assert result.real_distance_km is None
+    assert result.to_dict()["real_distance_pending"] is True
+    assert pending["status"] == PendingStatus.PENDING.value
+    assert ready["status"] == PendingStatus.READY.value
+    assert ready["real_distance_km"] > result.total_distance_km * 0.5
+    assert cached.real_distance_token is None
+    assert cached.real_distance_km == ready["real_distance_km"]
+    assert service.get_pending_real_distance("unknown") is None
+
+
+def test_negative_latency_budget_is_rejected(make_service):
+    service, _ = make_service()
+
+    async def scenario():
+        try:
+            with pytest.raises(InvalidInputError):
+                await service.find_path_async("01", "79", latency_budget=-1)
+        finally:
+            await service.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_unwritable_ch_file_does_not_block_startup(registry, make_settings, tmp_path):
+    # Thư mục cha không tồn tại: ghi file CH lỗi OSError
+    file_path = tmp_path / "missing" / "ch.json"
+    service = PathfindingService(
+        registry,
+        settings=make_settings(
+            contraction_hierarchy_enabled=True,
+            contraction_hierarchy_file=str(file_path)
+        )
+    )
+    assert service.graph.get_contraction_hierarchy() is not None
+    assert not file_path.exists()
+    service.close()
+
+
+def test_ch_file_is_reused_on_restart(registry, make_settings, tmp_path, monkeypatch):
+    settings = make_settings(
+        contraction_hierarchy_enabled=True,
+        contraction_hierarchy_file=str(tmp_path / "ch.json")
+    )
+    first = PathfindingService(registry, settings=settings)
+    first.close()
+
+    def fail_build(*args, **kwargs):
+        raise AssertionError("hierarchy should be loaded from file")
+
+    monkeypatch.setattr(ContractionHierarchy, "build", fail_build)
+    second = PathfindingService(registry, settings=settings)
+    second.close()
+    assert second.graph.get_contraction_hierarchy().fingerprint == \
+        first.graph.get_contraction_hierarchy().fingerprint
@@ -0,0 +1,52 @@
+"""PendingRouteRegistry: token cho khoảng cách ORS đang chờ"""
+
+import asyncio
+
+from services import pending_routes as pending_routes_module
+from services.pending_routes import PendingRouteRegistry, PendingStatus
+
+
+def test_pending_routes_status_and_eviction():
+    async def scenario():
+        registry = PendingRouteRegistry(max_size=3, ttl_seconds=60)
+        loop = asyncio.get_running_loop()
+        evicted, waiting, ready, failed = (loop.create_future() for _ in range(4))
+
+        evicted_token = registry.register(evicted)
+        waiting_token = registry.register(waiting)
+        ready_token = registry.register(ready)
+        failed_token = registry.register(failed)
+        ready.set_result(1712.5)
+        failed.set_result(None)
+
+        # Token cũ nhất bị bỏ nhưng lời gọi ORS vẫn chạy tiếp
+        assert registry.get(evicted_token) is None
+        assert not evicted.cancelled()
+        assert registry.get(waiting_token).status == PendingStatus.PENDING
+        assert registry.get(ready_token).to_dict() == {
+            "token": ready_token,
+            "status": PendingStatus.READY.value,
+            "real_distance_km": 1712.5
+        }
+        assert registry.get(failed_token).status == PendingStatus.UNAVAILABLE
+
+        registry.cancel_all()
+        assert waiting.cancelled()
+        return registry.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats == {"size": 0, "pending": 0, "registered": 4, "evicted": 1}
+
+
+def test_pending_routes_expire(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr(pending_routes_module.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        registry = PendingRouteRegistry(max_size=4, ttl_seconds=10)
+        token = registry.register(asyncio.get_running_loop().create_future())
+        assert registry.get(token).status == PendingStatus.PENDING
+        now[0] += 10
+        return registry.get(token)
+
+    assert asyncio.run(scenario()) is None
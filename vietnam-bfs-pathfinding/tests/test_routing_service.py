@@ -0,0 +1,173 @@
+"""RoutingService với server ORS giả lập (benchmarks/ors_stub.py)"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.circuit_breaker import CircuitBreaker, CircuitState
+from services.ors_cache import ORSCache
+from services.routing_service import RoutingService
+
+
+@pytest.fixture
+def hanoi_hcm(registry):
+    return [registry.get_by_code("01"), registry.get_by_code("79")]
+
+
+def routing_service(base_url, **kwargs) -> RoutingService:
+    service = RoutingService(base_url=base_url, **kwargs)
+    # Không chờ backoff giữa các lần retry
+    service._backoff_delay = lambda attempt: 0.0
+    return service
+
+
+def test_route_is_fetched_once_then_cached(ors_stub, hanoi_hcm):
+    server, base_url = ors_stub()
+    cache = ORSCache(":memory:")
+    service = routing_service(base_url, cache=cache)
+
+    first = service.get_route_through_waypoints(hanoi_hcm)
+    second = service.get_route_through_waypoints(hanoi_hcm)
+    service.close()
+
+    assert first.success and first.distance_km > 0
+    assert second.distance_km == first.distance_km
+    assert server.stats["requests"] == 1
+    assert cache.size() == 1
+
+
+def test_threads_share_one_pooled_client(ors_stub, registry):
+    server, base_url = ors_stub()
+    service = routing_service(base_url)
+    codes = ["01", "48", "79", "92"]
+    routes = [
+        [registry.get_by_code(a), registry.get_by_code(b)]
+        for a in codes for b in codes if a != b
+    ]
+
+    clients = set()
+
+    def fetch(provinces):
+        result = service.get_route_through_waypoints(provinces)
+        clients.add(id(service._get_client()))
+        return result
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(fetch, routes))
+
+    assert all(result.success for result in results)
+    assert len(clients) == 1
+    assert server.stats["requests"] == len(routes)
+
+    # Đóng rồi gọi lại: tạo pool mới thay vì dùng client đã đóng
+    service.close()
+    assert service.get_route_through_waypoints(routes[0]).success
+    service.close()
+
+
+def test_async_route_matches_sync(ors_stub, hanoi_hcm):
+    _, base_url = ors_stub()
+    service = routing_service(base_url)
+    expected = service.get_route_through_waypoints(hanoi_hcm)
+
+    async def scenario():
+        result = await service.get_route_through_waypoints_async(hanoi_hcm)
+        await service.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+    assert result.success
+    assert result.distance_km == expected.distance_km
+
+
+def test_circuit_opens_on_repeated_failures(ors_stub, hanoi_hcm):
+    server, base_url = ors_stub(failure_rate=1.0, failure_status=503)
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+    service = routing_service(base_url, circuit_breaker=breaker)
+
+    first = service.get_route_through_waypoints(hanoi_hcm)
+    assert not first.success
+    # 1 lần gọi + MAX_RETRIES lần thử lại, đủ ngưỡng để mở mạch
+    assert server.stats["requests"] == RoutingService.MAX_RETRIES + 1
+    assert breaker.state == CircuitState.OPEN
+
+    second = service.get_route_through_waypoints(hanoi_hcm)
+    service.close()
+    assert not second.success
+    assert "circuit breaker" in second.error_message
+    assert server.stats["requests"] == RoutingService.MAX_RETRIES + 1
+
+
+def test_blocking_call_is_refused_inside_event_loop(ors_stub, hanoi_hcm):
+    _, base_url = ors_stub()
+    service = routing_service(base_url)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            service.get_route_through_waypoints(hanoi_hcm)
+        result = await service.get_route_through_waypoints_async(hanoi_hcm)
+        await service.aclose()
+        return result
+
+    assert asyncio.run(scenario()).success
+
+
+def test_concurrent_async_routes_are_coalesced(ors_stub, hanoi_hcm):
+    server, base_url = ors_stub(latency=0.05)
+    cache = ORSCache(":memory:")
+    service = routing_service(base_url, cache=cache)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            service.get_route_through_waypoints_async(hanoi_hcm) for _ in range(5)
+        ))
+        await service.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(result.success for result in results)
+    assert server.stats["requests"] == 1
+    assert cache.size() == 1
+    assert service.get_stats()["single_flight"]["async"]["coalesced"] == 4
+
+
+def test_distance_matrix_async(ors_stub, registry):
+    _, base_url = ors_stub()
+    service = routing_service(base_url)
+    sources = [registry.get_by_code("01"), registry.get_by_code("79")]
+    destinations = [registry.get_by_code("48"), registry.get_by_code("01"), registry.get_by_code("79")]
+
+    async def scenario():
+        result = await service.get_distance_matrix_async(sources, destinations)
+        await service.aclose()
+        return result
+
+    matrix = asyncio.run(scenario())
+    assert matrix.success
+    assert len(matrix.distances_km) == 2
+    assert all(len(row) == 3 for row in matrix.distances_km)
+    assert matrix.distances_km[0][1] == pytest.approx(0.0)
+    assert matrix.distances_km[1][2] == pytest.approx(0.0)
+
+    with pytest.raises(ValueError):
+        service.get_distance_matrix(
+            sources * RoutingService.MAX_MATRIX_CELLS, destinations
+        )
+
+
+def test_api_key_only_required_for_hosted_ors(ors_stub, hanoi_hcm):
+    hosted = RoutingService(base_url="https://api.openrouteservice.org/v2")
+    # Bỏ qua key lấy từ biến môi trường (nếu có)
+    hosted.api_key = ""
+    assert hosted.requires_api_key
+    result = hosted.get_route_through_waypoints(hanoi_hcm)
+    hosted.close()
+    assert not result.success
+    assert result.error_message == "API key không được cấu hình"
+
+    _, base_url = ors_stub()
+    local = routing_service(base_url, api_key="")
+    assert not local.requires_api_key
+    assert local.get_route_through_waypoints(hanoi_hcm).success
+    local.close()
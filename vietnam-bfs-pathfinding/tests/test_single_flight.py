@@ -0,0 +1,75 @@
+"""SingleFlight / AsyncSingleFlight: gộp các lời gọi trùng key đang chạy"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_threads():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_call() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", slow_call)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    # Chờ các thread theo sau vào hàng chờ của leader
+    deadline = time.monotonic() + 5
+    while flight.get_stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert flight.get_stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_single_flight_shares_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    def failing_call() -> int:
+        raise RuntimeError("ORS down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", failing_call)
+    assert flight.do("key", lambda: 7) == 7
+    assert flight.get_stats()["executed"] == 2
+
+
+def test_async_single_flight_survives_cancelled_caller():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow_call() -> int:
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        first = asyncio.ensure_future(flight.do("key", slow_call))
+        second = asyncio.ensure_future(flight.do("key", slow_call))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 42
+        assert first.cancelled()
+        assert len(calls) == 1
+        return flight.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats == {"executed": 1, "coalesced": 1, "in_flight": 0}
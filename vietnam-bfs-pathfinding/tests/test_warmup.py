@@ -0,0 +1,87 @@
+"""Warm-up khi khởi động: chọn cặp tỉnh nóng và làm nóng cache"""
+
+import asyncio
+import time
+
+from api.main import _run_warmup
+from services.access_stats import AccessStats
+from services.warmup import parse_pairs, select_pairs, warm_up
+
+
+def test_parse_pairs_skips_malformed_items():
+    assert parse_pairs(" 01:79, Hà Nội:Đà Nẵng ,, 48:, bad") == [
+        ("01", "79"), ("Hà Nội", "Đà Nẵng")
+    ]
+
+
+def test_select_pairs_deduplicates_both_directions():
+    selected = select_pairs(
+        [("01", "79"), ("48", "79")],
+        [("79", "01"), ("01", "48"), ("48", "79")]
+    )
+    assert selected == [("01", "79"), ("48", "79"), ("01", "48")]
+    assert select_pairs([("01", "79")], [("01", "48")], limit=1) == [("01", "79")]
+
+
+def test_access_stats_round_trip(tmp_path):
+    path = str(tmp_path / "access_stats.json")
+    stats = AccessStats(path)
+    for _ in range(3):
+        stats.record("01", "79")
+    stats.record("79", "01")
+    stats.record("48", "79")
+    stats.record("48", "48")
+    stats.save()
+
+    # Hai chiều 01 -> 79 và 79 -> 01 được đếm chung
+    reloaded = AccessStats(path)
+    assert reloaded.top(10) == [("01", "79"), ("48", "79")]
+    assert reloaded.top(0) == []
+
+
+def test_warm_up_fills_route_cache(make_service):
+    service, server = make_service()
+
+    async def scenario():
+        report = await warm_up(service, [("01", "79"), ("48", "Không Tồn Tại")])
+        result = await service.find_path_async("01", "79")
+        await service.aclose()
+        return report, result
+
+    report, result = asyncio.run(scenario())
+    assert (report.requested, report.warmed, report.failed) == (2, 1, 1)
+    assert not report.timed_out
+    assert result.cached
+    assert server.stats["requests"] == 1
+    # Warm-up không tính vào thống kê truy vấn
+    assert service.access_stats.top(10) == [("01", "79")]
+
+
+def test_warm_up_stops_at_timeout(make_service):
+    service, _ = make_service(latency=1.0)
+
+    async def scenario():
+        report = await warm_up(service, [("01", "79"), ("01", "48")], timeout=0.1)
+        await service.aclose()
+        return report
+
+    report = asyncio.run(scenario())
+    assert report.timed_out
+    assert report.warmed == 0
+    assert report.elapsed_seconds < 1.0
+
+
+def test_edge_prefetch_stops_at_warmup_timeout(make_service, make_settings):
+    service, server = make_service(latency=1.0)
+    settings = make_settings(ors_prefetch_edge_distances=True, warmup_timeout_seconds=0.1)
+
+    async def scenario():
+        started = time.perf_counter()
+        await _run_warmup(service, settings)
+        elapsed = time.perf_counter() - started
+        await service.aclose()
+        return elapsed
+
+    # ORS treo không được giữ API ở trạng thái warming_up quá WARMUP_TIMEOUT_SECONDS
+    assert asyncio.run(scenario()) < 1.0
+    assert server.stats["requests"] >= 1
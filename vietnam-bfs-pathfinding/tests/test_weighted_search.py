@@ -0,0 +1,72 @@
+"""Tìm đường ngắn nhất theo km ước lượng: Dijkstra và A*"""
+
+import itertools
+
+import pytest
+
+from algorithms.astar import AStarPathfinder
+from algorithms.dijkstra import DijkstraPathfinder
+from models.road_segment import RoadType
+
+from test_bfs import assert_valid_path
+
+
+def floyd_warshall(graph, distance_calculator, road_type):
+    """Km ngắn nhất mọi cặp tỉnh, tính độc lập với các pathfinder"""
+    codes = graph.get_codes()
+    inf = float("inf")
+    best = {(a, b): 0.0 if a == b else inf for a in codes for b in codes}
+    for a in codes:
+        for b in graph.get_neighbors(a):
+            best[a, b] = distance_calculator.estimate_road_distance(
+                graph.get_province(a), graph.get_province(b), road_type
+            )
+    for k, i, j in itertools.product(codes, codes, codes):
+        if best[i, k] + best[k, j] < best[i, j]:
+            best[i, j] = best[i, k] + best[k, j]
+    return best
+
+
+@pytest.fixture(scope="module")
+def shortest_km(graph, distance_calculator):
+    return floyd_warshall(graph, distance_calculator, RoadType.NATIONAL)
+
+
+def test_dijkstra_finds_shortest_km(graph, distance_calculator, shortest_km):
+    dijkstra = DijkstraPathfinder(graph, distance_calculator)
+    codes = graph.get_codes()
+    for start in codes:
+        for end in codes:
+            result = dijkstra.find_path(start, end, RoadType.NATIONAL)
+            assert result.total_distance_km == pytest.approx(shortest_km[start, end])
+            assert_valid_path(graph, result, start, end)
+
+
+def test_dijkstra_scales_with_road_factor(graph, distance_calculator):
+    dijkstra = DijkstraPathfinder(graph, distance_calculator)
+    factors = distance_calculator.ROAD_ADJUSTMENT_FACTORS
+    default = dijkstra.find_path("01", "79", RoadType.DEFAULT)
+    highway = dijkstra.find_path("01", "79", RoadType.HIGHWAY)
+
+    # Cùng một hệ số cho mọi cạnh nên đường đi không đổi
+    assert highway.province_codes == default.province_codes
+    assert highway.total_distance_km == pytest.approx(
+        default.total_distance_km * factors[RoadType.HIGHWAY]
+    )
+
+
+@pytest.mark.parametrize("road_type", [RoadType.DEFAULT, RoadType.NATIONAL])
+def test_astar_matches_dijkstra(graph, distance_calculator, road_type):
+    dijkstra = DijkstraPathfinder(graph, distance_calculator)
+    astar = AStarPathfinder(graph, distance_calculator)
+    codes = graph.get_codes()
+    expanded_dijkstra = expanded_astar = 0
+    for start in codes:
+        for end in codes:
+            expected = dijkstra.find_path(start, end, road_type)
+            result = astar.find_path(start, end, road_type)
+            assert result.total_distance_km == pytest.approx(expected.total_distance_km)
+            assert_valid_path(graph, result, start, end)
+            expanded_dijkstra += expected.nodes_expanded
+            expanded_astar += result.nodes_expanded
+    assert expanded_astar < expanded_dijkstra